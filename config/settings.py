@@ -3,6 +3,7 @@ Central configuration management using Pydantic Settings.
 """
 from pydantic_settings import BaseSettings
 from pathlib import Path
+import os
 
 
 class Settings(BaseSettings):
@@ -34,6 +35,8 @@ class Settings(BaseSettings):
     # Database Paths
     chroma_db_path: str = "./data/chroma_db"
     sqlite_db_path: str = "./data/discovered_urls.db"
+    sqlite_pool_size: int = 2 * (os.cpu_count() or 1) + 2  # Read connections (2 * cores + spindles)
+    github_cache_dir: str = "./data/github_cache"  # Scrape results keyed by repo HEAD commit
 
     # Processing Configuration
     batch_size: int = 10
@@ -55,17 +58,23 @@ class Settings(BaseSettings):
     # Refresh Scheduler Configuration
     enable_auto_refresh: bool = True
     refresh_schedule: str = "0 3 * * 1"  # Cron format: Monday 3AM
+    refresh_concurrency: int = 8  # URLs refreshed in parallel per job
+    max_refresh_bytes: int = 5_000_000  # Skip pages whose Content-Length exceeds this
 
     # Logging Configuration
     log_level: str = "INFO"
     log_file: str = "./data/logs/rag_system.log"
+    log_json: bool = False  # Write the log file as JSON lines (one record per line)
 
     # Rate Limiting
     rate_limit_per_domain: float = 1.0  # requests per second
+    per_host_concurrency: int = 1  # Max concurrent scrapes against one host
+    crawl_concurrency: int = 4  # Pages loaded in parallel while crawling one website
 
     # Brave Search API Rate Limit
     brave_daily_quota: int = 2000  # Free tier daily limit
     track_brave_usage: bool = True  # Track API usage for quota monitoring
+    buffer_brave_usage_log: bool = True  # Write usage logs in batches from a background thread
 
     class Config:
         env_file = ".env"
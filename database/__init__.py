@@ -1,4 +1,5 @@
 from .models import DiscoveredURL, URLDatabase
+from .connection_pool import ConnectionPool
 from .vector_store import VectorStore
 
-__all__ = ["DiscoveredURL", "URLDatabase", "VectorStore"]
+__all__ = ["DiscoveredURL", "URLDatabase", "ConnectionPool", "VectorStore"]
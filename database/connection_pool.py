@@ -0,0 +1,111 @@
+"""
+Bounded pool of SQLite connections.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+from utils import log
+
+
+# Per-connection tuning for the URL database:
+# - WAL lets readers proceed while a writer commits
+# - synchronous=NORMAL fsyncs at checkpoints instead of every commit (safe with WAL)
+# - mmap and in-memory temp tables cut read syscalls and temp-file I/O
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    Apply the standard PRAGMAs to a SQLite connection.
+
+    Args:
+        conn: Connection to configure
+
+    Returns:
+        The same connection
+    """
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe, bounded pool of SQLite connections."""
+
+    def __init__(self, db_path: str, size: int):
+        """
+        Initialize connection pool.
+
+        Connections are opened lazily, up to `size`. Once the pool is
+        exhausted, callers wait for a connection to be returned instead
+        of opening new ones.
+
+        Args:
+            db_path: Path to SQLite database file
+            size: Maximum number of open connections
+        """
+        self.db_path = db_path
+        self.size = max(1, size)
+        self._idle: queue.Queue = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open a new pooled connection."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return configure_connection(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Get an idle connection, opening one if the pool is not full."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                # Count the slot only once the connection exists, so a failed
+                # connect does not shrink the pool for good
+                conn = self._create_connection()
+                self._created += 1
+                return conn
+
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of a `with` block.
+
+        Yields:
+            sqlite3.Connection
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close all idle connections."""
+        closed = 0
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            closed += 1
+
+        with self._lock:
+            self._created -= closed
+
+        log.debug(f"Closed {closed} pooled connections for {self.db_path}")
@@ -1,17 +1,32 @@
 """
 SQLite database models and schema for discovered URLs.
 """
+import asyncio
+import json
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Iterable, Tuple
 from config import settings
-from utils import log
+from utils import log, SOURCE_TYPE_IDS
+from .connection_pool import ConnectionPool, configure_connection
+
+# Change-detection validators from the last refresh, kept on the URL row
+# so the refresh scheduler can decide without reading the vector store
+VALIDATOR_COLUMNS = ('content_hash', 'commit_hash', 'http_etag', 'http_last_modified', 'file_hashes')
 
 
 class DiscoveredURL:
     """Model representing a discovered URL in the database."""
 
+    # Fixed attribute set: no per-instance __dict__ (rows are loaded in bulk)
+    __slots__ = (
+        'id', 'url', 'url_hash', 'source_type', 'source_type_id', 'status',
+        'discovered_at', 'discovered_from', 'last_crawled_at', 'next_refresh_at',
+        'refresh_frequency', 'retry_count', 'error_message', 'priority', 'metadata',
+        'content_hash', 'commit_hash', 'http_etag', 'http_last_modified', 'file_hashes'
+    )
+
     def __init__(
         self,
         id: Optional[int] = None,
@@ -27,12 +42,18 @@ class DiscoveredURL:
         retry_count: int = 0,
         error_message: Optional[str] = None,
         priority: int = 0,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None,
+        commit_hash: Optional[str] = None,
+        http_etag: Optional[str] = None,
+        http_last_modified: Optional[str] = None,
+        file_hashes: Optional[str] = None
     ):
         self.id = id
         self.url = url
         self.url_hash = url_hash
         self.source_type = source_type
+        self.source_type_id = SOURCE_TYPE_IDS.get(source_type)  # SourceType or None
         self.status = status
         self.discovered_at = discovered_at or datetime.now()
         self.discovered_from = discovered_from
@@ -43,6 +64,32 @@ class DiscoveredURL:
         self.error_message = error_message
         self.priority = priority
         self.metadata = metadata or {}
+        self.content_hash = content_hash
+        self.commit_hash = commit_hash
+        self.http_etag = http_etag
+        self.http_last_modified = http_last_modified
+        self.file_hashes = file_hashes  # JSON {path: hash} for GitHub repos
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "DiscoveredURL":
+        """Build a DiscoveredURL from a discovered_urls row."""
+        return cls(
+            id=row['id'],
+            url=row['url'],
+            url_hash=row['url_hash'],
+            source_type=row['source_type'],
+            status=row['status'],
+            discovered_at=datetime.fromisoformat(row['discovered_at']) if row['discovered_at'] else None,
+            discovered_from=row['discovered_from'],
+            last_crawled_at=datetime.fromisoformat(row['last_crawled_at']) if row['last_crawled_at'] else None,
+            next_refresh_at=datetime.fromisoformat(row['next_refresh_at']) if row['next_refresh_at'] else None,
+            refresh_frequency=row['refresh_frequency'],
+            retry_count=row['retry_count'],
+            error_message=row['error_message'],
+            priority=row['priority'],
+            metadata=json.loads(row['metadata']) if row['metadata'] else {},
+            **{column: row[column] for column in VALIDATOR_COLUMNS}
+        )
 
 
 class URLDatabase:
@@ -61,10 +108,15 @@ class URLDatabase:
         self._connect()
         self._create_tables()
 
+        # Reads go through a bounded pool; writes stay on self.conn since
+        # SQLite only allows one writer at a time anyway
+        self.pool = ConnectionPool(self.db_path, settings.sqlite_pool_size)
+
     def _connect(self):
         """Establish database connection."""
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
+        configure_connection(self.conn)
         log.info(f"Connected to SQLite database at {self.db_path}")
 
     def _create_tables(self):
@@ -86,10 +138,22 @@ class URLDatabase:
                 retry_count INTEGER DEFAULT 0,
                 error_message TEXT,
                 priority INTEGER DEFAULT 0,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT,
+                commit_hash TEXT,
+                http_etag TEXT,
+                http_last_modified TEXT,
+                file_hashes TEXT
             )
         """)
 
+        # Migrate databases created before the validator columns existed
+        existing_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(discovered_urls)")}
+        for column in VALIDATOR_COLUMNS:
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE discovered_urls ADD COLUMN {column} TEXT")
+                log.info(f"Added column discovered_urls.{column}")
+
         # Create indexes for performance
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_url_hash
@@ -111,6 +175,30 @@ class URLDatabase:
             ON discovered_urls(next_refresh_at)
         """)
 
+        # Covers the refresh scheduler's candidate query
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_refresh
+            ON discovered_urls(status, refresh_frequency, next_refresh_at, priority DESC, last_crawled_at)
+        """)
+
+        # Partial index covering the queue predicate (keeps queue counts cheap)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_queue
+            ON discovered_urls(status, retry_count)
+            WHERE status IN ('pending', 'failed')
+        """)
+
+        # Scrape dedup cache: equivalent URLs (e.g. differing only by
+        # tracking params) that were already scraped successfully
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_cache (
+                dedup_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_length INTEGER,
+                scraped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         self.conn.commit()
         log.info("Database tables created/verified")
 
@@ -124,12 +212,12 @@ class URLDatabase:
         Returns:
             True if URL exists, False otherwise
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT COUNT(*) FROM discovered_urls WHERE url_hash = ?",
-            (url_hash,)
-        )
-        count = cursor.fetchone()[0]
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                "SELECT COUNT(*) FROM discovered_urls WHERE url_hash = ?",
+                (url_hash,)
+            )
+            count = cursor.fetchone()[0]
         return count > 0
 
     def insert_url(self, url_obj: DiscoveredURL) -> Optional[int]:
@@ -143,11 +231,10 @@ class URLDatabase:
             ID of inserted row or None if already exists
         """
         if self.url_exists(url_obj.url_hash):
-            log.debug(f"URL already exists: {url_obj.url}")
+            log.debug("URL already exists: {}", url_obj.url)
             return None
 
         cursor = self.conn.cursor()
-        import json
 
         cursor.execute("""
             INSERT INTO discovered_urls (
@@ -181,16 +268,88 @@ class URLDatabase:
         Returns:
             List of DiscoveredURL objects
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM discovered_urls
-            WHERE status IN ('pending', 'failed')
-              AND retry_count < ?
-            ORDER BY priority DESC, discovered_at ASC
-            LIMIT ?
-        """, (settings.max_retries, limit))
+        with self.pool.connection() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM discovered_urls
+                WHERE status IN ('pending', 'failed')
+                  AND retry_count < ?
+                ORDER BY priority DESC, discovered_at ASC
+                LIMIT ?
+            """, (settings.max_retries, limit))
+            rows = cursor.fetchall()
+
+        return [DiscoveredURL.from_row(row) for row in rows]
+
+    def _fetch_pending_page(
+        self,
+        last_priority: Optional[int],
+        last_id: int,
+        chunk_size: int
+    ) -> List[sqlite3.Row]:
+        """Fetch one keyset page of pending URLs after (last_priority, last_id)."""
+        with self.pool.connection() as conn:
+            if last_priority is None:
+                cursor = conn.execute("""
+                    SELECT * FROM discovered_urls
+                    WHERE status IN ('pending', 'failed')
+                      AND retry_count < ?
+                    ORDER BY priority DESC, id ASC
+                    LIMIT ?
+                """, (settings.max_retries, chunk_size))
+            else:
+                cursor = conn.execute("""
+                    SELECT * FROM discovered_urls
+                    WHERE status IN ('pending', 'failed')
+                      AND retry_count < ?
+                      AND (priority < ? OR (priority = ? AND id > ?))
+                    ORDER BY priority DESC, id ASC
+                    LIMIT ?
+                """, (settings.max_retries, last_priority, last_priority, last_id, chunk_size))
+            return cursor.fetchall()
+
+    async def iter_pending_urls(self, chunk_size: int = 100) -> AsyncIterator[DiscoveredURL]:
+        """
+        Stream URLs pending for scraping, ordered by priority.
+
+        Uses keyset pagination on (priority, id) so each chunk is a cheap
+        index seek, and rows already yielded are never revisited even if
+        their status changes while the caller is processing them. Each page
+        is fetched in a worker thread so the event loop keeps running.
 
-        return [self._row_to_url(row) for row in cursor.fetchall()]
+        Args:
+            chunk_size: Number of rows fetched per query
+
+        Yields:
+            DiscoveredURL objects
+        """
+        last_priority = None
+        last_id = 0
+
+        while True:
+            rows = await asyncio.to_thread(self._fetch_pending_page, last_priority, last_id, chunk_size)
+            if not rows:
+                return
+
+            for row in rows:
+                yield DiscoveredURL.from_row(row)
+
+            last_priority = rows[-1]['priority']
+            last_id = rows[-1]['id']
+
+    def count_pending(self) -> int:
+        """
+        Count URLs pending for scraping (same criteria as get_pending_urls).
+
+        Returns:
+            Number of pending URLs
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.execute("""
+                SELECT COUNT(*) FROM discovered_urls
+                WHERE status IN ('pending', 'failed')
+                  AND retry_count < ?
+            """, (settings.max_retries,))
+            return cursor.fetchone()[0]
 
     def update_url_status(
         self,
@@ -233,7 +392,149 @@ class URLDatabase:
             """, (status, url_hash))
 
         self.conn.commit()
-        log.debug(f"Updated URL status to '{status}' for hash: {url_hash}")
+        log.debug("Updated URL status to '{}' for hash: {}", status, url_hash)
+
+    def update_url_status_many(
+        self,
+        updates: Iterable[Tuple[str, str, Optional[str]]]
+    ) -> int:
+        """
+        Update the status of many URLs in a single transaction.
+
+        Args:
+            updates: Iterable of (url_hash, status, error_message) tuples
+
+        Returns:
+            Number of updates applied
+        """
+        now = datetime.now()
+        scraped, failed, other = [], [], []
+
+        for url_hash, status, error_message in updates:
+            if status == 'scraped':
+                scraped.append((now, url_hash))
+            elif status == 'failed':
+                failed.append((error_message, url_hash))
+            else:
+                other.append((status, url_hash))
+
+        cursor = self.conn.cursor()
+
+        if scraped:
+            cursor.executemany("""
+                UPDATE discovered_urls
+                SET status = 'scraped',
+                    last_crawled_at = ?,
+                    retry_count = 0,
+                    error_message = NULL
+                WHERE url_hash = ?
+            """, scraped)
+        if failed:
+            cursor.executemany("""
+                UPDATE discovered_urls
+                SET status = 'failed',
+                    retry_count = retry_count + 1,
+                    error_message = ?
+                WHERE url_hash = ?
+            """, failed)
+        if other:
+            cursor.executemany("""
+                UPDATE discovered_urls
+                SET status = ?
+                WHERE url_hash = ?
+            """, other)
+
+        self.conn.commit()
+
+        count = len(scraped) + len(failed) + len(other)
+        log.debug("Updated status for {} URLs in one transaction", count)
+        return count
+
+    def update_refresh_times_many(
+        self,
+        updates: Iterable[Tuple[str, Optional[datetime], datetime, Optional[Dict[str, str]]]]
+    ) -> int:
+        """
+        Record refresh results for many URLs in a single transaction.
+
+        Args:
+            updates: Iterable of (url_hash, last_crawled_at, next_refresh_at,
+                validators) tuples. A None last_crawled_at, or a validator
+                missing from the dict, leaves the stored value as is.
+
+        Returns:
+            Number of updates applied
+        """
+        rows = []
+        for url_hash, last_crawled_at, next_refresh_at, validators in updates:
+            validators = validators or {}
+            rows.append((
+                last_crawled_at,
+                next_refresh_at,
+                *(validators.get(column) for column in VALIDATOR_COLUMNS),
+                url_hash
+            ))
+        if not rows:
+            return 0
+
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            UPDATE discovered_urls
+            SET last_crawled_at = COALESCE(?, last_crawled_at),
+                next_refresh_at = ?,
+                content_hash = COALESCE(?, content_hash),
+                commit_hash = COALESCE(?, commit_hash),
+                http_etag = COALESCE(?, http_etag),
+                http_last_modified = COALESCE(?, http_last_modified),
+                file_hashes = COALESCE(?, file_hashes)
+            WHERE url_hash = ?
+        """, rows)
+        self.conn.commit()
+
+        log.debug("Updated refresh times for {} URLs in one transaction", len(rows))
+        return len(rows)
+
+    def get_cached_scrape(self, dedup_key: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """
+        Look up a recent successful scrape of an equivalent URL.
+
+        Args:
+            dedup_key: Dedup key of the URL
+            max_age: Ignore scrapes older than this many seconds
+
+        Returns:
+            Dictionary with 'url', 'content_length' and 'scraped_at'
+            (datetime), or None if not cached
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT url, content_length, scraped_at FROM scrape_cache "
+                "WHERE dedup_key = ? AND scraped_at >= ?",
+                (dedup_key, datetime.now() - timedelta(seconds=max_age))
+            ).fetchone()
+
+        if not row:
+            return None
+        return {
+            'url': row['url'],
+            'content_length': row['content_length'],
+            'scraped_at': datetime.fromisoformat(row['scraped_at'])
+        }
+
+    def cache_scrape(self, dedup_key: str, url: str, content_length: int):
+        """
+        Record a successful scrape in the dedup cache.
+
+        Args:
+            dedup_key: Dedup key of the URL
+            url: URL that was scraped
+            content_length: Length of the scraped content
+        """
+        self.conn.execute("""
+            INSERT OR REPLACE INTO scrape_cache (dedup_key, url, content_length, scraped_at)
+            VALUES (?, ?, ?, ?)
+        """, (dedup_key, url, content_length, datetime.now()))
+        self.conn.commit()
 
     def get_stats(self) -> Dict[str, int]:
         """
@@ -242,41 +543,21 @@ class URLDatabase:
         Returns:
             Dictionary with statistics
         """
-        cursor = self.conn.cursor()
-
         stats = {}
-        cursor.execute("SELECT COUNT(*) FROM discovered_urls")
-        stats['total'] = cursor.fetchone()[0]
-
-        for status in ['pending', 'scraped', 'failed']:
-            cursor.execute(
-                "SELECT COUNT(*) FROM discovered_urls WHERE status = ?",
-                (status,)
-            )
-            stats[status] = cursor.fetchone()[0]
 
-        return stats
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM discovered_urls")
+            stats['total'] = cursor.fetchone()[0]
 
-    def _row_to_url(self, row: sqlite3.Row) -> DiscoveredURL:
-        """Convert database row to DiscoveredURL object."""
-        import json
+            for status in ['pending', 'scraped', 'failed']:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM discovered_urls WHERE status = ?",
+                    (status,)
+                )
+                stats[status] = cursor.fetchone()[0]
 
-        return DiscoveredURL(
-            id=row['id'],
-            url=row['url'],
-            url_hash=row['url_hash'],
-            source_type=row['source_type'],
-            status=row['status'],
-            discovered_at=datetime.fromisoformat(row['discovered_at']) if row['discovered_at'] else None,
-            discovered_from=row['discovered_from'],
-            last_crawled_at=datetime.fromisoformat(row['last_crawled_at']) if row['last_crawled_at'] else None,
-            next_refresh_at=datetime.fromisoformat(row['next_refresh_at']) if row['next_refresh_at'] else None,
-            refresh_frequency=row['refresh_frequency'],
-            retry_count=row['retry_count'],
-            error_message=row['error_message'],
-            priority=row['priority'],
-            metadata=json.loads(row['metadata']) if row['metadata'] else {}
-        )
+        return stats
 
     def clear_queue(self, status_filter: str = "pending") -> int:
         """
@@ -308,6 +589,7 @@ class URLDatabase:
 
     def close(self):
         """Close database connection."""
+        self.pool.close()
         if self.conn:
             self.conn.close()
             log.info("Database connection closed")
@@ -105,6 +105,11 @@ class ResetManager:
             with tarfile.open(backup_file, "w:gz") as tar:
                 # Backup SQLite database
                 if self.sqlite_db_path.exists():
+                    # Fold the WAL into the main file so the copy is complete
+                    conn = sqlite3.connect(self.sqlite_db_path)
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    conn.close()
+
                     tar.add(
                         self.sqlite_db_path,
                         arcname=self.sqlite_db_path.name
@@ -208,6 +213,15 @@ class ResetManager:
                 else:
                     raise
 
+            try:
+                cursor.execute("DELETE FROM scrape_cache")
+                log.info(f"Deleted {cursor.rowcount} entries from scrape_cache")
+            except sqlite3.OperationalError as e:
+                if "no such table" in str(e).lower():
+                    log.warning("Table 'scrape_cache' does not exist")
+                else:
+                    raise
+
             # Commit DELETE transactions before VACUUM
             # CRITICAL: VACUUM must run outside of any transaction
             conn.commit()
@@ -1,7 +1,7 @@
 """
 ChromaDB vector store interface for RAG system.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from pathlib import Path
 import chromadb
 from chromadb.config import Settings
@@ -34,18 +34,40 @@ class VectorStore:
             )
         )
 
-        # Get or create collection with cosine similarity
+        self.collection = self._create_collection()
+
+        log.info(f"ChromaDB initialized at {db_path} with collection '{collection_name}'")
+
+    def _create_collection(self):
+        """
+        Get or create the collection with cosine similarity.
+
+        Returns:
+            ChromaDB collection
+        """
         # Cosine similarity is better for normalized embeddings (range: -1 to 1, higher = more similar)
         # L2 distance measures euclidean distance (range: 0 to infinity, lower = more similar)
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
+        return self.client.get_or_create_collection(
+            name=self.collection_name,
             metadata={
                 "description": "Technical knowledge base for RAG",
                 "hnsw:space": "cosine"  # Use cosine similarity instead of L2
             }
         )
 
-        log.info(f"ChromaDB initialized at {db_path} with collection '{collection_name}'")
+    def reset_collection(self):
+        """
+        Delete and recreate the collection on the existing client.
+
+        WARNING: This is irreversible!
+        """
+        try:
+            self.client.delete_collection(name=self.collection_name)
+        except Exception as e:
+            log.warning(f"No existing collection '{self.collection_name}' to delete: {e}")
+
+        self.collection = self._create_collection()
+        log.warning(f"Collection '{self.collection_name}' has been reset")
 
     def add_chunks(
         self,
@@ -88,14 +110,8 @@ class VectorStore:
             if "does not exist" in str(e).lower():
                 log.warning(f"Collection '{self.collection_name}' not found, recreating...")
 
-                # Recreate the collection (same as __init__)
-                self.collection = self.client.get_or_create_collection(
-                    name=self.collection_name,
-                    metadata={
-                        "description": "Technical knowledge base for RAG",
-                        "hnsw:space": "cosine"
-                    }
-                )
+                # Recreate the collection
+                self.collection = self._create_collection()
                 log.info(f"Collection '{self.collection_name}' recreated successfully")
 
                 # Retry the add operation
@@ -112,6 +128,74 @@ class VectorStore:
                 # Other error, re-raise
                 raise
 
+    def iter_chunks(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all stored chunks (without embeddings), page by page.
+
+        Args:
+            page_size: Number of chunks fetched per request
+
+        Yields:
+            Chunk dictionaries with chunk_id, content and metadata
+        """
+        offset = 0
+        while True:
+            page = self.collection.get(
+                limit=page_size,
+                offset=offset,
+                include=['documents', 'metadatas']
+            )
+            if not page['ids']:
+                return
+
+            for chunk_id, content, metadata in zip(page['ids'], page['documents'], page['metadatas']):
+                yield {'chunk_id': chunk_id, 'content': content, 'metadata': metadata}
+
+            offset += len(page['ids'])
+
+    def rebuild_from_sources(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        embedder,
+        batch_size: int = 128
+    ) -> int:
+        """
+        Embed and insert chunks in batches.
+
+        Texts are encoded batch_size at a time and each batch is written
+        with a single add() call, instead of one encode/add per chunk.
+
+        Args:
+            chunks: Iterable of chunk dictionaries with chunk_id, content, metadata
+            embedder: Embedder instance (processing.Embedder)
+            batch_size: Number of chunks per encode/add call
+
+        Returns:
+            Number of chunks added
+        """
+        total = 0
+        batch: List[Dict[str, Any]] = []
+
+        def flush():
+            texts = [chunk['content'] for chunk in batch]
+            embeddings = embedder.embed(texts, batch_size=batch_size)
+            return self.add_chunks([
+                {**chunk, 'embedding': embedding.tolist()}
+                for chunk, embedding in zip(batch, embeddings)
+            ])
+
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                total += flush()
+                batch = []
+
+        if batch:
+            total += flush()
+
+        log.info(f"Rebuilt {total} chunks in batches of {batch_size}")
+        return total
+
     def search(
         self,
         query_embedding: List[float],
@@ -143,13 +227,7 @@ class VectorStore:
             # Auto-recovery: if collection was deleted, recreate and return empty results
             if "does not exist" in str(e).lower():
                 log.warning(f"Collection '{self.collection_name}' not found during search(), recreating...")
-                self.collection = self.client.get_or_create_collection(
-                    name=self.collection_name,
-                    metadata={
-                        "description": "Technical knowledge base for RAG",
-                        "hnsw:space": "cosine"
-                    }
-                )
+                self.collection = self._create_collection()
                 log.info(f"Collection '{self.collection_name}' recreated successfully")
                 # Return empty results
                 return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
@@ -220,6 +298,34 @@ class VectorStore:
 
         return 0
 
+    def delete_by_file_paths(self, source_url: str, file_paths: List[str]) -> int:
+        """
+        Delete the chunks of specific files from a source URL.
+
+        Args:
+            source_url: URL of the source (e.g. a GitHub repository)
+            file_paths: Paths of the files whose chunks should be deleted
+
+        Returns:
+            Number of chunks deleted
+        """
+        if not file_paths:
+            return 0
+
+        results = self.collection.get(
+            where={"$and": [
+                {"source_url": source_url},
+                {"file_path": {"$in": list(file_paths)}}
+            ]}
+        )
+
+        if results['ids']:
+            self.collection.delete(ids=results['ids'])
+            log.info(f"Deleted {len(results['ids'])} chunks for {len(file_paths)} files from {source_url}")
+            return len(results['ids'])
+
+        return 0
+
     def count(self) -> int:
         """
         Get total number of chunks in the database.
@@ -233,13 +339,7 @@ class VectorStore:
             # Auto-recovery: if collection was deleted, recreate and return 0
             if "does not exist" in str(e).lower():
                 log.warning(f"Collection '{self.collection_name}' not found during count(), recreating...")
-                self.collection = self.client.get_or_create_collection(
-                    name=self.collection_name,
-                    metadata={
-                        "description": "Technical knowledge base for RAG",
-                        "hnsw:space": "cosine"
-                    }
-                )
+                self.collection = self._create_collection()
                 log.info(f"Collection '{self.collection_name}' recreated successfully")
                 return 0
             else:
@@ -287,9 +387,4 @@ class VectorStore:
         Delete all data from the collection.
         WARNING: This is irreversible!
         """
-        self.client.delete_collection(name=self.collection_name)
-        self.collection = self.client.create_collection(
-            name=self.collection_name,
-            metadata={"description": "Technical knowledge base for RAG"}
-        )
-        log.warning(f"Collection '{self.collection_name}' has been reset")
+        self.reset_collection()
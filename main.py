@@ -14,6 +14,7 @@ from queue_processor.integrated_processor import IntegratedProcessor
 from database import VectorStore
 from processing import Reranker, QueryExpander, KeywordSearcher, HybridSearcher
 from utils import log
+from utils.event_loop import install_uvloop
 
 
 class RAGSystem:
@@ -763,4 +764,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -13,6 +13,7 @@ from queue_processor.integrated_processor import IntegratedProcessor
 from database import VectorStore
 from scheduler import RefreshScheduler
 from utils import log
+from utils.event_loop import install_uvloop
 
 
 class RAGSystemWithScheduler:
@@ -135,4 +136,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -6,7 +6,7 @@ from .input_analyzer import InputAnalyzer
 from .query_analyzer import QueryAnalyzer
 from .web_search import BraveSearchClient
 from database import URLDatabase, DiscoveredURL
-from utils import log, normalize_url, compute_url_hash, detect_url_type
+from utils import log, normalize_urls, compute_url_hashes, detect_url_type
 
 
 class Orchestrator:
@@ -89,15 +89,14 @@ class Orchestrator:
         added_count = 0
         skipped_count = 0
 
-        for url in discovered_urls:
-            # Normalize URL
-            normalized_url = normalize_url(url)
-            url_hash = compute_url_hash(normalized_url)
+        normalized_urls = normalize_urls(discovered_urls)
+        url_hashes = compute_url_hashes(normalized_urls)
 
+        for url, normalized_url, url_hash in zip(discovered_urls, normalized_urls, url_hashes):
             # Check if already exists
             if self.url_db.url_exists(url_hash):
                 skipped_count += 1
-                log.debug(f"URL already exists: {url}")
+                log.debug("URL already exists: {}", url)
                 continue
 
             # Detect URL type
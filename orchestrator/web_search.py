@@ -222,7 +222,7 @@ class BraveSearchClient:
                                for pattern in blocklist_patterns)
 
                 if is_blocked:
-                    log.debug(f"Blocked low-quality URL: {url}")
+                    log.debug("Blocked low-quality URL: {}", url)
                     continue
 
                 # Check if URL is prioritized (using weighted scoring)
@@ -54,7 +54,7 @@ class MetadataEnricher:
             # Parse JSON
             metadata = json.loads(response_text)
 
-            log.debug(f"Enriched metadata: {metadata.get('topics', [])}")
+            log.debug("Enriched metadata: {}", metadata.get('topics', []))
             return metadata
 
         except json.JSONDecodeError as e:
@@ -65,8 +65,9 @@ class ContentProcessor:
         # Step 2: Generate document ID (same for all chunks from this URL)
         document_id = compute_url_hash(url)
 
-        # Step 3: Process each chunk
+        # Step 3: Process each chunk (all sharing one processing timestamp)
         processed_chunks = []
+        processed_at = datetime.now().isoformat()
 
         for i, chunk in enumerate(chunks):
             try:
@@ -102,7 +103,7 @@ class ContentProcessor:
                     **self._extract_source_metadata(chunk, metadata, source_type),
 
                     # Temporal info
-                    'processed_at': datetime.now().isoformat(),
+                    'processed_at': processed_at,
                     'published_at': metadata.get('published_at') or '',
 
                     # Flags
@@ -120,7 +121,7 @@ class ContentProcessor:
                     'metadata': full_metadata
                 })
 
-                log.debug(f"Processed chunk {i+1}/{len(chunks)}")
+                log.debug("Processed chunk {}/{}", i + 1, len(chunks))
 
             except Exception as e:
                 log.error(f"Error processing chunk {i}: {e}")
@@ -177,11 +178,17 @@ class ContentProcessor:
             meta['repo_name'] = source_metadata.get('repo_name', '')
             meta['stars'] = source_metadata.get('stars', 0)
             meta['code_type'] = chunk.get('code_type', '')
+            meta['file_path'] = source_metadata.get('file_path', '')
 
         elif source_type == 'website':
             meta['page_title'] = source_metadata.get('title', '')
             meta['heading'] = chunk.get('heading', '')
 
+        # Change-detection fields read back by the refresh scheduler
+        for key in ('content_hash', 'commit_hash', 'http_last_modified', 'http_etag'):
+            if source_metadata.get(key):
+                meta[key] = source_metadata[key]
+
         return meta
 
     def _normalize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
@@ -7,9 +7,10 @@ from database import URLDatabase, VectorStore, DiscoveredURL
 from scrapers import YouTubeScraper, GitHubScraper, WebScraper
 from scrapers.youtube_channel_crawler import YouTubeChannelCrawler
 from scrapers.web_crawler import WebCrawler
+from scrapers.browser import close_browser
 from processing import ContentProcessor
 from config import settings
-from utils import log, normalize_url, compute_url_hash, detect_url_type
+from utils import log, normalize_urls, compute_url_hashes, detect_url_type, extract_youtube_video_id
 
 
 class IntegratedProcessor:
@@ -117,7 +118,8 @@ class IntegratedProcessor:
                 self.url_db.update_url_status(url_obj.url_hash, 'failed', error_msg)
                 return {'success': False, 'url': url, 'error': error_msg}
 
-            scrape_result = await asyncio.to_thread(scraper.scrape, url)
+            # Natively async scrapers (Playwright) run on this loop's shared browser
+            scrape_result = await scraper.scrape_async(url)
 
             if not scrape_result or not scrape_result.get('success'):
                 error_msg = scrape_result.get('error', 'Scraping failed') if scrape_result else 'Scraper returned None'
@@ -199,12 +201,9 @@ class IntegratedProcessor:
 
             async def rate_limited_process(url_obj):
                 """Process with rate limiting for YouTube."""
+                # Request spacing itself is enforced by YouTubeScraper
                 async with semaphore:
-                    result = await self.process_url(url_obj)
-                    # Add delay after processing to avoid burst requests
-                    if url_obj.source_type == 'youtube_video':
-                        await asyncio.sleep(settings.youtube_delay_between_requests)
-                    return result
+                    return await self.process_url(url_obj)
 
             tasks = [rate_limited_process(url_obj) for url_obj in pending_urls]
         else:
@@ -242,23 +241,28 @@ class IntegratedProcessor:
 
         log.info("Starting to process all pending URLs")
 
-        while True:
-            if max_batches and batches >= max_batches:
-                break
+        try:
+            while True:
+                if max_batches and batches >= max_batches:
+                    break
+
+                result = await self.process_batch()
 
-            result = await self.process_batch()
+                if result['processed'] == 0:
+                    break
 
-            if result['processed'] == 0:
-                break
+                total_processed += result['processed']
+                total_succeeded += result['succeeded']
+                total_failed += result['failed']
+                batches += 1
 
-            total_processed += result['processed']
-            total_succeeded += result['succeeded']
-            total_failed += result['failed']
-            batches += 1
+                # Delay between batches
+                if settings.delay_between_batches > 0:
+                    await asyncio.sleep(settings.delay_between_batches)
 
-            # Delay between batches
-            if settings.delay_between_batches > 0:
-                await asyncio.sleep(settings.delay_between_batches)
+        finally:
+            # Browser is shared by every page scrape and crawl in the run
+            await close_browser()
 
         log.info(f"Processing complete: {total_processed} URLs, {total_succeeded} succeeded, {total_failed} failed")
 
@@ -300,10 +304,10 @@ class IntegratedProcessor:
             added_count = 0
             duplicate_count = 0
 
-            for i, page_url in enumerate(discovered_pages, 1):
-                normalized_url = normalize_url(page_url)
-                url_hash = compute_url_hash(normalized_url)
+            normalized_urls = normalize_urls(discovered_pages)
+            url_hashes = compute_url_hashes(normalized_urls)
 
+            for i, (normalized_url, url_hash) in enumerate(zip(normalized_urls, url_hashes), 1):
                 # Check if already exists
                 if self.url_db.url_exists(url_hash):
                     duplicate_count += 1
@@ -379,10 +383,11 @@ class IntegratedProcessor:
 
             # Add discovered videos to database
             added_count = 0
-            for video_url in video_urls:
-                normalized_url = normalize_url(video_url)
-                url_hash = compute_url_hash(normalized_url)
+            added_video_ids = []
+            normalized_urls = normalize_urls(video_urls)
+            url_hashes = compute_url_hashes(normalized_urls)
 
+            for normalized_url, url_hash in zip(normalized_urls, url_hashes):
                 # Check if already exists
                 if self.url_db.url_exists(url_hash):
                     continue
@@ -401,6 +406,18 @@ class IntegratedProcessor:
                 self.url_db.insert_url(url_obj_new)
                 added_count += 1
 
+                video_id = extract_youtube_video_id(normalized_url)
+                if video_id:
+                    added_video_ids.append(video_id)
+
+            # Fetch the new videos' metadata in batches of 50 now rather than
+            # one API call per video when each one is scraped
+            if added_video_ids:
+                await asyncio.to_thread(
+                    self.scrapers['youtube_video'].prefetch_metadata,
+                    added_video_ids
+                )
+
             # Mark channel as processed
             self.url_db.update_url_status(url_obj.url_hash, 'scraped')
 
@@ -2,17 +2,67 @@
 Queue manager for processing URLs with prioritization and batch processing.
 """
 import asyncio
-from typing import List, Dict, Any
+import aiohttp
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlparse, parse_qsl, urlencode
 from database import URLDatabase, DiscoveredURL
 from scrapers import YouTubeScraper, GitHubScraper, WebScraper
+from scrapers.browser import close_browser
 from config import settings
-from utils import log, detect_url_type
+from utils import log, normalize_url, compute_url_hash, SourceType
+
+# Query parameters that never change page content
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src'})
+
+
+def dedup_key(url: str) -> str:
+    """
+    Compute a key shared by URLs that point to the same content.
+
+    Args:
+        url: URL to key
+
+    Returns:
+        Hash of the normalized URL with tracking parameters removed
+    """
+    parsed = urlparse(normalize_url(url))
+    if parsed.query:
+        params = [
+            (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+            if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PARAM_PREFIXES)
+        ]
+        parsed = parsed._replace(query=urlencode(sorted(params)))
+    return compute_url_hash(parsed.geturl())
 
 
 class QueueManager:
     """Manages the processing queue for discovered URLs."""
 
+    # In-memory dedup cache capacity (entries), and how long a successful
+    # scrape keeps satisfying equivalent URLs
+    SCRAPE_CACHE_SIZE = 10000
+    SCRAPE_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+    # Preflight HEAD checks (dead links are failed without running a scraper)
+    PREFLIGHT_CONCURRENCY = 50
+    PREFLIGHT_TIMEOUT = 5  # seconds
+    DEAD_STATUS_CODES = frozenset({404, 410})
+
+    # Reload the in-memory queue from the database after this many seconds
+    HEAP_REFRESH_INTERVAL = 300
+
+    # Status write-back batching
+    WRITEBACK_BATCH_SIZE = 100
+    WRITEBACK_FLUSH_INTERVAL = 0.5  # seconds
+
     def __init__(self, url_db: URLDatabase):
         """
         Initialize queue manager.
@@ -24,15 +74,46 @@ class QueueManager:
         self.batch_size = settings.batch_size
         self.concurrent_workers = settings.concurrent_workers
 
-        # Initialize scrapers
-        self.scrapers = {
-            'youtube_video': YouTubeScraper(),
-            'youtube_channel': YouTubeScraper(),  # Channel uses same scraper
-            'github': GitHubScraper(),
-            'website': WebScraper()
-        }
-
-        log.info(f"QueueManager initialized (batch_size={self.batch_size}, workers={self.concurrent_workers})")
+        # Caps in-flight scrapes regardless of batch size
+        self._semaphore = asyncio.Semaphore(self.concurrent_workers)
+
+        # Dedicated pool for blocking scrapers (keeps the default executor free)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.concurrent_workers,
+            thread_name_prefix="scrape"
+        )
+
+        # In-memory priority queue of pending URLs: (-priority, discovered_at, seq, url_obj)
+        self._heap: List[Tuple[int, float, int, DiscoveredURL]] = []
+        self._heap_seq = itertools.count()
+        self._heap_loaded_at: Optional[float] = None
+
+        # Dedup cache: dedup_key -> (expiry time, successful result)
+        # (LRU, backed by SQLite)
+        self._scrape_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # Per-host politeness: concurrency cap + minimum spacing between hits
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_next_slot: Dict[str, float] = {}
+        self._min_host_interval = (
+            1.0 / settings.rate_limit_per_domain if settings.rate_limit_per_domain > 0 else 0.0
+        )
+
+        # Status updates are buffered and written in batches by one writer task
+        self._writeback: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # Initialize scrapers, indexed by SourceType
+        youtube_scraper = YouTubeScraper()  # Shared by videos and channels
+        self._scrapers = (
+            youtube_scraper,  # SourceType.YOUTUBE_VIDEO
+            youtube_scraper,  # SourceType.YOUTUBE_CHANNEL
+            GitHubScraper(),  # SourceType.GITHUB
+            WebScraper(),     # SourceType.WEBSITE
+        )
+        assert len(self._scrapers) == len(SourceType)
+
+        log.info("QueueManager initialized (batch_size={}, workers={})", self.batch_size, self.concurrent_workers)
 
     def get_queue_size(self) -> int:
         """
@@ -41,8 +122,44 @@ class QueueManager:
         Returns:
             Number of pending URLs
         """
-        pending_urls = self.url_db.get_pending_urls(limit=10000)
-        return len(pending_urls)
+        return self.url_db.count_pending()
+
+    def enqueue(self, url_obj: DiscoveredURL):
+        """
+        Add a newly discovered URL to the in-memory queue.
+
+        The URL must already be inserted in the database.
+
+        Args:
+            url_obj: DiscoveredURL object to queue
+        """
+        if self._heap_loaded_at is None:
+            # Not loaded yet: the URL will be picked up from the database
+            return
+        self._push(url_obj)
+
+    def _push(self, url_obj: DiscoveredURL):
+        """Push a URL onto the priority heap."""
+        discovered_at = url_obj.discovered_at.timestamp() if url_obj.discovered_at else 0.0
+        heapq.heappush(
+            self._heap,
+            (-url_obj.priority, discovered_at, next(self._heap_seq), url_obj)
+        )
+
+    async def _load_heap(self):
+        """(Re)load the in-memory queue with all pending URLs from the database."""
+        self._heap = []
+        async for url_obj in self.url_db.iter_pending_urls(chunk_size=1000):
+            self._push(url_obj)
+        self._heap_loaded_at = time.monotonic()
+        log.debug("Loaded {} pending URLs into memory", len(self._heap))
+
+    def _heap_is_stale(self) -> bool:
+        """Check whether the in-memory queue should be reloaded from the database."""
+        return (
+            self._heap_loaded_at is None
+            or time.monotonic() - self._heap_loaded_at > self.HEAP_REFRESH_INTERVAL
+        )
 
     async def process_batch(self) -> Dict[str, Any]:
         """
@@ -51,8 +168,14 @@ class QueueManager:
         Returns:
             Dictionary with processing results
         """
-        # Get next batch of URLs
-        pending_urls = self.url_db.get_pending_urls(limit=self.batch_size)
+        # Get next batch of URLs from the in-memory queue
+        if not self._heap or self._heap_is_stale():
+            await self._load_heap()
+
+        pending_urls = [
+            heapq.heappop(self._heap)[-1]
+            for _ in range(min(self.batch_size, len(self._heap)))
+        ]
 
         if not pending_urls:
             log.info("No pending URLs in queue")
@@ -62,21 +185,35 @@ class QueueManager:
                 'failed': 0
             }
 
-        log.info(f"Processing batch of {len(pending_urls)} URLs")
+        log.info("Processing batch of {} URLs", len(pending_urls))
 
-        # Process URLs concurrently
-        tasks = []
-        for url_obj in pending_urls:
-            task = self._process_url(url_obj)
-            tasks.append(task)
+        started = await self._start_writeback()
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Process URLs concurrently, handling each result as soon as it finishes
+        tasks = []
+        results = []
+        succeeded = 0
+        try:
+            alive_urls, dead_results = await self._preflight(pending_urls)
+            results.extend(dead_results)
+
+            tasks = [asyncio.ensure_future(self._process_url(url_obj)) for url_obj in alive_urls]
+            for next_done in asyncio.as_completed(tasks):
+                # _process_url catches its own errors, so every result is a dict
+                result = await next_done
+                succeeded += result['success']
+                results.append(result)
+        finally:
+            # On cancellation or error, don't leave scrapes running in the background
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if started:
+                await self._stop_writeback()
 
-        # Count successes and failures
-        succeeded = sum(1 for r in results if isinstance(r, dict) and r.get('success'))
         failed = len(results) - succeeded
 
-        log.info(f"Batch complete: {succeeded} succeeded, {failed} failed")
+        log.info("Batch complete: {} succeeded, {} failed", succeeded, failed)
 
         return {
             'processed': len(results),
@@ -95,50 +232,61 @@ class QueueManager:
         Returns:
             Dictionary with processing result
         """
-        url = url_obj.url
-        source_type = url_obj.source_type
+        url, source_type, url_hash = url_obj.url, url_obj.source_type, url_obj.url_hash
 
-        log.info(f"Processing URL: {url} (type: {source_type})")
+        log.info("Processing URL: {} (type: {})", url, source_type)
 
         try:
             # Get appropriate scraper
-            scraper = self.scrapers.get(source_type)
+            type_id = url_obj.source_type_id
+            scraper = self._scrapers[type_id] if type_id is not None else None
             if not scraper:
-                log.error(f"No scraper found for type: {source_type}")
-                self.url_db.update_url_status(
-                    url_obj.url_hash,
+                log.error("No scraper found for type: {}", source_type)
+                await self._set_status(
+                    url_hash,
                     status='failed',
                     error_message=f"No scraper for type {source_type}"
                 )
                 return {'success': False, 'url': url, 'error': 'No scraper'}
 
+            # Skip URLs equivalent to one already scraped
+            key = dedup_key(url)
+            cached = self._get_cached_result(key, url_hash)
+            if cached:
+                await self._set_status(url_hash, status='scraped')
+                log.info("♻️  Already scraped (equivalent to {}): {}", cached['url'], url)
+                return {**cached, 'url': url, 'cached': True}
+
             # Scrape content
-            result = await asyncio.to_thread(scraper.scrape, url)
+            async with self._host_slot(url):
+                result = await scraper.scrape_async(url, executor=self._pool)
 
             if result and result.get('success'):
                 # Update database status
-                self.url_db.update_url_status(
-                    url_obj.url_hash,
+                await self._set_status(
+                    url_hash,
                     status='scraped'
                 )
 
-                log.info(f"✅ Successfully scraped: {url}")
+                log.info("✅ Successfully scraped: {}", url)
+                content_length = len(result.get('content', ''))
+                self._cache_result(key, url, content_length)
                 return {
                     'success': True,
                     'url': url,
-                    'content_length': len(result.get('content', '')),
+                    'content_length': content_length,
                     'metadata': result.get('metadata', {})
                 }
             else:
                 # Scraping failed
                 error_msg = result.get('error', 'Unknown error') if result else 'Scraper returned None'
-                self.url_db.update_url_status(
-                    url_obj.url_hash,
+                await self._set_status(
+                    url_hash,
                     status='failed',
                     error_message=error_msg
                 )
 
-                log.warning(f"❌ Failed to scrape: {url} - {error_msg}")
+                log.warning("❌ Failed to scrape: {} - {}", url, error_msg)
                 return {
                     'success': False,
                     'url': url,
@@ -146,9 +294,9 @@ class QueueManager:
                 }
 
         except Exception as e:
-            log.error(f"Error processing {url}: {e}")
-            self.url_db.update_url_status(
-                url_obj.url_hash,
+            log.error("Error processing {}: {}", url, e)
+            await self._set_status(
+                url_hash,
                 status='failed',
                 error_message=str(e)
             )
@@ -158,48 +306,280 @@ class QueueManager:
                 'error': str(e)
             }
 
-    async def process_all(self, max_batches: int = None) -> Dict[str, Any]:
+    async def _preflight(self, url_objs: List[DiscoveredURL]) -> Tuple[List[DiscoveredURL], List[Dict[str, Any]]]:
         """
-        Process all pending URLs in batches.
+        HEAD-check URLs and fail the dead ones before any scraper runs.
+
+        Only 404/410 responses count as dead: many servers reject HEAD
+        (403/405) while serving GET fine, and network errors are left for
+        the scraper to report.
 
         Args:
-            max_batches: Maximum number of batches to process (None = all)
+            url_objs: URLs about to be processed
 
         Returns:
-            Dictionary with overall processing statistics
+            Tuple of (URLs to scrape, results for dead URLs)
         """
-        total_processed = 0
-        total_succeeded = 0
-        total_failed = 0
-        batches_processed = 0
+        if not url_objs:
+            return [], []
+
+        semaphore = asyncio.Semaphore(self.PREFLIGHT_CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=self.PREFLIGHT_TIMEOUT)
+
+        async def head_status(session: aiohttp.ClientSession, url: str) -> Optional[int]:
+            async with semaphore:
+                try:
+                    async with session.head(url, allow_redirects=True) as response:
+                        return response.status
+                except Exception:
+                    return None
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            statuses = await asyncio.gather(*(head_status(session, u.url) for u in url_objs))
+
+        alive_urls = []
+        dead_results = []
+        for url_obj, status in zip(url_objs, statuses):
+            if status in self.DEAD_STATUS_CODES:
+                error_msg = f"HTTP {status} (preflight)"
+                await self._set_status(url_obj.url_hash, status='failed', error_message=error_msg)
+                log.warning("❌ Dead link, skipping scrape: {} - {}", url_obj.url, error_msg)
+                dead_results.append({'success': False, 'url': url_obj.url, 'error': error_msg})
+            else:
+                alive_urls.append(url_obj)
 
-        log.info("Starting to process all pending URLs")
+        return alive_urls, dead_results
 
-        while True:
-            # Check if we've reached max batches
-            if max_batches and batches_processed >= max_batches:
-                log.info(f"Reached max batches limit: {max_batches}")
-                break
+    def _get_cached_result(self, key: str, url_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached result for a dedup key (memory first, then database).
+
+        Only scrapes of a *different* URL count: a URL that was scraped
+        before and is back in the queue (retry, re-queue, refresh) must be
+        scraped again.
+
+        Args:
+            key: Dedup key of the URL
+            url_hash: Hash of the URL being processed
+
+        Returns:
+            Cached result dictionary or None
+        """
+        entry = self._scrape_cache.get(key)
+        if entry is not None:
+            expires_at, cached = entry
+            if expires_at <= time.time():
+                del self._scrape_cache[key]
+                return None
+            self._scrape_cache.move_to_end(key)
+        else:
+            stored = self.url_db.get_cached_scrape(key, max_age=self.SCRAPE_CACHE_TTL)
+            if not stored:
+                return None
+
+            cached = {'success': True, 'url': stored['url'], 'content_length': stored['content_length']}
+            self._remember(key, cached, stored['scraped_at'].timestamp() + self.SCRAPE_CACHE_TTL)
+
+        if compute_url_hash(cached['url']) == url_hash:
+            return None
+        return cached
+
+    def _cache_result(self, key: str, url: str, content_length: int):
+        """
+        Record a successful scrape in the dedup cache.
 
-            # Process one batch
-            result = await self.process_batch()
+        Args:
+            key: Dedup key of the URL
+            url: URL that was scraped
+            content_length: Length of the scraped content
+        """
+        result = {'success': True, 'url': url, 'content_length': content_length}
+        self._remember(key, result, time.time() + self.SCRAPE_CACHE_TTL)
+        self.url_db.cache_scrape(key, url, content_length)
+
+    def _remember(self, key: str, result: Dict[str, Any], expires_at: float):
+        """Insert into the in-memory LRU, evicting the oldest entry if full."""
+        self._scrape_cache[key] = (expires_at, result)
+        self._scrape_cache.move_to_end(key)
+        if len(self._scrape_cache) > self.SCRAPE_CACHE_SIZE:
+            self._scrape_cache.popitem(last=False)
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        """
+        Hold a per-host slot while scraping, spacing requests to the same host.
+
+        Different hosts proceed concurrently; requests to one host are capped
+        at settings.per_host_concurrency and at settings.rate_limit_per_domain.
+        The global worker semaphore is taken after the host wait.
+
+        Args:
+            url: URL about to be scraped
+        """
+        host = urlparse(url).netloc.lower()
+
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+
+        async with semaphore:
+            if self._min_host_interval > 0:
+                # Reserve this request's start time before sleeping, so
+                # concurrent waiters on one host queue up behind each other
+                now = time.monotonic()
+                start = max(now, self._host_next_slot.get(host, now))
+                self._host_next_slot[host] = start + self._min_host_interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+
+            # Only take a global worker slot once the host is ready, so a
+            # throttled host does not hold slots other hosts could use
+            async with self._semaphore:
+                yield
+
+    async def _set_status(self, url_hash: str, status: str, error_message: Optional[str] = None):
+        """
+        Record a URL status change.
+
+        Buffered to the write-back queue when the writer is running,
+        written immediately otherwise.
+
+        Args:
+            url_hash: Hash of the URL to update
+            status: New status ('pending', 'scraped', 'failed')
+            error_message: Optional error message if failed
+        """
+        if self._writeback is not None:
+            await self._writeback.put((url_hash, status, error_message))
+        else:
+            self.url_db.update_url_status(url_hash, status, error_message)
+
+    async def _start_writeback(self) -> bool:
+        """
+        Start the status writer task if it is not already running.
 
-            if result['processed'] == 0:
-                # No more URLs to process
+        Returns:
+            True if this call started the writer
+        """
+        if self._writer_task is not None:
+            return False
+
+        self._writeback = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writeback_loop())
+        return True
+
+    async def _stop_writeback(self):
+        """Flush pending status updates and stop the writer task."""
+        if self._writer_task is None:
+            return
+
+        await self._writeback.put(None)
+        await self._writer_task
+        self._writer_task = None
+        self._writeback = None
+
+    async def _writeback_loop(self):
+        """Drain the write-back queue, committing updates in batches."""
+        done = False
+
+        while not done:
+            item = await self._writeback.get()
+            if item is None:
                 break
 
-            # Update totals
-            total_processed += result['processed']
-            total_succeeded += result['succeeded']
-            total_failed += result['failed']
-            batches_processed += 1
+            items = [item]
+            while len(items) < self.WRITEBACK_BATCH_SIZE:
+                try:
+                    item = await asyncio.wait_for(
+                        self._writeback.get(),
+                        timeout=self.WRITEBACK_FLUSH_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    done = True
+                    break
+                items.append(item)
+
+            try:
+                self.url_db.update_url_status_many(items)
+            except Exception as e:
+                log.error("Error writing {} status updates: {}", len(items), e)
 
-            # Delay between batches (politeness)
-            if settings.delay_between_batches > 0:
-                log.debug(f"Waiting {settings.delay_between_batches}s before next batch")
-                await asyncio.sleep(settings.delay_between_batches)
+    async def process_all(self, max_batches: int = None) -> Dict[str, Any]:
+        """
+        Process all pending URLs.
 
-        log.info(f"Processing complete: {total_processed} URLs ({total_succeeded} succeeded, {total_failed} failed)")
+        A producer streams URLs from the database into a bounded queue while
+        worker tasks drain it, so the next chunk is fetched while the current
+        one is being scraped.
+
+        Args:
+            max_batches: Maximum number of batches to process (None = all)
+
+        Returns:
+            Dictionary with overall processing statistics
+        """
+        log.info("Starting to process all pending URLs")
+
+        max_urls = max_batches * self.batch_size if max_batches else None
+        num_workers = max(1, self.concurrent_workers)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        results: List[Dict[str, Any]] = []
+
+        async def enqueue_chunk(chunk: List[DiscoveredURL]):
+            alive_urls, dead_results = await self._preflight(chunk)
+            results.extend(dead_results)
+            for url_obj in alive_urls:
+                await queue.put(url_obj)
+
+        async def producer():
+            seen = 0
+            chunk: List[DiscoveredURL] = []
+            try:
+                async for url_obj in self.url_db.iter_pending_urls(chunk_size=self.batch_size):
+                    if max_urls is not None and seen >= max_urls:
+                        log.info("Reached max batches limit: {}", max_batches)
+                        break
+
+                    chunk.append(url_obj)
+                    seen += 1
+                    if len(chunk) >= self.batch_size:
+                        await enqueue_chunk(chunk)
+                        chunk = []
+
+                if chunk:
+                    await enqueue_chunk(chunk)
+            finally:
+                for _ in range(num_workers):
+                    await queue.put(None)
+
+        async def worker():
+            while True:
+                url_obj = await queue.get()
+                if url_obj is None:
+                    break
+                try:
+                    results.append(await self._process_url(url_obj))
+                except Exception as e:
+                    log.error("Error processing {}: {}", url_obj.url, e)
+                    results.append({'success': False, 'url': url_obj.url, 'error': str(e)})
+
+        started = await self._start_writeback()
+        try:
+            await asyncio.gather(producer(), *(worker() for _ in range(num_workers)))
+        finally:
+            if started:
+                await self._stop_writeback()
+            await close_browser()
+
+        total_processed = len(results)
+        total_succeeded = sum(r['success'] for r in results)
+        total_failed = total_processed - total_succeeded
+        batches_processed = -(-total_processed // self.batch_size)
+
+        log.info("Processing complete: {} URLs ({} succeeded, {} failed)", total_processed, total_succeeded, total_failed)
 
         return {
             'total_processed': total_processed,
@@ -207,3 +587,8 @@ class QueueManager:
             'total_failed': total_failed,
             'batches': batches_processed
         }
+
+    def close(self):
+        """Clean up resources."""
+        self._pool.shutdown(wait=True)
+        log.info("QueueManager closed")
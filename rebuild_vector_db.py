@@ -3,13 +3,13 @@
 Rebuild vector database with new embeddings (MPNet) and cosine similarity.
 
 This script:
-1. Backs up existing ChromaDB data
+1. Reads the chunks currently stored in ChromaDB
 2. Clears the existing collection
 3. Recreates collection with new settings
-4. Note: Original content needs to be re-processed from sources
+4. Re-embeds the stored chunks in batches with the configured model
 
 WARNING: This will clear the existing vector database!
-Run the processing pipeline after this to rebuild with new embeddings.
+Stored chunks are kept in memory and re-inserted with new embeddings.
 """
 from utils import log
 from database.vector_store import VectorStore
@@ -24,54 +24,56 @@ def main():
     # Initialize vector store
     vector_store = VectorStore()
 
-    # Get current stats
-    log.info("\n[Step 1/3] Current database stats...")
+    # Step 1: Read current chunks
+    log.info("\n[Step 1/4] Reading current chunks...")
     try:
         current_count = vector_store.collection.count()
         log.info(f"Current chunks: {current_count:,}")
+        chunks = list(vector_store.iter_chunks())
     except Exception as e:
-        log.warning(f"Could not get stats: {e}")
+        log.warning(f"Could not read current chunks: {e}")
         current_count = 0
+        chunks = []
 
     # Step 2: Clear and recreate collection
-    log.info("\n[Step 2/3] Clearing existing vector database...")
-    try:
-        vector_store.client.delete_collection("rag_knowledge_base")
-        log.info("✓ Existing collection deleted")
-    except Exception as e:
-        log.warning(f"No existing collection to delete: {e}")
-
-    # Recreate collection with cosine similarity and new settings
-    log.info("✓ Creating new collection with:")
+    log.info("\n[Step 2/4] Clearing existing vector database...")
+    log.info("✓ Recreating collection with:")
     log.info("  - Similarity metric: cosine")
     log.info("  - Embedding model: all-mpnet-base-v2 (768 dims)")
 
-    vector_store = VectorStore()  # Reinitialize to create new collection
+    vector_store.reset_collection()
     log.info("✓ New collection created")
 
-    # Step 3: Instructions
-    log.info("\n[Step 3/3] Next steps...")
-    log.info("\nThe vector database has been cleared and recreated with:")
+    # Step 3: Re-embed stored chunks
+    log.info(f"\n[Step 3/4] Re-embedding {len(chunks):,} chunks...")
+    rebuilt_count = 0
+    if chunks:
+        from processing import Embedder
+
+        embedder = Embedder()
+        rebuilt_count = vector_store.rebuild_from_sources(chunks, embedder, batch_size=128)
+        log.info(f"✓ Re-embedded {rebuilt_count:,} chunks")
+
+    # Step 4: Instructions
+    log.info("\n[Step 4/4] Next steps...")
+    log.info("\nThe vector database has been rebuilt with:")
     log.info("  ✓ Cosine similarity metric")
     log.info("  ✓ MPNet embedding model (768 dimensions)")
-    log.info("  ✓ Ready for new content")
 
-    log.info("\nTo rebuild the database, run:")
+    log.info("\nTo add new content, run:")
     log.info("  python3 run_rag.py")
-    log.info("  Then select option 6 (Process Queue)")
-    log.info("\nOr use the integrated processor:")
-    log.info("  python3 test_full_pipeline.py")
+    log.info("  Then select option 3 (Process Queue)")
 
     # Summary
     log.info("\n" + "=" * 60)
-    log.info("REBUILD PREPARATION COMPLETE")
+    log.info("REBUILD COMPLETE")
     log.info("=" * 60)
     log.info(f"Previous chunks: {current_count:,}")
-    log.info(f"Current chunks: 0 (ready for new embeddings)")
+    log.info(f"Current chunks: {rebuilt_count:,}")
 
     # Cleanup (ChromaDB client closes automatically)
 
-    log.info("\n✅ Vector database cleared and ready for rebuilding!")
+    log.info("\n✅ Vector database rebuilt!")
 
 
 if __name__ == "__main__":
@@ -3,534 +3,654 @@
 Script interactif pour tester le système RAG.
 """
 import asyncio
+import functools
+import os
 import sys
+import threading
+import traceback
 from pathlib import Path
 from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent))
 
-from main import RAGSystem
-from processing import Embedder
+from utils.event_loop import install_uvloop
+
+
+# Menus are built once and written in a single call
+MENU_TEXT = "\n".join([
+    "=" * 80,
+    "MENU PRINCIPAL",
+    "=" * 80,
+    "",
+    "=== SOURCES ===",
+    "1. 🔍 Ajouter sources (mode interactif)",
+    "2. 📝 Ajouter sources (direct)",
+    "3. ⚙️  Processer la file d'attente",
+    "4. 🔎 Rechercher dans la base",
+    "",
+    "=== SYSTÈME ===",
+    "5. 📊 Statistiques système",
+    "6. 📊 Brave Search quota",
+    "7. ⏰ Configuration auto-refresh",
+    "8. 🗑️  Vider la file d'attente",
+    "9. 🗑️  Reset database (ADMIN)",
+    "",
+    "10. ❌ Quitter",
+    "",
+    "",
+])
+
+REFRESH_MENU_TEXT = "\n".join([
+    "OPTIONS :",
+    "",
+    "   [1] Toggle ON/OFF",
+    "   [2] Retour au menu",
+    "",
+    "",
+])
+
+CLEAR_QUEUE_MENU_TEXT = "\n".join([
+    "OPTIONS :",
+    "",
+    "   [1] Vider PENDING seulement",
+    "   [2] Vider FAILED seulement",
+    "   [3] Vider PENDING + FAILED",
+    "   [4] Annuler",
+    "",
+    "",
+])
+
+
+# Similarity → label, highest threshold first
+# Adjusted thresholds for semantic search (lower is more realistic)
+SIMILARITY_LABELS = [
+    (65, "🟢 Excellente"),
+    (50, "🟡 Bonne"),
+    (35, "🟠 Moyenne"),
+    (float("-inf"), "🔴 Faible"),
+]
+
+
+def _first_items(value, count: int) -> str:
+    """Return the first `count` entries of a comma-separated string or list."""
+    # Metadata may be stored as comma-separated strings by ChromaDB
+    if isinstance(value, str):
+        return ', '.join(value.split(', ', count)[:count])
+    if isinstance(value, list):
+        return ', '.join(value[:count])
+    return ''
+
+
+def format_result(i: int, doc: str, meta: dict, similarity=None) -> str:
+    """Build the display block for one search result."""
+    source = meta.get('source_url', 'N/A')
+    if len(source) > 70:
+        source = source[:70] + "..."
+
+    parts = [
+        "─" * 80,
+        f"RÉSULTAT #{i}",
+        "─" * 80,
+        f"📄 Source    : {source}",
+        f"🏷️  Type      : {meta.get('source_type', 'N/A')}",
+    ]
+
+    if similarity is not None:
+        similarity_percent = similarity * 100
+        indicator = next(label for threshold, label in SIMILARITY_LABELS if similarity_percent >= threshold)
+        parts.append(f"⚡ Pertinence: {indicator} ({similarity_percent:.1f}%)")
+
+    content_preview = doc[:300] + "..." if len(doc) > 300 else doc
+    parts += [
+        f"📌 Topics    : {_first_items(meta.get('topics', ''), 3)}",
+        f"🔑 Keywords  : {_first_items(meta.get('keywords', ''), 5)}",
+        f"📊 Difficulty: {meta.get('difficulty', 'N/A')}",
+        "",
+        f"📝 Résumé : {meta.get('summary', 'N/A')}",
+        "",
+        "💬 Contenu (extrait) :",
+        f"   {content_preview}",
+        "",
+        "",
+    ]
+    return "\n".join(parts)
+
+
+# RAGSystem pulls in ChromaDB and the embedding model; build it on first use
+_rag = None
+
+
+def get_rag():
+    """Return the shared RAGSystem, initializing it on first call."""
+    global _rag
+    if _rag is None:
+        from main import RAGSystem
+
+        print("📦 Initialisation du système...")
+        _rag = RAGSystem()
+        print("✅ Système initialisé !\n")
+    return _rag
+
+
+# Reused across visits to the auto-refresh screen
+_scheduler = None
+
+
+def get_scheduler():
+    """Return the shared RefreshScheduler, creating it on first call."""
+    global _scheduler
+    if _scheduler is None:
+        from scheduler.refresh_scheduler import RefreshScheduler
+
+        _scheduler = RefreshScheduler()
+    return _scheduler
+
+
+def _read_line(prompt: str) -> str:
+    """
+    input() that never holds sys.stdin's buffer lock.
+
+    Terminals go through input() (readline, no buffer lock). Piped stdin is
+    read straight from the file descriptor, because a daemon thread blocked
+    inside the buffered reader makes interpreter shutdown abort.
+    """
+    if sys.stdin.isatty():
+        return input(prompt)
+
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+
+    data = bytearray()
+    while True:
+        byte = os.read(sys.stdin.fileno(), 1)
+        if not byte:
+            if not data:
+                raise EOFError
+            break
+        if byte == b"\n":
+            break
+        data += byte
+    return data.decode(sys.stdin.encoding or "utf-8", "replace").rstrip("\r")
+
+
+async def ainput(prompt: str = "") -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+
+    The read runs in a daemon thread rather than the loop's default executor:
+    asyncio.run() joins that executor on exit, so Ctrl+C at a prompt would
+    hang until Enter was pressed.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def read():
+        try:
+            line = _read_line(prompt)
+        except BaseException as e:
+            callback = functools.partial(deliver, error=e)
+        else:
+            callback = functools.partial(deliver, line)
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass  # Loop already closed (program exiting)
+
+    threading.Thread(target=read, name="stdin-reader", daemon=True).start()
+    return await future
+
+
+def menu_handler(fn):
+    """Report any exception raised by a menu action instead of crashing the menu."""
+    @functools.wraps(fn)
+    async def wrapper():
+        try:
+            return await fn()
+        except Exception as e:
+            print(f"\n❌ Erreur : {e}")
+            traceback.print_exc()
+    return wrapper
+
+
+@menu_handler
+async def handle_add_interactive():
+    """Ajouter des sources en mode interactif."""
+    print("\n" + "="*80)
+    print("MODE INTERACTIF - Ajout de Sources")
+    print("="*80 + "\n")
+    print("💡 Exemples de prompts :")
+    print("   - 'FastAPI tutorials'")
+    print("   - 'Python async programming'")
+    print("   - 'https://docs.python.org'")
+    print("   - 'https://github.com/user/repo'")
+    print()
+
+    user_input = (await ainput("Entrez votre prompt ou URL : ")).strip()
+
+    if user_input:
+        try:
+            result = get_rag().add_sources(user_input, interactive=True)
+            print(f"\n✅ Terminé !")
+            print(f"   URLs ajoutées : {result.get('urls_added', 0)}")
+            print(f"   URLs ignorées : {result.get('urls_skipped', 0)}")
+        except Exception as e:
+            print(f"\n❌ Erreur : {e}")
+    else:
+        print("\n⚠️  Aucun input fourni")
+
+
+@menu_handler
+async def handle_add_direct():
+    """Ajouter des sources en mode direct."""
+    print("\n" + "="*80)
+    print("MODE DIRECT - Ajout de Sources")
+    print("="*80 + "\n")
 
+    user_input = (await ainput("Entrez votre prompt ou URLs : ")).strip()
+
+    if user_input:
+        try:
+            result = get_rag().add_sources(user_input, interactive=False)
+            print(f"\n✅ URLs ajoutées : {result.get('urls_added', 0)}")
+            print(f"   URLs ignorées : {result.get('urls_skipped', 0)}")
+        except Exception as e:
+            print(f"\n❌ Erreur : {e}")
+    else:
+        print("\n⚠️  Aucun input fourni")
 
-async def main():
-    """Test interactif du système RAG."""
 
+@menu_handler
+async def handle_process_queue():
+    """Processer la file d'attente."""
     print("\n" + "="*80)
-    print("🚀 SYSTÈME RAG LOCAL - TEST INTERACTIF")
+    print("PROCESSING DE LA FILE D'ATTENTE")
     print("="*80 + "\n")
 
-    # Initialiser le système
-    print("📦 Initialisation du système...")
-    rag = RAGSystem()
-    print("✅ Système initialisé !\n")
+    max_batches = (await ainput("Nombre de batches (vide = illimité) : ")).strip()
+    max_batches = int(max_batches) if max_batches else None
 
-    while True:
-        print("="*80)
-        print("MENU PRINCIPAL")
-        print("="*80)
-        print()
-        print("=== SOURCES ===")
-        print("1. 🔍 Ajouter sources (mode interactif)")
-        print("2. 📝 Ajouter sources (direct)")
-        print("3. ⚙️  Processer la file d'attente")
-        print("4. 🔎 Rechercher dans la base")
+    print("\n⏳ Processing en cours...\n")
+
+    result = await get_rag().process_queue(max_batches=max_batches)
+    print(f"\n✅ Processing terminé !")
+    print(f"   URLs traitées   : {result['total_processed']}")
+    print(f"   Succès          : {result['total_succeeded']}")
+    print(f"   Échecs          : {result['total_failed']}")
+
+
+@menu_handler
+async def handle_search():
+    """Recherche sémantique dans la base."""
+    print("\n" + "="*80)
+    print("RECHERCHE SÉMANTIQUE")
+    print("="*80 + "\n")
+
+    query = (await ainput("Votre question : ")).strip()
+
+    if query:
+        n_results = (await ainput("Nombre de résultats (défaut: 5) : ")).strip()
+        n_results = int(n_results) if n_results else 5
+
+        print(f"\n🔍 Recherche en cours...\n")
+
+        results = get_rag().search(query, n_results=n_results)
+
+        if results['documents'] and len(results['documents'][0]) > 0:
+            print(f"✅ Trouvé {len(results['documents'][0])} résultats pertinents :\n")
+
+            # Get similarities if available
+            similarities = (results.get('similarities') or [None])[0] or []
+
+            blocks = [
+                format_result(i, doc, meta, similarities[i-1] if i <= len(similarities) else None)
+                for i, (doc, meta) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1)
+            ]
+            sys.stdout.write("".join(blocks))
+
+        else:
+            print("⚠️  Aucun résultat pertinent trouvé")
+            print("   Causes possibles :")
+            print("   - La base de données ne contient pas d'informations sur ce sujet")
+            print("   - Les résultats étaient trop peu pertinents (score < seuil)")
+            print("   - Ajoutez des sources liées à votre recherche avec Option 1-4")
+    else:
+        print("\n⚠️  Aucune question fournie")
+
+
+@menu_handler
+async def handle_stats():
+    """Afficher les statistiques du système."""
+    print("\n" + "="*80)
+    print("STATISTIQUES DU SYSTÈME")
+    print("="*80 + "\n")
+
+    try:
+        stats = get_rag().get_stats()
+
+        print("📊 BASE DE DONNÉES (SQLite) :")
+        db_stats = stats['database']
+        print(f"   Total URLs       : {db_stats['total']}")
+        print(f"   Pending          : {db_stats['pending']}")
+        print(f"   Scraped          : {db_stats['scraped']}")
+        print(f"   Failed           : {db_stats['failed']}")
         print()
-        print("=== SYSTÈME ===")
-        print("5. 📊 Statistiques système")
-        print("6. 📊 Brave Search quota")
-        print("7. ⏰ Configuration auto-refresh")
-        print("8. 🗑️  Vider la file d'attente")
-        print("9. 🗑️  Reset database (ADMIN)")
+
+        print("🔢 VECTOR STORE (ChromaDB) :")
+        vs_stats = stats['vector_store']
+        print(f"   Total chunks     : {vs_stats['total_chunks']}")
         print()
-        print("10. ❌ Quitter")
+
+        if db_stats.get('by_type'):
+            print("📁 PAR TYPE DE SOURCE :")
+            for source_type, count in db_stats['by_type'].items():
+                print(f"   {source_type:20s}: {count:4d}")
+
+        # Info message if database is empty
+        if db_stats['total'] == 0 and vs_stats['total_chunks'] == 0:
+            print("\nℹ️  La base de données est vide")
+            print("   Utilisez l'option 1 ou 2 pour ajouter des sources\n")
+
+    except Exception as e:
+        print(f"\n❌ Erreur lors de la récupération des statistiques")
+        if "does not exist" in str(e).lower():
+            print("ℹ️  La base de données est vide ou vient d'être réinitialisée")
+            print("   Ajoutez des sources pour voir des statistiques\n")
+        else:
+            print(f"   Détails : {e}\n")
+
+
+@menu_handler
+async def handle_brave_quota():
+    """Afficher le quota Brave Search."""
+    print("\n" + "="*80)
+    print("BRAVE SEARCH API - RATE LIMIT")
+    print("="*80 + "\n")
+
+    from utils.rate_limit_tracker import RateLimitTracker
+    from config import settings
+
+    tracker = RateLimitTracker()
+    status = tracker.get_rate_limit_status(daily_quota=settings.brave_daily_quota)
+
+    # Status icon
+    if status['usage_percent'] < 50:
+        status_icon = "✅"
+    elif status['usage_percent'] < 80:
+        status_icon = "⚠️ "
+    else:
+        status_icon = "🔴"
+
+    print(f"{status_icon} QUOTA STATUS")
+    print()
+    print(f"   Daily quota      : {status['daily_quota']:4d} queries")
+    print(f"   Used today       : {status['queries_used']:4d}")
+    print(f"   Remaining        : {status['queries_remaining']:4d} ({100 - status['usage_percent']:.1f}%)")
+    print(f"   Reset in         : {status['reset_in_hours']}h {status['reset_in_minutes']}min")
+    print()
+
+    print(f"📈 PERFORMANCE")
+    print()
+    print(f"   Success rate     : {status['queries_success']:4d} / {status['queries_used']:4d}")
+    print(f"   Failed           : {status['queries_failed']:4d}")
+    print(f"   Avg response     : {status['avg_response_time_ms']:4d} ms")
+    print()
+
+    # Recent queries
+    print(f"📋 RECENT QUERIES (Last 5)")
+    print()
+    recent = tracker.get_recent_queries(limit=5)
+    if recent:
+        for i, query_info in enumerate(recent, 1):
+            timestamp = query_info['timestamp']
+            query_text = query_info['query'][:50]
+            success_icon = "✅" if query_info['success'] else "❌"
+            print(f"   {i}. {success_icon} [{timestamp}] {query_text}")
+    else:
+        print("   Aucune requête enregistrée")
+
+    # Warning if quota high
+    if status['usage_percent'] >= 80:
         print()
+        print("⚠️  WARNING: 80%+ du quota utilisé !")
+        print("   Considérez limiter les recherches pour aujourd'hui.")
 
-        choice = input("Votre choix (1-10) : ").strip()
-
-        if choice == "1":
-            # Mode interactif
-            print("\n" + "="*80)
-            print("MODE INTERACTIF - Ajout de Sources")
-            print("="*80 + "\n")
-            print("💡 Exemples de prompts :")
-            print("   - 'FastAPI tutorials'")
-            print("   - 'Python async programming'")
-            print("   - 'https://docs.python.org'")
-            print("   - 'https://github.com/user/repo'")
-            print()
 
-            user_input = input("Entrez votre prompt ou URL : ").strip()
+@menu_handler
+async def handle_auto_refresh():
+    """Configurer l'auto-refresh."""
+    print("\n" + "="*80)
+    print("AUTO-REFRESH CONFIGURATION")
+    print("="*80 + "\n")
 
-            if user_input:
-                try:
-                    result = rag.add_sources(user_input, interactive=True)
-                    print(f"\n✅ Terminé !")
-                    print(f"   URLs ajoutées : {result.get('urls_added', 0)}")
-                    print(f"   URLs ignorées : {result.get('urls_skipped', 0)}")
-                except Exception as e:
-                    print(f"\n❌ Erreur : {e}")
-            else:
-                print("\n⚠️  Aucun input fourni")
-
-        elif choice == "2":
-            # Mode direct
-            print("\n" + "="*80)
-            print("MODE DIRECT - Ajout de Sources")
-            print("="*80 + "\n")
-
-            user_input = input("Entrez votre prompt ou URLs : ").strip()
-
-            if user_input:
-                try:
-                    result = rag.add_sources(user_input, interactive=False)
-                    print(f"\n✅ URLs ajoutées : {result.get('urls_added', 0)}")
-                    print(f"   URLs ignorées : {result.get('urls_skipped', 0)}")
-                except Exception as e:
-                    print(f"\n❌ Erreur : {e}")
-            else:
-                print("\n⚠️  Aucun input fourni")
-
-        elif choice == "3":
-            # Processer la queue
-            print("\n" + "="*80)
-            print("PROCESSING DE LA FILE D'ATTENTE")
-            print("="*80 + "\n")
-
-            max_batches = input("Nombre de batches (vide = illimité) : ").strip()
-            max_batches = int(max_batches) if max_batches else None
-
-            print("\n⏳ Processing en cours...\n")
-
-            try:
-                result = await rag.process_queue(max_batches=max_batches)
-                print(f"\n✅ Processing terminé !")
-                print(f"   URLs traitées   : {result['total_processed']}")
-                print(f"   Succès          : {result['total_succeeded']}")
-                print(f"   Échecs          : {result['total_failed']}")
-            except Exception as e:
-                print(f"\n❌ Erreur : {e}")
-                import traceback
-                traceback.print_exc()
-
-        elif choice == "4":
-            # Rechercher
-            print("\n" + "="*80)
-            print("RECHERCHE SÉMANTIQUE")
-            print("="*80 + "\n")
-
-            query = input("Votre question : ").strip()
-
-            if query:
-                n_results = input("Nombre de résultats (défaut: 5) : ").strip()
-                n_results = int(n_results) if n_results else 5
-
-                print(f"\n🔍 Recherche en cours...\n")
-
-                try:
-                    results = rag.search(query, n_results=n_results)
-
-                    if results['documents'] and len(results['documents'][0]) > 0:
-                        print(f"✅ Trouvé {len(results['documents'][0])} résultats pertinents :\n")
-
-                        # Get similarities if available
-                        similarities = results.get('similarities', [[]] * len(results['documents']))[0]
-                        distances = results.get('distances', [[]] * len(results['documents']))[0]
-
-                        for i, (doc, meta) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
-                            print("─" * 80)
-                            print(f"RÉSULTAT #{i}")
-                            print("─" * 80)
-
-                            source = meta.get('source_url', 'N/A')
-                            if len(source) > 70:
-                                source = source[:70] + "..."
-
-                            print(f"📄 Source    : {source}")
-                            print(f"🏷️  Type      : {meta.get('source_type', 'N/A')}")
-
-                            # Display similarity score if available
-                            if similarities and i <= len(similarities):
-                                similarity_score = similarities[i-1]
-                                similarity_percent = similarity_score * 100
-
-                                # Color-code based on similarity
-                                # Adjusted thresholds for semantic search (lower is more realistic)
-                                if similarity_percent >= 65:
-                                    indicator = "🟢 Excellente"
-                                elif similarity_percent >= 50:
-                                    indicator = "🟡 Bonne"
-                                elif similarity_percent >= 35:
-                                    indicator = "🟠 Moyenne"
-                                else:
-                                    indicator = "🔴 Faible"
-
-                                print(f"⚡ Pertinence: {indicator} ({similarity_percent:.1f}%)")
-
-                            # Handle metadata that may be stored as comma-separated strings
-                            topics = meta.get('topics', '')
-                            if isinstance(topics, str):
-                                # Already a comma-separated string from ChromaDB
-                                topics_display = topics.split(', ')[:3]
-                                topics_str = ', '.join(topics_display) if topics_display else ''
-                            elif isinstance(topics, list):
-                                topics_str = ', '.join(topics[:3])
-                            else:
-                                topics_str = ''
-
-                            keywords = meta.get('keywords', '')
-                            if isinstance(keywords, str):
-                                # Already a comma-separated string from ChromaDB
-                                keywords_display = keywords.split(', ')[:5]
-                                keywords_str = ', '.join(keywords_display) if keywords_display else ''
-                            elif isinstance(keywords, list):
-                                keywords_str = ', '.join(keywords[:5])
-                            else:
-                                keywords_str = ''
-
-                            print(f"📌 Topics    : {topics_str}")
-                            print(f"🔑 Keywords  : {keywords_str}")
-                            print(f"📊 Difficulty: {meta.get('difficulty', 'N/A')}")
-                            print()
-                            print(f"📝 Résumé : {meta.get('summary', 'N/A')}")
-                            print()
-                            print(f"💬 Contenu (extrait) :")
-                            content_preview = doc[:300] + "..." if len(doc) > 300 else doc
-                            print(f"   {content_preview}")
-                            print()
-
-                    else:
-                        print("⚠️  Aucun résultat pertinent trouvé")
-                        print("   Causes possibles :")
-                        print("   - La base de données ne contient pas d'informations sur ce sujet")
-                        print("   - Les résultats étaient trop peu pertinents (score < seuil)")
-                        print("   - Ajoutez des sources liées à votre recherche avec Option 1-4")
-
-                except Exception as e:
-                    print(f"\n❌ Erreur : {e}")
-                    import traceback
-                    traceback.print_exc()
+    from utils.state_manager import StateManager
+
+    state = StateManager()
+    enabled = state.get_auto_refresh_status()
+    schedule = state.get_refresh_schedule()
+    last_toggle = state.get_last_toggle_time()
+
+    # Status
+    status_icon = "✅ ENABLED" if enabled else "❌ DISABLED"
+    print(f"📊 STATUS")
+    print()
+    print(f"   Auto-refresh     : {status_icon}")
+    print(f"   Schedule         : {schedule}")
+
+    # Try to get next run time if enabled
+    if enabled:
+        try:
+            next_run = get_scheduler().get_next_run_time()
+            print(f"   Next refresh     : {next_run}")
+        except:
+            print(f"   Next refresh     : (scheduler not running)")
+
+    if last_toggle:
+        print(f"   Last toggle      : {last_toggle}")
+
+    print()
+
+    # Options
+    sys.stdout.write(REFRESH_MENU_TEXT)
+
+    sub_choice = (await ainput("Votre choix : ")).strip()
+
+    if sub_choice == "1":
+        # Toggle
+        print()
+        confirmation = (await ainput(f"{'Désactiver' if enabled else 'Activer'} auto-refresh ? (o/n) : ")).strip().lower()
+
+        if confirmation in ['o', 'oui', 'y', 'yes']:
+            new_state = state.toggle_auto_refresh()
+
+            if new_state:
+                print("\n✅ Auto-refresh ACTIVÉ !")
+                print("   Le scheduler vérifiera les sources selon le planning.")
             else:
-                print("\n⚠️  Aucune question fournie")
-
-        elif choice == "5":
-            # Statistiques
-            print("\n" + "="*80)
-            print("STATISTIQUES DU SYSTÈME")
-            print("="*80 + "\n")
-
-            try:
-                stats = rag.get_stats()
-
-                print("📊 BASE DE DONNÉES (SQLite) :")
-                db_stats = stats['database']
-                print(f"   Total URLs       : {db_stats['total']}")
-                print(f"   Pending          : {db_stats['pending']}")
-                print(f"   Scraped          : {db_stats['scraped']}")
-                print(f"   Failed           : {db_stats['failed']}")
-                print()
+                print("\n✅ Auto-refresh DÉSACTIVÉ !")
+                print("   Le scheduler ne fera plus de refresh automatique.")
+        else:
+            print("\n⚠️  Opération annulée")
 
-                print("🔢 VECTOR STORE (ChromaDB) :")
-                vs_stats = stats['vector_store']
-                print(f"   Total chunks     : {vs_stats['total_chunks']}")
-                print()
 
-                if db_stats.get('by_type'):
-                    print("📁 PAR TYPE DE SOURCE :")
-                    for source_type, count in db_stats['by_type'].items():
-                        print(f"   {source_type:20s}: {count:4d}")
-
-                # Info message if database is empty
-                if db_stats['total'] == 0 and vs_stats['total_chunks'] == 0:
-                    print("\nℹ️  La base de données est vide")
-                    print("   Utilisez l'option 1 ou 2 pour ajouter des sources\n")
-
-            except Exception as e:
-                print(f"\n❌ Erreur lors de la récupération des statistiques")
-                if "does not exist" in str(e).lower():
-                    print("ℹ️  La base de données est vide ou vient d'être réinitialisée")
-                    print("   Ajoutez des sources pour voir des statistiques\n")
-                else:
-                    print(f"   Détails : {e}\n")
-
-        elif choice == "6":
-            # Brave Search quota
-            print("\n" + "="*80)
-            print("BRAVE SEARCH API - RATE LIMIT")
-            print("="*80 + "\n")
-
-            try:
-                from utils.rate_limit_tracker import RateLimitTracker
-                from config import settings
-
-                tracker = RateLimitTracker()
-                status = tracker.get_rate_limit_status(daily_quota=settings.brave_daily_quota)
-
-                # Status icon
-                if status['usage_percent'] < 50:
-                    status_icon = "✅"
-                elif status['usage_percent'] < 80:
-                    status_icon = "⚠️ "
-                else:
-                    status_icon = "🔴"
-
-                print(f"{status_icon} QUOTA STATUS")
-                print()
-                print(f"   Daily quota      : {status['daily_quota']:4d} queries")
-                print(f"   Used today       : {status['queries_used']:4d}")
-                print(f"   Remaining        : {status['queries_remaining']:4d} ({100 - status['usage_percent']:.1f}%)")
-                print(f"   Reset in         : {status['reset_in_hours']}h {status['reset_in_minutes']}min")
-                print()
+@menu_handler
+async def handle_clear_queue():
+    """Vider la file d'attente."""
+    print("\n" + "="*80)
+    print("VIDER LA FILE D'ATTENTE")
+    print("="*80 + "\n")
 
-                print(f"📈 PERFORMANCE")
-                print()
-                print(f"   Success rate     : {status['queries_success']:4d} / {status['queries_used']:4d}")
-                print(f"   Failed           : {status['queries_failed']:4d}")
-                print(f"   Avg response     : {status['avg_response_time_ms']:4d} ms")
-                print()
+    from database import URLDatabase
 
-                # Recent queries
-                print(f"📋 RECENT QUERIES (Last 5)")
-                print()
-                recent = tracker.get_recent_queries(limit=5)
-                if recent:
-                    for i, query_info in enumerate(recent, 1):
-                        timestamp = query_info['timestamp']
-                        query_text = query_info['query'][:50]
-                        success_icon = "✅" if query_info['success'] else "❌"
-                        print(f"   {i}. {success_icon} [{timestamp}] {query_text}")
-                else:
-                    print("   Aucune requête enregistrée")
-
-                # Warning if quota high
-                if status['usage_percent'] >= 80:
-                    print()
-                    print("⚠️  WARNING: 80%+ du quota utilisé !")
-                    print("   Considérez limiter les recherches pour aujourd'hui.")
-
-            except Exception as e:
-                print(f"❌ Erreur : {e}")
-                import traceback
-                traceback.print_exc()
-
-        elif choice == "7":
-            # Auto-refresh configuration
-            print("\n" + "="*80)
-            print("AUTO-REFRESH CONFIGURATION")
-            print("="*80 + "\n")
-
-            try:
-                from utils.state_manager import StateManager
-                from scheduler.refresh_scheduler import RefreshScheduler
-
-                state = StateManager()
-                enabled = state.get_auto_refresh_status()
-                schedule = state.get_refresh_schedule()
-                last_toggle = state.get_last_toggle_time()
-
-                # Status
-                status_icon = "✅ ENABLED" if enabled else "❌ DISABLED"
-                print(f"📊 STATUS")
-                print()
-                print(f"   Auto-refresh     : {status_icon}")
-                print(f"   Schedule         : {schedule}")
+    url_db = URLDatabase()
+    stats = url_db.get_stats()
 
-                # Try to get next run time if enabled
-                if enabled:
-                    try:
-                        scheduler = RefreshScheduler()
-                        next_run = scheduler.get_next_run_time()
-                        print(f"   Next refresh     : {next_run}")
-                    except:
-                        print(f"   Next refresh     : (scheduler not running)")
+    print("📊 ÉTAT ACTUEL DE LA FILE :")
+    print()
+    print(f"   Pending          : {stats['pending']} URLs")
+    print(f"   Failed           : {stats['failed']} URLs")
+    print(f"   Scraped (gardés) : {stats['scraped']} URLs")
+    print()
 
-                if last_toggle:
-                    print(f"   Last toggle      : {last_toggle}")
+    if stats['pending'] == 0 and stats['failed'] == 0:
+        print("✅ La file d'attente est déjà vide !")
+    else:
+        sys.stdout.write(CLEAR_QUEUE_MENU_TEXT)
 
-                print()
+        sub_choice = (await ainput("Votre choix : ")).strip()
 
-                # Options
-                print("OPTIONS :")
-                print()
-                print("   [1] Toggle ON/OFF")
-                print("   [2] Retour au menu")
-                print()
+        if sub_choice in ["1", "2", "3"]:
+            filter_map = {
+                "1": "pending",
+                "2": "failed",
+                "3": "all"
+            }
+            status_filter = filter_map[sub_choice]
 
-                sub_choice = input("Votre choix : ").strip()
+            print()
+            confirmation = (await ainput("⚠️  Confirmer la suppression ? (o/n) : ")).strip().lower()
 
-                if sub_choice == "1":
-                    # Toggle
-                    print()
-                    confirmation = input(f"{'Désactiver' if enabled else 'Activer'} auto-refresh ? (o/n) : ").strip().lower()
+            if confirmation in ['o', 'oui', 'y', 'yes']:
+                deleted_count = url_db.clear_queue(status_filter=status_filter)
 
-                    if confirmation in ['o', 'oui', 'y', 'yes']:
-                        new_state = state.toggle_auto_refresh()
+                print(f"\n✅ {deleted_count} URLs supprimées de la file d'attente !")
+            else:
+                print("\n⚠️  Opération annulée")
+        elif sub_choice == "4":
+            print("\n⚠️  Opération annulée")
+        else:
+            print("\n⚠️  Choix invalide")
 
-                        if new_state:
-                            print("\n✅ Auto-refresh ACTIVÉ !")
-                            print("   Le scheduler vérifiera les sources selon le planning.")
-                        else:
-                            print("\n✅ Auto-refresh DÉSACTIVÉ !")
-                            print("   Le scheduler ne fera plus de refresh automatique.")
-                    else:
-                        print("\n⚠️  Opération annulée")
+    url_db.close()
 
-            except Exception as e:
-                print(f"❌ Erreur : {e}")
-                import traceback
-                traceback.print_exc()
 
-        elif choice == "8":
-            # Vider la file d'attente
-            print("\n" + "="*80)
-            print("VIDER LA FILE D'ATTENTE")
-            print("="*80 + "\n")
+@menu_handler
+async def handle_reset_database():
+    """Reset database (ADMIN)."""
+    print("\n" + "="*80)
+    print("🔴 RESET DATABASE (ADMIN - DESTRUCTIF)")
+    print("="*80 + "\n")
 
-            try:
-                from database import URLDatabase
+    from database.reset_manager import ResetManager
 
-                url_db = URLDatabase()
-                stats = url_db.get_stats()
+    reset_mgr = ResetManager()
+    sizes = reset_mgr.get_database_sizes()
 
-                print("📊 ÉTAT ACTUEL DE LA FILE :")
-                print()
-                print(f"   Pending          : {stats['pending']} URLs")
-                print(f"   Failed           : {stats['failed']} URLs")
-                print(f"   Scraped (gardés) : {stats['scraped']} URLs")
-                print()
+    print("⚠️  WARNING: Cette action va SUPPRIMER TOUTES LES DONNÉES !")
+    print()
+    print("📊 TAILLES DES DATABASES :")
+    print()
+    print(f"   SQLite   : {sizes['sqlite_size_mb']:.2f} MB ({sizes['sqlite_url_count']} URLs)")
+    print(f"   ChromaDB : {sizes['chroma_size_mb']:.2f} MB ({sizes['chroma_chunk_count']} chunks)")
+    print(f"   TOTAL    : {sizes['total_size_mb']:.2f} MB")
+    print()
 
-                if stats['pending'] == 0 and stats['failed'] == 0:
-                    print("✅ La file d'attente est déjà vide !")
-                else:
-                    print("OPTIONS :")
-                    print()
-                    print("   [1] Vider PENDING seulement")
-                    print("   [2] Vider FAILED seulement")
-                    print("   [3] Vider PENDING + FAILED")
-                    print("   [4] Annuler")
-                    print()
-
-                    sub_choice = input("Votre choix : ").strip()
-
-                    if sub_choice in ["1", "2", "3"]:
-                        filter_map = {
-                            "1": "pending",
-                            "2": "failed",
-                            "3": "all"
-                        }
-                        status_filter = filter_map[sub_choice]
-
-                        print()
-                        confirmation = input("⚠️  Confirmer la suppression ? (o/n) : ").strip().lower()
-
-                        if confirmation in ['o', 'oui', 'y', 'yes']:
-                            deleted_count = url_db.clear_queue(status_filter=status_filter)
-
-                            print(f"\n✅ {deleted_count} URLs supprimées de la file d'attente !")
-                        else:
-                            print("\n⚠️  Opération annulée")
-                    elif sub_choice == "4":
-                        print("\n⚠️  Opération annulée")
-                    else:
-                        print("\n⚠️  Choix invalide")
-
-                url_db.close()
-
-            except Exception as e:
-                print(f"❌ Erreur : {e}")
-                import traceback
-                traceback.print_exc()
-
-        elif choice == "9":
-            # Reset database (ADMIN)
-            print("\n" + "="*80)
-            print("🔴 RESET DATABASE (ADMIN - DESTRUCTIF)")
-            print("="*80 + "\n")
-
-            try:
-                from database.reset_manager import ResetManager
-
-                reset_mgr = ResetManager()
-                sizes = reset_mgr.get_database_sizes()
-
-                print("⚠️  WARNING: Cette action va SUPPRIMER TOUTES LES DONNÉES !")
-                print()
-                print("📊 TAILLES DES DATABASES :")
+    print("✅ Un backup automatique sera créé avant le reset.")
+    print()
+
+    # Step 1: First confirmation
+    print("─" * 80)
+    print("ÉTAPE 1/2 : PREMIÈRE CONFIRMATION")
+    print("─" * 80)
+    print()
+    confirm1 = (await ainput("Tapez 'DELETE' pour continuer : ")).strip()
+
+    if confirm1 == "DELETE":
+        # Step 2: Date confirmation
+        print()
+        print("─" * 80)
+        print("ÉTAPE 2/2 : CONFIRMATION FINALE")
+        print("─" * 80)
+        print()
+        today = datetime.now().strftime('%Y-%m-%d')
+        print(f"Tapez la date d'aujourd'hui ({today}) pour confirmer le reset :")
+        confirm2 = (await ainput("Date : ")).strip()
+
+        if confirm2 == today:
+            # Perform reset
+            print()
+            print("🔄 Création du backup...")
+
+            result = reset_mgr.reset_all(create_backup=True)
+
+            if result['success']:
                 print()
-                print(f"   SQLite   : {sizes['sqlite_size_mb']:.2f} MB ({sizes['sqlite_url_count']} URLs)")
-                print(f"   ChromaDB : {sizes['chroma_size_mb']:.2f} MB ({sizes['chroma_chunk_count']} chunks)")
-                print(f"   TOTAL    : {sizes['total_size_mb']:.2f} MB")
+                print("✅ RESET TERMINÉ AVEC SUCCÈS !")
                 print()
-
-                print("✅ Un backup automatique sera créé avant le reset.")
+                print(f"   Backup créé : {result['backup_path']}")
+                print(f"   SQLite reset : {'✅' if result['sqlite_reset'] else '❌'}")
+                print(f"   ChromaDB reset : {'✅' if result['chromadb_reset'] else '❌'}")
                 print()
-
-                # Step 1: First confirmation
-                print("─" * 80)
-                print("ÉTAPE 1/2 : PREMIÈRE CONFIRMATION")
-                print("─" * 80)
+                print("📊 Toutes les données ont été supprimées.")
+                print("💾 Un backup est disponible pour restauration si besoin.")
+            else:
                 print()
-                confirm1 = input("Tapez 'DELETE' pour continuer : ").strip()
-
-                if confirm1 == "DELETE":
-                    # Step 2: Date confirmation
-                    print()
-                    print("─" * 80)
-                    print("ÉTAPE 2/2 : CONFIRMATION FINALE")
-                    print("─" * 80)
-                    print()
-                    today = datetime.now().strftime('%Y-%m-%d')
-                    print(f"Tapez la date d'aujourd'hui ({today}) pour confirmer le reset :")
-                    confirm2 = input("Date : ").strip()
-
-                    if confirm2 == today:
-                        # Perform reset
-                        print()
-                        print("🔄 Création du backup...")
-
-                        result = reset_mgr.reset_all(create_backup=True)
-
-                        if result['success']:
-                            print()
-                            print("✅ RESET TERMINÉ AVEC SUCCÈS !")
-                            print()
-                            print(f"   Backup créé : {result['backup_path']}")
-                            print(f"   SQLite reset : {'✅' if result['sqlite_reset'] else '❌'}")
-                            print(f"   ChromaDB reset : {'✅' if result['chromadb_reset'] else '❌'}")
-                            print()
-                            print("📊 Toutes les données ont été supprimées.")
-                            print("💾 Un backup est disponible pour restauration si besoin.")
-                        else:
-                            print()
-                            print(f"❌ ÉCHEC DU RESET : {result.get('error', 'Unknown error')}")
-
-                            if result['backup_created']:
-                                print(f"✅ Backup créé : {result['backup_path']}")
-                                print("⚠️  Les données n'ont PAS été modifiées (échec du reset).")
-                    else:
-                        print("\n⚠️  Date incorrecte - reset annulé")
-                else:
-                    print("\n⚠️  Confirmation incorrecte - reset annulé")
-
-            except Exception as e:
-                print(f"❌ Erreur : {e}")
-                import traceback
-                traceback.print_exc()
-
-        elif choice == "10":
-            # Quitter
-            print("\n👋 Au revoir !\n")
-            rag.close()
-            break
+                print(f"❌ ÉCHEC DU RESET : {result.get('error', 'Unknown error')}")
 
+                if result['backup_created']:
+                    print(f"✅ Backup créé : {result['backup_path']}")
+                    print("⚠️  Les données n'ont PAS été modifiées (échec du reset).")
         else:
+            print("\n⚠️  Date incorrecte - reset annulé")
+    else:
+        print("\n⚠️  Confirmation incorrecte - reset annulé")
+
+
+async def handle_quit():
+    """Quitter en libérant les ressources ouvertes."""
+    print("\n👋 Au revoir !\n")
+    if _rag is not None:
+        _rag.close()
+    if _scheduler is not None:
+        await _scheduler.aclose()
+    return "quit"
+
+
+DISPATCH = {
+    "1": handle_add_interactive,
+    "2": handle_add_direct,
+    "3": handle_process_queue,
+    "4": handle_search,
+    "5": handle_stats,
+    "6": handle_brave_quota,
+    "7": handle_auto_refresh,
+    "8": handle_clear_queue,
+    "9": handle_reset_database,
+    "10": handle_quit,
+}
+
+
+async def main():
+    """Test interactif du système RAG."""
+
+    print("\n" + "="*80)
+    print("🚀 SYSTÈME RAG LOCAL - TEST INTERACTIF")
+    print("="*80 + "\n")
+
+    while True:
+        sys.stdout.write(MENU_TEXT)
+
+        choice = (await ainput("Votre choix (1-10) : ")).strip()
+
+        handler = DISPATCH.get(choice)
+        if handler is None:
             print("\n⚠️  Choix invalide (utilisez 1-10)\n")
+        elif await handler() == "quit":
+            break
 
         print()
-        input("Appuyez sur Entrée pour continuer...")
+        await ainput("Appuyez sur Entrée pour continuer...")
         print()
 
 
 if __name__ == "__main__":
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -538,6 +658,5 @@ if __name__ == "__main__":
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ ERREUR : {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
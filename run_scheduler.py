@@ -9,33 +9,28 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from scheduler import RefreshScheduler
 from utils import log
+from utils.event_loop import install_uvloop
 
 
-# Global scheduler instance
-scheduler = None
-
-
-def signal_handler(sig, frame):
-    """Handle shutdown signals gracefully."""
-    log.info("Received shutdown signal")
-    if scheduler:
-        scheduler.close()
-    sys.exit(0)
+BANNER = "\n".join(["=" * 60, "RAG System - Refresh Scheduler Service", "=" * 60])
 
 
 async def main():
-    """Run the scheduler."""
-    global scheduler
+    """Run the scheduler until SIGINT/SIGTERM is received."""
+    from scheduler import RefreshScheduler
 
-    log.info("="*60)
-    log.info("RAG System - Refresh Scheduler Service")
-    log.info("="*60)
+    log.info(BANNER)
 
-    # Register signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Park on an event instead of polling; signals just set it
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows event loops have no add_signal_handler
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop_event.set))
 
     # Initialize scheduler
     scheduler = RefreshScheduler()
@@ -47,14 +42,14 @@ async def main():
     log.info(f"   Schedule: {scheduler.scheduler.get_jobs()[0].trigger if scheduler.scheduler.get_jobs() else 'N/A'}")
     log.info(f"   Press Ctrl+C to stop\n")
 
-    # Keep running
     try:
-        while True:
-            await asyncio.sleep(60)  # Check every minute
-    except KeyboardInterrupt:
-        log.info("\nShutting down...")
-        scheduler.close()
+        await stop_event.wait()
+        log.info("Received shutdown signal")
+    finally:
+        log.info("Shutting down...")
+        await scheduler.aclose()
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
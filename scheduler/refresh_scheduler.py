@@ -2,22 +2,63 @@
 Automatic refresh scheduler for maintaining the knowledge base up-to-date.
 """
 import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-import hashlib
 import aiohttp
 from database import URLDatabase, VectorStore, DiscoveredURL
 from scrapers import YouTubeScraper, GitHubScraper, WebScraper
+from scrapers.browser import close_browser
 from processing import ContentProcessor
 from config import settings
-from utils import log
+from utils import log, compute_content_hash
+from utils.state_manager import StateManager
+
+# Refresh interval per frequency ('never' - but set far future just in case)
+REFRESH_INTERVALS = {
+    'weekly': timedelta(days=7),
+    'monthly': timedelta(days=30),
+    'never': timedelta(days=365*10)
+}
+
+# URLs where:
+# - status = 'scraped' (successfully scraped before)
+# - refresh_frequency != 'never'
+# - next_refresh_at is NULL or <= NOW
+# (served by the idx_refresh index)
+REFRESH_CANDIDATES_SQL = """
+    SELECT * FROM discovered_urls
+    WHERE status = 'scraped'
+      AND refresh_frequency != 'never'
+      AND (next_refresh_at IS NULL OR next_refresh_at <= datetime('now'))
+    ORDER BY priority DESC, last_crawled_at ASC
+    LIMIT 100
+"""
 
 
 class RefreshScheduler:
     """Automatic refresh scheduler for knowledge base maintenance."""
 
+    # Connection pool for the shared HTTP session
+    HTTP_POOL_LIMIT = 64
+    HTTP_POOL_LIMIT_PER_HOST = 2
+    HTTP_DNS_CACHE_TTL = 300  # seconds
+    HTTP_KEEPALIVE_TIMEOUT = 60  # seconds
+
+    # 200 answers to a conditional GET with at most this Content-Length are
+    # read so the connection returns to the pool (aiohttp closes connections
+    # whose body was left unread)
+    HTTP_DRAIN_LIMIT = 256 * 1024  # bytes
+
+    # Back-off applied only to hosts that answer 429 Too Many Requests
+    HOST_BACKOFF_DEFAULT = 10  # seconds, when Retry-After is missing
+    HOST_BACKOFF_MAX = 300  # seconds
+
     def __init__(self):
         """Initialize refresh scheduler."""
         self.url_db = URLDatabase()
@@ -33,21 +74,68 @@ class RefreshScheduler:
         }
 
         # Initialize scheduler
-        self.scheduler = AsyncIOScheduler()
+        # Missed runs collapse into one, and runs never overlap. Which URLs are
+        # due is persisted in discovered_urls.next_refresh_at, so the job
+        # itself can stay in the in-memory jobstore.
+        self.scheduler = AsyncIOScheduler(job_defaults={
+            'coalesce': True,
+            'misfire_grace_time': 3600,
+            'max_instances': 1
+        })
         self.is_running = False
 
+        # Dedicated pool for blocking scrapers (YouTube, GitHub); WebScraper is async
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.refresh_concurrency),
+            thread_name_prefix="refresh"
+        )
+
+        # Shared HTTP session, created on first use inside the event loop
+        self._http_session: Optional[aiohttp.ClientSession] = None
+
+        # url_hash -> running refresh, so concurrent triggers share one scrape
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # host -> monotonic time before which the host should not be contacted
+        self._host_retry_at: Dict[str, float] = {}
+
+        # Runtime toggle/schedule; falls back to settings if the state file is unusable
+        try:
+            self._state: Optional[StateManager] = StateManager()
+        except OSError as e:
+            log.warning(f"State file unavailable, using settings: {e}")
+            self._state = None
+
+        # Parsed cron trigger, reused until the schedule string changes
+        self._trigger: Optional[CronTrigger] = None
+        self._trigger_schedule: Optional[str] = None
+        self._get_trigger(settings.refresh_schedule)
+
         log.info("RefreshScheduler initialized")
 
+    def _get_trigger(self, schedule: str) -> Optional[CronTrigger]:
+        """
+        Get the cron trigger for a schedule, parsing it only when it changes.
+
+        Args:
+            schedule: 5-field crontab expression
+
+        Returns:
+            CronTrigger, or None if the schedule is invalid
+        """
+        if schedule != self._trigger_schedule:
+            try:
+                self._trigger = CronTrigger.from_crontab(schedule)
+            except ValueError as e:
+                log.error(f"Invalid cron schedule: {schedule} ({e})")
+                self._trigger = None
+            self._trigger_schedule = schedule
+        return self._trigger
+
     def start(self):
         """Start the refresh scheduler."""
-        # Check state manager for runtime toggle
-        try:
-            from utils.state_manager import StateManager
-            state = StateManager()
-            enabled = state.get_auto_refresh_status()
-        except:
-            # Fallback to settings
-            enabled = settings.enable_auto_refresh
+        # Check state manager for runtime toggle (fallback to settings)
+        enabled = self._state.get_auto_refresh_status() if self._state else settings.enable_auto_refresh
 
         if not enabled:
             log.info("Auto-refresh disabled")
@@ -55,29 +143,17 @@ class RefreshScheduler:
             return
 
         # Get schedule from state or settings
-        try:
-            from utils.state_manager import StateManager
-            state = StateManager()
-            schedule = state.get_refresh_schedule()
-        except:
-            schedule = settings.refresh_schedule
+        schedule = self._state.get_refresh_schedule() if self._state else settings.refresh_schedule
 
         # Parse cron schedule (default: "0 3 * * 1" = Monday 3 AM)
-        parts = schedule.split()
-        if len(parts) != 5:
-            log.error(f"Invalid cron schedule: {schedule}")
+        trigger = self._get_trigger(schedule)
+        if trigger is None:
             return
 
         # Add refresh job
         self.scheduler.add_job(
             self._refresh_job,
-            trigger=CronTrigger(
-                minute=parts[0],
-                hour=parts[1],
-                day=parts[2],
-                month=parts[3],
-                day_of_week=parts[4]
-            ),
+            trigger=trigger,
             id='refresh_knowledge_base',
             name='Refresh Knowledge Base',
             replace_existing=True
@@ -114,20 +190,32 @@ class RefreshScheduler:
                 'failed': 0
             }
 
-            for url_obj in urls_to_refresh:
-                result = await self._refresh_url(url_obj)
+            # Refresh concurrently; the session's per-host limit spaces out requests
+            semaphore = asyncio.Semaphore(max(1, settings.refresh_concurrency))
+
+            async def refresh(url_obj: DiscoveredURL) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._refresh_url(url_obj)
 
+            results = await asyncio.gather(
+                *(refresh(url_obj) for url_obj in urls_to_refresh),
+                return_exceptions=True
+            )
+
+            db_updates = []
+            for result in results:
                 stats['processed'] += 1
-                if result['success']:
-                    if result['updated']:
-                        stats['updated'] += 1
-                    else:
-                        stats['unchanged'] += 1
-                else:
+                if isinstance(result, Exception) or not result['success']:
                     stats['failed'] += 1
+                    continue
+                if result['updated']:
+                    stats['updated'] += 1
+                else:
+                    stats['unchanged'] += 1
+                db_updates.append(result['db_update'])
 
-                # Small delay between refreshes
-                await asyncio.sleep(2)
+            # Persist all refresh timestamps in one transaction
+            self.url_db.update_refresh_times_many(db_updates)
 
             log.info("="*60)
             log.info(f"Refresh job complete: {stats}")
@@ -136,6 +224,65 @@ class RefreshScheduler:
         except Exception as e:
             log.error(f"Error in refresh job: {e}")
 
+        finally:
+            # Don't keep Chromium idle until the next scheduled run
+            await close_browser()
+
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared HTTP session, creating it if needed.
+
+        Returns:
+            aiohttp ClientSession reused across refreshes
+        """
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.HTTP_POOL_LIMIT,
+                limit_per_host=self.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=self.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=self.HTTP_KEEPALIVE_TIMEOUT
+            )
+            self._http_session = aiohttp.ClientSession(connector=connector)
+        return self._http_session
+
+    async def _close_http_session(self):
+        """Close the shared HTTP session if it is open."""
+        session, self._http_session = self._http_session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def _back_off_host(self, url: str, retry_after: Optional[str]):
+        """
+        Pause further requests to a host that answered 429.
+
+        Args:
+            url: URL that was rate limited
+            retry_after: Retry-After header value (seconds), if any
+        """
+        delay = int(retry_after) if retry_after and retry_after.isdigit() else self.HOST_BACKOFF_DEFAULT
+        delay = min(delay, self.HOST_BACKOFF_MAX)
+        host = urlparse(url).netloc.lower()
+        self._host_retry_at[host] = time.monotonic() + delay
+        log.warning(f"Rate limited by {host} - backing off {delay}s")
+
+    async def _wait_for_host(self, url: str):
+        """
+        Wait out any back-off recorded for the URL's host.
+
+        Args:
+            url: URL about to be requested
+        """
+        host = urlparse(url).netloc.lower()
+        retry_at = self._host_retry_at.get(host)
+        if retry_at is None:
+            return
+
+        wait = retry_at - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        else:
+            self._host_retry_at.pop(host, None)
+
     def _get_urls_needing_refresh(self) -> list:
         """
         Get URLs that need refreshing.
@@ -143,30 +290,39 @@ class RefreshScheduler:
         Returns:
             List of DiscoveredURL objects
         """
-        import sqlite3
-
-        cursor = self.url_db.conn.cursor()
-
-        # Get URLs where:
-        # - status = 'scraped' (successfully scraped before)
-        # - refresh_frequency != 'never'
-        # - next_refresh_at is NULL or <= NOW
-        cursor.execute("""
-            SELECT * FROM discovered_urls
-            WHERE status = 'scraped'
-              AND refresh_frequency != 'never'
-              AND (next_refresh_at IS NULL OR next_refresh_at <= datetime('now'))
-            ORDER BY priority DESC, last_crawled_at ASC
-            LIMIT 100
-        """)
-
-        rows = cursor.fetchall()
-        urls = [self.url_db._row_to_url(row) for row in rows]
+        with self.url_db.pool.connection() as conn:
+            rows = conn.execute(REFRESH_CANDIDATES_SQL).fetchall()
+        urls = [DiscoveredURL.from_row(row) for row in rows]
 
         log.info(f"Found {len(urls)} URLs needing refresh")
         return urls
 
     async def _refresh_url(self, url_obj: DiscoveredURL) -> Dict[str, Any]:
+        """
+        Refresh a single URL, joining a refresh of it that is already running.
+
+        A manual run_refresh_now() overlapping a scheduled run would otherwise
+        scrape the URL twice and race on its chunks.
+
+        Args:
+            url_obj: DiscoveredURL object to refresh
+
+        Returns:
+            Dictionary with refresh result
+        """
+        task = self._inflight.get(url_obj.url_hash)
+        if task is not None:
+            log.debug(f"Refresh already in progress, joining: {url_obj.url}")
+            return await task
+
+        task = asyncio.ensure_future(self._do_refresh(url_obj))
+        self._inflight[url_obj.url_hash] = task
+        try:
+            return await task
+        finally:
+            self._inflight.pop(url_obj.url_hash, None)
+
+    async def _do_refresh(self, url_obj: DiscoveredURL) -> Dict[str, Any]:
         """
         Refresh a single URL.
 
@@ -184,27 +340,25 @@ class RefreshScheduler:
         try:
             # Step 1: Check HTTP headers first (for websites only)
             if source_type == 'website':
-                # Get old chunks to compare headers
-                old_chunks = self.vector_store.get_by_source_url(url)
-                should_scrape = await self._check_http_headers(url, old_chunks)
+                http_check = await self._conditional_get(url, url_obj)
+
+                if not http_check['changed'] or http_check['too_large']:
+                    if http_check['too_large']:
+                        log.warning(f"Website over {settings.max_refresh_bytes} bytes - skipping refresh: {url}")
+                        skipped_reason = 'too_large'
+                    else:
+                        log.info(f"Website unchanged (HTTP headers) - skipping scrape")
+                        skipped_reason = 'unchanged_http_headers'
 
-                if not should_scrape:
-                    log.info(f"Website unchanged (HTTP headers) - skipping scrape")
                     # Update next_refresh_at and return
                     next_refresh = self._calculate_next_refresh(url_obj.refresh_frequency)
-                    cursor = self.url_db.conn.cursor()
-                    cursor.execute("""
-                        UPDATE discovered_urls
-                        SET next_refresh_at = ?
-                        WHERE url_hash = ?
-                    """, (next_refresh, url_obj.url_hash))
-                    self.url_db.conn.commit()
 
                     return {
                         'success': True,
                         'updated': False,
                         'url': url,
-                        'skipped_reason': 'unchanged_http_headers'
+                        'skipped_reason': skipped_reason,
+                        'db_update': (url_obj.url_hash, None, next_refresh, None)
                     }
 
             # Step 2: Scrape new content
@@ -213,7 +367,8 @@ class RefreshScheduler:
                 log.error(f"No scraper for type: {source_type}")
                 return {'success': False, 'updated': False}
 
-            scrape_result = await asyncio.to_thread(scraper.scrape, url)
+            await self._wait_for_host(url)
+            scrape_result = await scraper.scrape_async(url, executor=self._pool)
 
             if not scrape_result or not scrape_result.get('success'):
                 log.warning(f"Failed to scrape {url} during refresh")
@@ -223,21 +378,16 @@ class RefreshScheduler:
             new_content = scrape_result['content']
             new_metadata = scrape_result.get('metadata', {})
 
-            # Get old metadata from vector store
-            old_chunks = self.vector_store.get_by_source_url(url)
-            old_metadata = {}
-
-            if old_chunks['metadatas'] and len(old_chunks['metadatas']) > 0:
-                old_metadata = old_chunks['metadatas'][0]
-
-            # Determine if content changed
+            # Determine if content changed (against validators stored on the URL row)
             content_changed = False
             updated = False
+            validators = {}
 
             # For GitHub repos: check commit hash first (faster than content hash)
             if source_type == 'github':
                 new_commit = new_metadata.get('commit_hash')
-                old_commit = old_metadata.get('commit_hash')
+                old_commit = url_obj.commit_hash
+                validators['commit_hash'] = new_commit
 
                 if new_commit and old_commit and new_commit == old_commit:
                     log.info(f"GitHub repo unchanged (commit: {new_commit[:8]}) - skipping update")
@@ -247,24 +397,38 @@ class RefreshScheduler:
                     content_changed = True
             else:
                 # For other sources: use content hash
-                new_hash = hashlib.md5(new_content.encode('utf-8')).hexdigest()
-                old_hash = old_metadata.get('content_hash')
+                new_hash = compute_content_hash(new_content)
+                old_hash = url_obj.content_hash
                 content_changed = (new_hash != old_hash)
+                validators['content_hash'] = new_hash
+
+            if source_type == 'website':
+                validators['http_last_modified'] = http_check['http_last_modified']
+                validators['http_etag'] = http_check['http_etag']
 
             # Step 3: Update if content changed
-            if content_changed:
+            if content_changed and source_type == 'github':
+                log.info(f"Content changed for {url} - updating changed files...")
+                updated = await self._update_github_files(url_obj, scrape_result)
+                if updated:
+                    validators['file_hashes'] = json.dumps(new_metadata.get('file_hashes') or {})
+                else:
+                    # Keep the old validators so the next refresh retries
+                    validators = {}
+
+            elif content_changed:
                 log.info(f"Content changed for {url} - updating...")
 
                 # Delete old chunks
                 deleted = self.vector_store.delete_by_source_url(url)
                 log.info(f"Deleted {deleted} old chunks")
 
-                # Process new content
-                # Prepare metadata with content hash (for non-GitHub) or commit hash (for GitHub)
+                # Process new content with its content hash
                 process_metadata = {**scrape_result['metadata']}
-                if source_type != 'github':
-                    # Add content hash for non-GitHub sources
-                    process_metadata['content_hash'] = new_hash
+                process_metadata['content_hash'] = new_hash
+                if source_type == 'website':
+                    process_metadata['http_last_modified'] = http_check['http_last_modified']
+                    process_metadata['http_etag'] = http_check['http_etag']
 
                 process_result = await asyncio.to_thread(
                     self.processor.process,
@@ -280,35 +444,88 @@ class RefreshScheduler:
                 else:
                     log.error(f"Failed to process updated content for {url}")
                     updated = False
+                    # Keep the old validators so the next refresh retries
+                    validators = {}
             else:
                 log.info(f"Content unchanged for {url}")
                 updated = False
 
-            # Step 4: Update next_refresh_at
+            # Step 4: Compute next_refresh_at (written by _refresh_job in one batch)
             next_refresh = self._calculate_next_refresh(url_obj.refresh_frequency)
 
-            cursor = self.url_db.conn.cursor()
-            cursor.execute("""
-                UPDATE discovered_urls
-                SET last_crawled_at = ?,
-                    next_refresh_at = ?
-                WHERE url_hash = ?
-            """, (datetime.now(), next_refresh, url_obj.url_hash))
-            self.url_db.conn.commit()
-
             log.info(f"Next refresh scheduled for {next_refresh}")
 
             return {
                 'success': True,
                 'updated': updated,
                 'url': url,
-                'next_refresh': next_refresh
+                'next_refresh': next_refresh,
+                'db_update': (url_obj.url_hash, datetime.now(), next_refresh, validators)
             }
 
         except Exception as e:
             log.error(f"Error refreshing {url}: {e}")
             return {'success': False, 'updated': False}
 
+    async def _update_github_files(self, url_obj: DiscoveredURL, scrape_result: Dict[str, Any]) -> bool:
+        """
+        Re-embed only the files of a GitHub repo that changed since the last refresh.
+
+        Files are diffed by their per-file hashes; chunks of modified and
+        removed files are deleted and only modified/added files are processed.
+        Without stored hashes (first refresh) the whole repo is replaced.
+
+        Args:
+            url_obj: URL row holding the file hashes from the last refresh
+            scrape_result: Fresh scrape result with 'files' and 'file_hashes'
+
+        Returns:
+            True if all changed files were processed successfully
+        """
+        url = url_obj.url
+        metadata = scrape_result['metadata']
+        new_hashes = metadata.get('file_hashes') or {}
+        files = scrape_result.get('files') or []
+        old_hashes = json.loads(url_obj.file_hashes) if url_obj.file_hashes else None
+
+        if old_hashes is None or not files:
+            # No per-file baseline: replace everything
+            deleted = self.vector_store.delete_by_source_url(url)
+            changed_files = files
+        else:
+            changed_paths = {path for path, h in new_hashes.items() if old_hashes.get(path) != h}
+            removed_paths = set(old_hashes) - set(new_hashes)
+            deleted = self.vector_store.delete_by_file_paths(url, sorted(changed_paths | removed_paths))
+            changed_files = [f for f in files if f['path'] in changed_paths]
+            log.info(f"{len(changed_files)} changed, {len(removed_paths)} removed, "
+                     f"{len(files) - len(changed_files)} unchanged files")
+
+        log.info(f"Deleted {deleted} old chunks")
+
+        if not files:
+            # Scraper returned no per-file breakdown: process as one document
+            changed_files = [{'path': '', 'content': scrape_result['content']}]
+
+        chunks_created = 0
+        success = True
+        for file_info in changed_files:
+            process_result = await asyncio.to_thread(
+                self.processor.process,
+                url=url,
+                content=file_info['content'],
+                metadata={**metadata, 'file_path': file_info['path']},
+                source_type='github'
+            )
+            if process_result.get('success'):
+                chunks_created += process_result['chunks_created']
+            else:
+                log.error(f"Failed to process {file_info['path']} for {url}")
+                success = False
+
+        if success:
+            log.info(f"✅ Updated {url}: {chunks_created} new chunks")
+        return success
+
     def _calculate_next_refresh(self, frequency: str) -> datetime:
         """
         Calculate next refresh datetime based on frequency.
@@ -319,15 +536,7 @@ class RefreshScheduler:
         Returns:
             Next refresh datetime
         """
-        now = datetime.now()
-
-        if frequency == 'weekly':
-            return now + timedelta(days=7)
-        elif frequency == 'monthly':
-            return now + timedelta(days=30)
-        else:
-            # 'never' - but set far future just in case
-            return now + timedelta(days=365*10)
+        return datetime.now() + REFRESH_INTERVALS.get(frequency, REFRESH_INTERVALS['never'])
 
     def stop(self):
         """Stop the scheduler."""
@@ -340,63 +549,93 @@ class RefreshScheduler:
         log.info("Manually triggering refresh job...")
         await self._refresh_job()
 
-    async def _check_http_headers(self, url: str, old_chunks: Dict[str, Any]) -> bool:
+    async def _conditional_get(self, url: str, url_obj: DiscoveredURL) -> Dict[str, Any]:
         """
-        Check HTTP headers (Last-Modified, ETag) to see if content changed.
+        Ask the server whether a page changed using a conditional GET.
+
+        The stored Last-Modified/ETag validators are sent as If-Modified-Since/
+        If-None-Match, so an unchanged page costs a 304 with no body. Pages
+        without stored validators can't get a 304, so they only get a HEAD
+        (for fresh validators and Content-Length). Bodies are only drained
+        to keep the connection alive: websites are still scraped with the
+        browser.
 
         Args:
             url: URL to check
-            old_chunks: Old chunks from vector store (contains metadata)
+            url_obj: URL row holding the validators from the last refresh
 
         Returns:
-            True if should scrape (content changed or headers unavailable)
-            False if can skip scraping (content unchanged)
+            Dictionary with 'changed' (True if the page should be scraped) and
+            the current 'http_last_modified' / 'http_etag' validators;
+            'too_large' is set when Content-Length exceeds max_refresh_bytes
         """
+        result = {'changed': True, 'too_large': False, 'http_last_modified': None, 'http_etag': None}
+
         try:
-            # Get old headers from metadata
-            old_metadata = {}
-            if old_chunks.get('metadatas') and len(old_chunks['metadatas']) > 0:
-                old_metadata = old_chunks['metadatas'][0]
-
-            old_last_modified = old_metadata.get('http_last_modified')
-            old_etag = old_metadata.get('http_etag')
-
-            # Make HEAD request to get headers
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url, timeout=aiohttp.ClientTimeout(total=10), allow_redirects=True) as response:
-                    # Get new headers
-                    new_last_modified = response.headers.get('Last-Modified')
-                    new_etag = response.headers.get('ETag')
-
-                    # If we have Last-Modified header
-                    if new_last_modified and old_last_modified:
-                        if new_last_modified == old_last_modified:
-                            log.debug(f"Last-Modified unchanged: {new_last_modified}")
-                            return False  # Skip scraping
-                        else:
-                            log.debug(f"Last-Modified changed: {old_last_modified} → {new_last_modified}")
-                            return True  # Need to scrape
-
-                    # If we have ETag header
-                    if new_etag and old_etag:
-                        if new_etag == old_etag:
-                            log.debug(f"ETag unchanged: {new_etag}")
-                            return False  # Skip scraping
-                        else:
-                            log.debug(f"ETag changed: {old_etag} → {new_etag}")
-                            return True  # Need to scrape
+            old_last_modified = url_obj.http_last_modified
+            old_etag = url_obj.http_etag
+
+            headers = {}
+            if old_last_modified:
+                headers['If-Modified-Since'] = old_last_modified
+            if old_etag:
+                headers['If-None-Match'] = old_etag
+
+            method = 'GET' if headers else 'HEAD'
+
+            await self._wait_for_host(url)
+            session = self._get_http_session()
+            async with session.request(
+                method,
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10),
+                allow_redirects=True
+            ) as response:
+                result['http_last_modified'] = response.headers.get('Last-Modified', old_last_modified)
+                result['http_etag'] = response.headers.get('ETag', old_etag)
+
+                if response.status == 429:
+                    self._back_off_host(url, response.headers.get('Retry-After'))
+
+                if response.status == 304:
+                    log.debug(f"Not modified (304): {url}")
+                    result['changed'] = False
+                    return result
+
+                content_length = response.headers.get('Content-Length')
+                if content_length and content_length.isdigit() and int(content_length) > settings.max_refresh_bytes:
+                    log.debug(f"Content-Length {content_length} over limit: {url}")
+                    result['too_large'] = True
+                    return result
+
+                if method == 'GET':
+                    if content_length and content_length.isdigit() and int(content_length) <= self.HTTP_DRAIN_LIMIT:
+                        await response.read()
+                    else:
+                        response.release()
+
+                # Servers that ignore conditional headers: compare validators
+                new_last_modified = response.headers.get('Last-Modified')
+                new_etag = response.headers.get('ETag')
 
+                if new_last_modified and old_last_modified:
+                    result['changed'] = new_last_modified != old_last_modified
+                elif new_etag and old_etag:
+                    result['changed'] = new_etag != old_etag
+                else:
                     # No useful headers - need to scrape to check content
                     log.debug("No Last-Modified or ETag headers available")
-                    return True
+
+                return result
 
         except asyncio.TimeoutError:
             log.warning(f"Timeout checking HTTP headers for {url}")
-            return True  # On error, scrape anyway
+            return result  # On error, scrape anyway
 
         except Exception as e:
             log.warning(f"Error checking HTTP headers for {url}: {e}")
-            return True  # On error, scrape anyway
+            return result  # On error, scrape anyway
 
     def toggle(self) -> bool:
         """
@@ -405,12 +644,13 @@ class RefreshScheduler:
         Returns:
             True if now enabled, False if now disabled
         """
-        try:
-            from utils.state_manager import StateManager
-            state = StateManager()
+        if self._state is None:
+            log.error("Cannot toggle scheduler: state file unavailable")
+            return self.is_running
 
+        try:
             # Toggle state
-            new_state = state.toggle_auto_refresh()
+            new_state = self._state.toggle_auto_refresh()
 
             if new_state:
                 # Enable: start scheduler
@@ -445,5 +685,19 @@ class RefreshScheduler:
     def close(self):
         """Clean up resources."""
         self.stop()
+
+        # The session can only be closed from inside its event loop
+        if self._http_session is not None and not self._http_session.closed:
+            try:
+                asyncio.get_running_loop().create_task(self._close_http_session())
+            except RuntimeError:
+                log.warning("HTTP session left open: no running event loop")
+
+        self._pool.shutdown(wait=False)
         self.url_db.close()
         log.info("RefreshScheduler closed")
+
+    async def aclose(self):
+        """Clean up resources, closing the HTTP session from the event loop."""
+        await self._close_http_session()
+        self.close()
@@ -1,7 +1,9 @@
 """
 Base scraper class for all specialized scrapers.
 """
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from typing import Dict, Any, Optional
 from utils import log
 
@@ -34,6 +36,23 @@ class BaseScraper(ABC):
         """
         pass
 
+    async def scrape_async(self, url: str, executor: Optional[Executor] = None) -> Optional[Dict[str, Any]]:
+        """
+        Scrape content from a URL without blocking the event loop.
+
+        The default implementation runs the blocking scrape() in an executor.
+        Scrapers that are natively async override this to skip the thread hop.
+
+        Args:
+            url: URL to scrape
+            executor: Executor for blocking scrapers (None = loop default)
+
+        Returns:
+            Same dictionary as scrape()
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.scrape, url)
+
     def _create_result(
         self,
         url: str,
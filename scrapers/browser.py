@@ -0,0 +1,73 @@
+"""
+Shared headless Chromium instance for the Playwright-based scrapers.
+"""
+import asyncio
+import threading
+from typing import Dict, Optional
+from playwright.async_api import async_playwright, Browser
+from utils import log
+
+# Launching Chromium costs several hundred ms, so one browser is kept per
+# event loop and each scrape/crawl opens its own (cheap) context on it.
+# Playwright objects are bound to the loop that created them, so browsers
+# are registered per loop; threads running their own asyncio.run() never
+# see (or close) another loop's instance
+_browsers: Dict[asyncio.AbstractEventLoop, "_LoopBrowser"] = {}
+_browsers_lock = threading.Lock()
+
+
+class _LoopBrowser:
+    """Playwright driver and browser owned by one event loop."""
+
+    def __init__(self):
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.lock = asyncio.Lock()
+
+
+def _entry_for(loop: asyncio.AbstractEventLoop) -> _LoopBrowser:
+    """Return the registry entry for a loop, creating it if needed."""
+    with _browsers_lock:
+        # Drop entries of loops that ended without close_browser()
+        for stale in [other for other in _browsers if other.is_closed()]:
+            del _browsers[stale]
+
+        entry = _browsers.get(loop)
+        if entry is None:
+            entry = _browsers[loop] = _LoopBrowser()
+        return entry
+
+
+async def get_browser() -> Browser:
+    """
+    Return the running loop's shared browser, launching it on first use.
+
+    Returns:
+        Connected Playwright Browser for the running event loop
+    """
+    entry = _entry_for(asyncio.get_running_loop())
+
+    async with entry.lock:
+        if entry.browser is None or not entry.browser.is_connected():
+            if entry.playwright is None:
+                entry.playwright = await async_playwright().start()
+            entry.browser = await entry.playwright.chromium.launch(headless=True)
+            log.debug("Launched shared Chromium browser")
+
+    return entry.browser
+
+
+async def close_browser() -> None:
+    """Close the browser and stop Playwright launched by the running loop, if any."""
+    with _browsers_lock:
+        entry = _browsers.pop(asyncio.get_running_loop(), None)
+    if entry is None:
+        return
+
+    try:
+        if entry.browser is not None:
+            await entry.browser.close()
+        if entry.playwright is not None:
+            await entry.playwright.stop()
+    except Exception as e:
+        log.warning(f"Error closing shared browser: {e}")
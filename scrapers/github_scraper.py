@@ -1,16 +1,55 @@
 """
 GitHub scraper using git clone (no API required).
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from pathlib import Path
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tarfile
 import tempfile
+import time
+import urllib.request
 import shutil
 import subprocess
-from utils import log, extract_github_repo_info
+from concurrent.futures import Executor, ThreadPoolExecutor
+from config import settings
+from utils import log, extract_github_repo_info, compute_content_hash
 from .base_scraper import BaseScraper
 
 
+# Every git call runs with settings suited to a throwaway clone
+_GIT_BASE = [
+    'git',
+    '-c', 'protocol.version=2',
+    '-c', 'gc.auto=0',
+    '-c', 'core.fsmonitor=false',
+    '-c', 'core.untrackedCache=false',
+    '-c', 'fetch.writeCommitGraph=false',
+]
+
+# File extension -> language reported in repo metadata
+_LANG_MAP = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.java': 'Java',
+    '.go': 'Go',
+    '.rs': 'Rust'
+}
+
+# Deletes finished checkouts off the scrape path (joined at interpreter exit)
+_cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rmtree")
+
+
+def _git_env() -> Dict[str, str]:
+    """Environment for git subprocesses (no LFS downloads, no auth prompts)."""
+    return {**os.environ, 'GIT_LFS_SKIP_SMUDGE': '1', 'GIT_TERMINAL_PROMPT': '0'}
+
+
 class GitHubScraper(BaseScraper):
     """Scraper for GitHub repository using git clone."""
 
@@ -27,6 +66,10 @@ class GitHubScraper(BaseScraper):
         'coverage', '.mypy_cache', '.eggs', '*.egg-info'
     }
 
+    # Byte forms of the filters above, matched against `git ls-files -z` output
+    _SUPPORTED_SUFFIXES = tuple(ext.encode() for ext in SUPPORTED_EXTENSIONS)
+    _IGNORED_DIRS_BYTES = frozenset(d.encode() for d in IGNORED_DIRS)
+
     # Directories to include in sparse checkout
     SPARSE_CHECKOUT_DIRS = {
         'docs', 'doc', 'documentation',
@@ -37,14 +80,31 @@ class GitHubScraper(BaseScraper):
         'tests', 'test',  # Test files often contain good examples
     }
 
+    # Sorted once so `git sparse-checkout set` gets a stable argument list
+    _SPARSE_CHECKOUT_DIR_LIST = tuple(sorted(SPARSE_CHECKOUT_DIRS))
+
     # Timeout configuration (seconds)
     SPARSE_CLONE_TIMEOUT = 60  # 1 minute for sparse checkout
     SHALLOW_CLONE_TIMEOUT = 120  # 2 minutes for fallback shallow clone
     TOTAL_TIMEOUT = 180  # 3 minutes overall cap
 
+    # Parallelism for file reads and multi-repo scraping
+    MAX_READ_WORKERS = 16
+    MAX_SCRAPE_WORKERS = 4
+
+    # Upper bound on combined content per repository (characters)
+    MAX_TOTAL_CHARS = 2_000_000
+
+    # Timeout for the `git ls-remote` cache check (seconds)
+    LS_REMOTE_TIMEOUT = 10
+
+    # Socket timeout for the codeload tarball download (seconds)
+    TARBALL_TIMEOUT = 60
+
     def __init__(self):
         """Initialize GitHub scraper."""
         super().__init__()
+        self._cache_dir = Path(settings.github_cache_dir)
         log.info("GitHub scraper initialized (using git clone)")
 
     def scrape(self, url: str) -> Optional[Dict[str, Any]]:
@@ -68,15 +128,27 @@ class GitHubScraper(BaseScraper):
                 error="Invalid GitHub URL"
             )
 
+        clone_url = f"https://github.com/{owner}/{repo_name}.git"
+
+        # Skip the clone entirely when HEAD hasn't moved since the last scrape
+        remote_head = self._get_remote_head(clone_url)
+        if remote_head:
+            cached = self._load_cached_result(owner, repo_name, remote_head)
+            if cached:
+                log.info(f"{owner}/{repo_name} unchanged at {remote_head[:8]}, using cached scrape")
+                return cached
+
         log.info(f"Cloning GitHub repo: {owner}/{repo_name}")
 
         # Create temporary directory for cloning
         temp_dir = tempfile.mkdtemp(prefix=f"github_{repo_name}_")
 
         try:
-            # Clone repository
-            clone_url = f"https://github.com/{owner}/{repo_name}.git"
-            if not self._clone_repo(clone_url, temp_dir):
+            # Fetch a tarball snapshot, falling back to git clone
+            fetched, commit_hash = self._try_codeload_tarball(
+                owner, repo_name, temp_dir, ref=remote_head
+            )
+            if not fetched and not self._clone_repo(clone_url, temp_dir):
                 return self._create_result(
                     url=url,
                     content="",
@@ -85,44 +157,78 @@ class GitHubScraper(BaseScraper):
                     error="Failed to clone repository"
                 )
 
+            repo_path = Path(temp_dir)
+
+            # Read README once; metadata and content both use it
+            readme_raw = self._read_readme_raw(repo_path)
+
             # Get repository metadata
-            metadata = self._get_repo_metadata(Path(temp_dir), owner, repo_name)
+            metadata = self._get_repo_metadata(repo_path, owner, repo_name, commit_hash, readme_raw)
 
             # Get README content
-            readme_content = self._get_readme(Path(temp_dir))
+            readme_content = self._get_readme(readme_raw)
 
             # Get code and documentation files
-            files_content = self._get_files(Path(temp_dir))
+            files_content = self._get_files(repo_path)
 
-            # Combine all content
-            all_content = []
+            # One section per file (README first)
+            sections = []
 
             if readme_content:
-                all_content.append(f"# README\n\n{readme_content}\n\n")
+                sections.append({
+                    'path': 'README',
+                    'content': f"# README\n\n{readme_content}\n\n"
+                })
+
+            # Cap the combined size; everything is chunked downstream anyway
+            total_chars = sum(len(section['content']) for section in sections)
+            files_scraped = 0
 
             for file_info in files_content:
-                all_content.append(
-                    f"# File: {file_info['path']}\n\n{file_info['content']}\n\n"
-                )
+                # Pop the raw text so it doesn't outlive its formatted copy
+                content = file_info.pop('content')
+                section_content = f"# File: {file_info['path']}\n\n{content}\n\n"
+
+                total_chars += len(section_content)
+                if total_chars > self.MAX_TOTAL_CHARS:
+                    log.info(
+                        f"Content cap reached ({self.MAX_TOTAL_CHARS} chars), "
+                        f"skipping {len(files_content) - files_scraped} remaining files"
+                    )
+                    break
+
+                sections.append({
+                    'path': file_info['path'],
+                    'content': section_content
+                })
+                files_scraped += 1
 
-            combined_content = "\n".join(all_content)
+            combined_content = "\n".join(section['content'] for section in sections)
 
             full_metadata = {
                 **metadata,
                 'source_type': 'github',
                 'scraped_at': datetime.now().isoformat(),
-                'files_scraped': len(files_content),
-                'has_readme': bool(readme_content)
+                'files_scraped': files_scraped,
+                'has_readme': bool(readme_content),
+                # Per-file hashes let a refresh re-embed only changed files
+                'file_hashes': {
+                    section['path']: compute_content_hash(section['content'])
+                    for section in sections
+                }
             }
 
-            log.info(f"Scraped {len(files_content)} files from {owner}/{repo_name}")
+            log.info(f"Scraped {files_scraped} files from {owner}/{repo_name}")
 
-            return self._create_result(
+            result = self._create_result(
                 url=url,
                 content=combined_content,
                 metadata=full_metadata,
                 success=True
             )
+            result['files'] = sections
+            self._store_cached_result(owner, repo_name, result)
+            return result
 
         except Exception as e:
             log.error(f"Error scraping {owner}/{repo_name}: {e}")
@@ -135,69 +241,236 @@ class GitHubScraper(BaseScraper):
             )
 
         finally:
-            # Clean up temporary directory
-            try:
-                shutil.rmtree(temp_dir)
-                log.debug(f"Cleaned up temp directory: {temp_dir}")
-            except Exception as e:
-                log.warning(f"Could not clean up temp directory {temp_dir}: {e}")
+            # Clean up temporary directory in the background; mkdtemp paths
+            # are unique, so the caller doesn't need to wait for it
+            _cleanup_pool.submit(shutil.rmtree, temp_dir, True)
+            log.debug(f"Scheduled cleanup of temp directory: {temp_dir}")
 
-    def _get_sparse_checkout_patterns(self) -> list:
+    def scrape_many(self, urls: List[str], max_workers: int = MAX_SCRAPE_WORKERS) -> List[Dict[str, Any]]:
         """
-        Generate sparse checkout patterns for git.
+        Scrape several GitHub repositories concurrently.
+
+        Each clone runs in its own git subprocess, so the work is network-bound
+        and overlaps well across threads.
+
+        Args:
+            urls: GitHub repository URLs
+            max_workers: Maximum number of concurrent clones
 
         Returns:
-            List of patterns for .git/info/sparse-checkout
+            List of scrape() results, in the same order as urls
+        """
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(urls)),
+            thread_name_prefix="github-scrape"
+        ) as pool:
+            return list(pool.map(self.scrape, urls))
+
+    async def scrape_many_async(
+        self,
+        urls: List[str],
+        concurrency: int = MAX_SCRAPE_WORKERS,
+        executor: Optional[Executor] = None
+    ) -> List[Dict[str, Any]]:
         """
-        patterns = [
-            '/*',  # Include root level files (README, LICENSE, etc.)
-            '!.*',  # Exclude hidden directories (except those explicitly included)
-        ]
+        Scrape several GitHub repositories from async code.
+
+        Each scrape runs through scrape_async(), so the event loop stays free
+        while git and the file reads block their worker threads.
 
-        # Include specific directories
-        for directory in self.SPARSE_CHECKOUT_DIRS:
-            patterns.append(f'/{directory}/')
-            patterns.append(f'/{directory}/**')
+        Args:
+            urls: GitHub repository URLs
+            concurrency: Maximum number of scrapes in flight
+            executor: Executor for the blocking scrapes (None = loop default)
+
+        Returns:
+            List of scrape() results, in the same order as urls
+        """
+        semaphore = asyncio.Semaphore(concurrency)
 
-        # Exclude ignored directories explicitly
-        for ignored in self.IGNORED_DIRS:
-            if not ignored.startswith('.'):
-                patterns.append(f'!/{ignored}/')
+        async def scrape_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.scrape_async(url, executor=executor)
 
-        return patterns
+        return list(await asyncio.gather(*(scrape_one(url) for url in urls)))
 
-    def _setup_sparse_checkout(self, repo_path: Path) -> bool:
+    def _get_remote_head(self, clone_url: str) -> Optional[str]:
         """
-        Configure sparse checkout for a git repository.
+        Get the remote HEAD commit without cloning.
 
         Args:
-            repo_path: Path to cloned repository
+            clone_url: Git clone URL
 
         Returns:
-            True if successful, False otherwise
+            Commit SHA, or None if it could not be determined
         """
         try:
-            # Enable sparse checkout
             result = subprocess.run(
-                ['git', 'config', 'core.sparseCheckout', 'true'],
-                cwd=repo_path,
+                [*_GIT_BASE, 'ls-remote', clone_url, 'HEAD'],
                 capture_output=True,
                 text=True,
-                timeout=5
+                timeout=self.LS_REMOTE_TIMEOUT,
+                env=_git_env()
             )
+        except Exception as e:
+            log.debug(f"git ls-remote failed for {clone_url}: {e}")
+            return None
 
-            if result.returncode != 0:
-                log.warning(f"Failed to enable sparse checkout: {result.stderr}")
-                return False
+        if result.returncode != 0 or not result.stdout:
+            return None
 
-            # Create sparse-checkout file
-            sparse_checkout_file = repo_path / '.git' / 'info' / 'sparse-checkout'
-            sparse_checkout_file.parent.mkdir(parents=True, exist_ok=True)
+        return result.stdout.split()[0]
 
-            patterns = self._get_sparse_checkout_patterns()
-            sparse_checkout_file.write_text('\n'.join(patterns))
+    def _cache_path(self, owner: str, repo_name: str) -> Path:
+        """Path of the cached scrape result for a repository."""
+        return self._cache_dir / f"{owner}__{repo_name}.json"
+
+    def _load_cached_result(self, owner: str, repo_name: str, commit_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached scrape result if it was taken at the given commit.
+
+        Args:
+            owner: Repository owner
+            repo_name: Repository name
+            commit_hash: Current remote HEAD commit
+
+        Returns:
+            Cached result dictionary, or None on miss
+        """
+        try:
+            with open(self._cache_path(owner, repo_name), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.debug(f"Ignoring unreadable cache for {owner}/{repo_name}: {e}")
+            return None
+
+        if cached.get('metadata', {}).get('commit_hash') != commit_hash:
+            return None
+
+        cached['metadata']['scraped_at'] = datetime.now().isoformat()
+        return cached
+
+    def _store_cached_result(self, owner: str, repo_name: str, result: Dict[str, Any]):
+        """
+        Persist a successful scrape result, replacing any older one.
+
+        Args:
+            owner: Repository owner
+            repo_name: Repository name
+            result: Scrape result (must carry metadata['commit_hash'])
+        """
+        if not result['metadata'].get('commit_hash'):
+            return
+
+        cache_path = self._cache_path(owner, repo_name)
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            log.warning(f"Could not cache scrape of {owner}/{repo_name}: {e}")
+
+    def _try_codeload_tarball(
+        self,
+        owner: str,
+        repo_name: str,
+        target_dir: str,
+        ref: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Fetch a snapshot of the repository as a single tarball from codeload.
+
+        No pack negotiation or .git metadata - just the tree at one commit.
+        Extraction mirrors the sparse checkout, so both fetch paths feed
+        _get_files the same content: only root-level files and files under
+        the top-level SPARSE_CHECKOUT_DIRS are written (minus IGNORED_DIRS
+        and files over 100KB, which _get_files would skip anyway).
+
+        Args:
+            owner: Repository owner
+            repo_name: Repository name
+            target_dir: Directory to extract into
+            ref: Commit to fetch (default: HEAD)
+
+        Returns:
+            (success, commit hash) - the hash is None if it could not be determined
+        """
+        url = f"https://codeload.github.com/{owner}/{repo_name}/tar.gz/{ref or 'HEAD'}"
+        target = Path(target_dir)
+
+        try:
+            start_time = time.time()
+            request = urllib.request.Request(url, headers={'User-Agent': 'rag-github-scraper'})
+            with urllib.request.urlopen(request, timeout=self.TARBALL_TIMEOUT) as response:
+                # GitHub reports the resolved commit as the (quoted) ETag
+                etag = (response.headers.get('ETag') or '').removeprefix('W/').strip('"')
+                commit_hash = ref or (etag if re.fullmatch(r'[0-9a-f]{40}', etag) else None)
+
+                with tarfile.open(fileobj=response, mode='r|gz') as tar:
+                    for member in tar:
+                        if not member.isfile() or member.size > 100000:
+                            continue
+
+                        # Strip the "<repo>-<sha>/" top-level directory
+                        parts = member.name.split('/')[1:]
+                        if not parts or '..' in parts or not self.IGNORED_DIRS.isdisjoint(parts[:-1]):
+                            continue
+
+                        # Same selection as the cone-mode sparse checkout
+                        if len(parts) > 1 and parts[0] not in self.SPARSE_CHECKOUT_DIRS:
+                            continue
+
+                        dest = target.joinpath(*parts)
+                        dest.parent.mkdir(parents=True, exist_ok=True)
+                        dest.write_bytes(tar.extractfile(member).read())
+
+            log.info(f"Fetched tarball snapshot in {time.time() - start_time:.1f}s")
+            return True, commit_hash
+
+        except Exception as e:
+            log.debug(f"Tarball download failed for {owner}/{repo_name}: {e}")
+            # git clone needs an empty target directory
+            shutil.rmtree(target_dir, ignore_errors=True)
+            return False, None
+
+    def _setup_sparse_checkout(self, repo_path: Path) -> bool:
+        """
+        Configure cone-mode sparse checkout for a git repository.
+
+        Cone mode always keeps root-level files (README, LICENSE, etc.) and
+        matches directories by prefix, which is much cheaper than the legacy
+        pattern matcher. Ignored directories nested inside the included ones
+        are filtered later by _get_files.
+
+        Args:
+            repo_path: Path to cloned repository
 
-            log.debug(f"Created sparse-checkout with {len(patterns)} patterns")
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            for args in (['init', '--cone'], ['set', *self._SPARSE_CHECKOUT_DIR_LIST]):
+                result = subprocess.run(
+                    [*_GIT_BASE, 'sparse-checkout', *args],
+                    cwd=repo_path,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=10
+                )
+
+                if result.returncode != 0:
+                    log.warning(f"Failed to set up sparse checkout: {result.stderr}")
+                    return False
+
+            log.debug(f"Sparse checkout limited to {len(self._SPARSE_CHECKOUT_DIR_LIST)} directories")
             return True
 
         except Exception as e:
@@ -220,16 +493,19 @@ class GitHubScraper(BaseScraper):
             timeout = self.SPARSE_CLONE_TIMEOUT
 
         try:
-            import time
             start_time = time.time()
 
-            # Step 1: Clone without checkout
+            # Step 1: Blobless clone without checkout - only the blobs that
+            # survive the sparse patterns are fetched at checkout time
             log.debug(f"Attempting sparse checkout for {clone_url}")
             result = subprocess.run(
-                ['git', 'clone', '--no-checkout', '--depth', '1', clone_url, target_dir],
-                capture_output=True,
+                [*_GIT_BASE, 'clone', '--quiet', '--filter=blob:none',
+                 '--no-checkout', '--depth', '1', clone_url, target_dir],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=timeout
+                timeout=timeout,
+                env=_git_env()
             )
 
             if result.returncode != 0:
@@ -244,11 +520,13 @@ class GitHubScraper(BaseScraper):
 
             # Step 3: Checkout with sparse patterns
             result = subprocess.run(
-                ['git', 'checkout'],
+                [*_GIT_BASE, 'checkout', '--quiet'],
                 cwd=target_dir,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=timeout
+                timeout=timeout,
+                env=_git_env()
             )
 
             if result.returncode != 0:
@@ -271,8 +549,8 @@ class GitHubScraper(BaseScraper):
         Clone a git repository with optional sparse checkout optimization.
 
         Strategy:
-        1. Try sparse checkout first (fast for large repos)
-        2. Fall back to shallow clone if sparse fails
+        1. Try a blobless sparse checkout first (fast for large repos)
+        2. Fall back to a shallow treeless clone if sparse fails
 
         Args:
             clone_url: Git clone URL
@@ -282,7 +560,6 @@ class GitHubScraper(BaseScraper):
         Returns:
             True if successful, False otherwise
         """
-        import time
         start_time = time.time()
 
         # Strategy 1: Try sparse checkout first
@@ -301,14 +578,17 @@ class GitHubScraper(BaseScraper):
                 except Exception as e:
                     log.debug(f"Could not clean up failed sparse checkout: {e}")
 
-        # Strategy 2: Fallback to shallow clone
+        # Strategy 2: Fallback to shallow treeless clone
         try:
             log.debug(f"Attempting shallow clone (timeout: {self.SHALLOW_CLONE_TIMEOUT}s)...")
             result = subprocess.run(
-                ['git', 'clone', '--depth', '1', clone_url, target_dir],
-                capture_output=True,
+                [*_GIT_BASE, 'clone', '--quiet', '--filter=tree:0',
+                 '--depth', '1', clone_url, target_dir],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=self.SHALLOW_CLONE_TIMEOUT
+                timeout=self.SHALLOW_CLONE_TIMEOUT,
+                env=_git_env()
             )
 
             if result.returncode == 0:
@@ -331,7 +611,14 @@ class GitHubScraper(BaseScraper):
             log.error(f"Error cloning repository: {e}")
             return False
 
-    def _get_repo_metadata(self, repo_path: Path, owner: str, repo_name: str) -> Dict[str, Any]:
+    def _get_repo_metadata(
+        self,
+        repo_path: Path,
+        owner: str,
+        repo_name: str,
+        commit_hash: Optional[str] = None,
+        readme_raw: Optional[bytes] = None
+    ) -> Dict[str, Any]:
         """
         Get repository metadata from cloned repo.
 
@@ -339,6 +626,8 @@ class GitHubScraper(BaseScraper):
             repo_path: Path to cloned repository
             owner: Repository owner
             repo_name: Repository name
+            commit_hash: Commit already known from the fetch (skips git rev-parse)
+            readme_raw: README bytes from _read_readme_raw, for the description
 
         Returns:
             Dictionary with repository metadata
@@ -350,53 +639,67 @@ class GitHubScraper(BaseScraper):
         }
 
         # Get commit hash for change detection
-        try:
-            result = subprocess.run(
-                ['git', 'rev-parse', 'HEAD'],
-                capture_output=True,
-                text=True,
-                cwd=repo_path,
-                timeout=10
-            )
-            if result.returncode == 0:
-                metadata['commit_hash'] = result.stdout.strip()
-                log.debug(f"Captured commit hash: {metadata['commit_hash'][:8]}")
-        except Exception as e:
-            log.warning(f"Could not get commit hash: {e}")
-            metadata['commit_hash'] = None
-
-        # Try to get language from files
-        languages = set()
-        for ext in ['.py', '.js', '.ts', '.java', '.go', '.rs']:
-            if list(repo_path.rglob(f"*{ext}")):
-                lang_map = {
-                    '.py': 'Python',
-                    '.js': 'JavaScript',
-                    '.ts': 'TypeScript',
-                    '.java': 'Java',
-                    '.go': 'Go',
-                    '.rs': 'Rust'
-                }
-                languages.add(lang_map.get(ext, 'Unknown'))
+        metadata['commit_hash'] = commit_hash or self._read_head_commit(repo_path)
+        if metadata['commit_hash']:
+            log.debug(f"Captured commit hash: {metadata['commit_hash'][:8]}")
+
+        # Detect languages from file extensions in a single tree walk
+        seen = set()
+        for root, dirs, filenames in os.walk(repo_path):
+            dirs[:] = [d for d in dirs if d not in self.IGNORED_DIRS]
+            seen.update(os.path.splitext(name)[1] for name in filenames)
+            if seen.issuperset(_LANG_MAP):
+                break
+
+        languages = {_LANG_MAP[ext] for ext in seen if ext in _LANG_MAP}
 
         metadata['language'] = ', '.join(languages) if languages else 'Unknown'
 
         # Get description from README if available
-        readme_path = self._find_readme(repo_path)
-        if readme_path:
-            try:
-                with open(readme_path, 'r', encoding='utf-8') as f:
-                    first_lines = [f.readline().strip() for _ in range(5)]
-                    # Try to extract description from first non-title lines
-                    for line in first_lines[1:]:
-                        if line and not line.startswith('#'):
-                            metadata['description'] = line[:200]
-                            break
-            except:
-                pass
+        if readme_raw:
+            first_lines = readme_raw.split(b'\n', 5)[:5]
+            # Try to extract description from first non-title lines
+            for raw_line in first_lines[1:]:
+                line = raw_line.decode('utf-8', 'ignore').strip()
+                if line and not line.startswith('#'):
+                    metadata['description'] = line[:200]
+                    break
 
         return metadata
 
+    def _read_head_commit(self, repo_path: Path) -> Optional[str]:
+        """
+        Resolve HEAD straight from the .git directory (no git rev-parse).
+
+        Args:
+            repo_path: Path to cloned repository
+
+        Returns:
+            Commit SHA, or None if it could not be resolved
+        """
+        git_dir = repo_path / '.git'
+
+        try:
+            head = (git_dir / 'HEAD').read_text().strip()
+            if not head.startswith('ref: '):
+                return head  # Detached HEAD already holds the SHA
+
+            ref = head[5:]
+            ref_file = git_dir / ref
+            if ref_file.exists():
+                return ref_file.read_text().strip()
+
+            # Ref may only exist in packed-refs ("<sha> <ref>" lines)
+            for line in (git_dir / 'packed-refs').read_text().splitlines():
+                sha, _, name = line.partition(' ')
+                if name == ref:
+                    return sha
+
+        except Exception as e:
+            log.warning(f"Could not get commit hash: {e}")
+
+        return None
+
     def _find_readme(self, repo_path: Path) -> Optional[Path]:
         """
         Find README file in repository.
@@ -416,31 +719,45 @@ class GitHubScraper(BaseScraper):
 
         return None
 
-    def _get_readme(self, repo_path: Path) -> str:
+    def _read_readme_raw(self, repo_path: Path) -> Optional[bytes]:
         """
-        Get README content.
+        Read the README file as raw bytes.
 
         Args:
             repo_path: Path to repository
 
         Returns:
-            README content as string
+            README bytes, or None if there is no readable README
         """
         readme_path = self._find_readme(repo_path)
 
         if not readme_path:
             log.warning("No README found")
-            return ""
+            return None
 
         try:
-            with open(readme_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            log.info(f"Retrieved README ({len(content)} chars)")
-            return content
+            return readme_path.read_bytes()
         except Exception as e:
             log.warning(f"Could not read README: {e}")
+            return None
+
+    def _get_readme(self, readme_raw: Optional[bytes]) -> str:
+        """
+        Get README content.
+
+        Args:
+            readme_raw: README bytes from _read_readme_raw
+
+        Returns:
+            README content as string
+        """
+        if not readme_raw:
             return ""
 
+        content = readme_raw.decode('utf-8', 'ignore')
+        log.info(f"Retrieved README ({len(content)} chars)")
+        return content
+
     def _get_files(self, repo_path: Path, max_files: int = 50) -> List[Dict[str, Any]]:
         """
         Get code and documentation files from repository.
@@ -453,54 +770,136 @@ class GitHubScraper(BaseScraper):
             List of dictionaries with file path and content
         """
         files = []
-        count = 0
+        candidates = []
 
-        # Walk through repository
-        for file_path in repo_path.rglob('*'):
+        for raw_path in self._list_files(repo_path):
             # Skip if max files reached
-            if count >= max_files:
+            if len(candidates) >= max_files:
                 break
 
-            # Skip directories
-            if not file_path.is_file():
+            # Check if file extension is supported
+            if not raw_path.endswith(self._SUPPORTED_SUFFIXES):
                 continue
 
-            # Skip ignored directories
-            if any(ignored in file_path.parts for ignored in self.IGNORED_DIRS):
+            # Skip vendored/build directories that were committed anyway
+            if not self._IGNORED_DIRS_BYTES.isdisjoint(raw_path.split(b'/')[:-1]):
                 continue
 
-            # Check if file extension is supported
-            if file_path.suffix not in self.SUPPORTED_EXTENSIONS:
-                continue
+            rel_path = raw_path.decode('utf-8', 'surrogateescape')
+            file_path = repo_path / rel_path
 
-            # Skip very large files
+            # Skip very large files (and entries outside the sparse checkout)
             try:
-                file_size = file_path.stat().st_size
+                file_size = os.stat(file_path).st_size
                 if file_size > 100000:  # 100KB limit
-                    log.debug(f"Skipping large file: {file_path}")
+                    log.debug("Skipping large file: {}", file_path)
                     continue
-            except:
+            except OSError:
                 continue
 
-            # Read file content
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+            candidates.append((file_path, rel_path))
 
-                # Get relative path from repo root
-                rel_path = file_path.relative_to(repo_path)
+        if not candidates:
+            return files
 
-                files.append({
-                    'path': str(rel_path),
-                    'content': content,
-                    'size': file_size
-                })
+        # open/read and hashing release the GIL, so reads overlap across threads
+        with ThreadPoolExecutor(
+            max_workers=min(self.MAX_READ_WORKERS, len(candidates)),
+            thread_name_prefix="github-read"
+        ) as pool:
+            read_results = list(pool.map(self._read_file, candidates))
+
+        # Skip byte-identical copies (vendored files, generated stubs) before
+        # decoding; the first path in listing order wins so results are stable
+        seen_digests = set()
+        duplicates = 0
 
-                count += 1
-                log.debug(f"Retrieved file: {rel_path} ({count}/{max_files})")
+        for read_result in read_results:
+            if read_result is None:
+                continue
 
-            except Exception as e:
-                log.warning(f"Could not read file {file_path}: {e}")
+            rel_path, raw, digest = read_result
+            if digest in seen_digests:
+                duplicates += 1
                 continue
+            seen_digests.add(digest)
+
+            files.append({
+                'path': rel_path,
+                'content': raw.decode('utf-8', 'ignore'),
+                'size': len(raw)
+            })
 
+        if duplicates:
+            log.debug(f"Skipped {duplicates} duplicate files")
+        log.debug(f"Retrieved {len(files)}/{len(candidates)} files")
         return files
+
+    def _list_files(self, repo_path: Path) -> List[bytes]:
+        """
+        List repository files as root-relative, '/'-separated byte paths.
+
+        Cloned repos ask git for the tracked files; tarball snapshots have no
+        .git directory and are walked instead.
+
+        Args:
+            repo_path: Path to repository
+
+        Returns:
+            List of relative paths
+        """
+        if not (repo_path / '.git').exists():
+            paths = []
+            # Single scandir pass; is_dir/is_file come from the dirent type
+            # so only files that survive later filters are ever stat()ed
+            pending = [(os.fsencode(repo_path), b'')]
+            while pending:
+                dir_path, prefix = pending.pop()
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if os.fsdecode(entry.name) not in self.IGNORED_DIRS:
+                                pending.append((entry.path, prefix + entry.name + b'/'))
+                        elif entry.is_file(follow_symlinks=False):
+                            paths.append(prefix + entry.name)
+            # Same order as git ls-files so max_files picks a stable subset
+            paths.sort()
+            return paths
+
+        # Ask git for the tracked files instead of walking the whole tree
+        try:
+            result = subprocess.run(
+                [*_GIT_BASE, 'ls-files', '-z', '--full-name'],
+                cwd=repo_path,
+                capture_output=True,
+                timeout=30
+            )
+        except Exception as e:
+            log.warning(f"Could not list repository files: {e}")
+            return []
+
+        if result.returncode != 0:
+            log.warning(f"git ls-files failed: {result.stderr.decode('utf-8', 'ignore')}")
+            return []
+
+        return result.stdout.split(b'\0')
+
+    def _read_file(self, candidate: Tuple[Path, str]) -> Optional[Tuple[str, bytes, bytes]]:
+        """
+        Read and fingerprint one repository file selected by _get_files.
+
+        Args:
+            candidate: (absolute path, path relative to repo root)
+
+        Returns:
+            (relative path, raw bytes, 8-byte digest), or None if unreadable
+        """
+        file_path, rel_path = candidate
+
+        try:
+            raw = file_path.read_bytes()
+        except Exception as e:
+            log.warning(f"Could not read file {file_path}: {e}")
+            return None
+
+        return rel_path, raw, hashlib.blake2b(raw, digest_size=8).digest()
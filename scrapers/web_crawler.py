@@ -1,12 +1,120 @@
 """
 Web crawler to discover URLs from websites.
 """
-from typing import List, Dict, Any, Set
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Optional, Set
+from urllib.parse import urljoin, urlparse, urlsplit
 import asyncio
-from playwright.async_api import async_playwright
-from utils import log, normalize_url
+import hashlib
+import re
+from functools import lru_cache
+from io import BytesIO
+from lxml import etree
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from config import settings
+from utils import log, normalize_url as _normalize_url
+from .browser import get_browser
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Navigation links recur on every page; a crawl sees more distinct links
+# than utils' shared normalize_url cache holds, so keep a larger local one
+normalize_url = lru_cache(maxsize=50_000)(_normalize_url)
+
+_HTTP_SCHEMES = frozenset({'http', 'https'})
+
+# Hrefs that never point at another page (in-page anchors, mail, scripts)
+_NON_PAGE_HREF_PREFIXES = ('#', 'mailto:', 'javascript:', 'tel:', 'data:')
+
+# Files (images, videos, downloads) that are never worth crawling
+_SKIP_EXTENSION_RE = re.compile(
+    r'\.(?:jpe?g|png|gif|svg|webp|mp4|avi|mov|pdf|zip|tar|gz|rar|exe|dmg|iso)$'
+)
+
+# Common non-content paths (matched anywhere in the lowercased path)
+_SKIP_PATH_RE = re.compile(r'/(?:search|login|signup|cart|checkout|account|admin|api/)')
+
+# should_crawl_domain(): documentation markers (in domain or path),
+# documentation platforms (in domain) and blog-like paths
+_DOC_PATTERN_RE = re.compile(
+    r'docs?\.|documentation|wiki|confluence|readthedocs|gitbook|guide|tutorial|learn'
+)
+_DOC_PLATFORM_RE = re.compile(r'github\.com|notion\.site|gitbook\.io|readme\.io')
+_BLOG_PATH_RE = re.compile(r'/(?:blog|article|post|news)')
+
+# HEAD answers that mean the page is gone. Anything else (403 from WAFs
+# that block HEAD, 405/501, 5xx...) is left for the real navigation to judge
+_DEAD_STATUSES = frozenset({404, 410})
+
+# Subresources never needed to read a page's links
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'stylesheet', 'font', 'media'})
+
+
+def _url_fingerprint(url: str) -> bytes:
+    """
+    Fingerprint a URL for visited-set membership.
+
+    A 16-byte BLAKE2b digest is far smaller than long query-string URLs
+    and collisions are negligible at any realistic crawl size.
+
+    Args:
+        url: Normalized URL
+
+    Returns:
+        128-bit digest
+    """
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+async def _block_subresources(route) -> None:
+    """Playwright route handler aborting requests in _BLOCKED_RESOURCE_TYPES."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _extract_hrefs(html: str) -> List[str]:
+    """
+    Extract the href of every link on a page.
+
+    Uses selectolax (Lexbor) when installed, since only the links are needed.
+    Otherwise lxml streams the page and discards everything parsed before
+    each <a>, so link-heavy index pages never sit in memory as a full tree.
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        List of raw href values
+    """
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        return [node.attributes.get('href') for node in tree.css('a[href]')]
+
+    hrefs = []
+    source = BytesIO(html.encode('utf-8', 'ignore'))
+    try:
+        for _, element in etree.iterparse(
+            source, events=('end',), tag='a', html=True, recover=True, encoding='utf-8'
+        ):
+            href = element.get('href')
+            if href:
+                hrefs.append(href)
+
+            # Free the element, then every already-parsed subtree before it
+            # (preceding siblings of the element and of each ancestor)
+            element.clear()
+            for node in (element, *element.iterancestors()):
+                while node.getprevious() is not None:
+                    del node.getparent()[0]
+    except etree.XMLSyntaxError:
+        # Raised for empty documents; keep whatever was read
+        pass
+
+    return hrefs
 
 
 class WebCrawler:
@@ -14,22 +122,27 @@ class WebCrawler:
 
     def __init__(self):
         """Initialize web crawler."""
-        self.visited = set()
-        self.to_visit = set()
+        self.visited = set()  # _url_fingerprint() of every page loaded
+        self.to_visit = set()  # URLs queued but not loaded yet
 
     async def crawl_website(
         self,
         start_url: str,
         max_pages: int = 1000,
-        same_domain_only: bool = True
+        same_domain_only: bool = True,
+        concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Crawl a website and discover all linked pages.
 
+        Pages are loaded by a pool of workers sharing one browser context,
+        fed breadth-first from an asyncio.Queue.
+
         Args:
             start_url: Starting URL
             max_pages: Maximum number of pages to discover
             same_domain_only: Only crawl pages from the same domain
+            concurrency: Pages loaded in parallel (default: settings.crawl_concurrency)
 
         Returns:
             Dictionary with discovered URLs
@@ -41,96 +154,72 @@ class WebCrawler:
         # Parse base URL
         parsed_start = urlparse(start_url)
         base_domain = parsed_start.netloc
-        base_path = '/'.join(parsed_start.path.split('/')[:-1])  # Get directory path
+        concurrency = max(1, concurrency or settings.crawl_concurrency)
 
         discovered_urls = []
+        start_normalized = normalize_url(start_url)
         self.visited = set()
-        self.to_visit = {normalize_url(start_url)}
+        self.to_visit = {start_normalized}
+
+        queue = asyncio.Queue()
+        queue.put_nowait(start_normalized)
+        done = asyncio.Event()
 
         # Time tracking for ETA
         start_time = datetime.now()
         error_count = 0
 
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
+        async def worker(context):
+            nonlocal error_count
+
+            # One page per worker, reused for every navigation
+            page = await context.new_page()
 
-                while self.to_visit and len(discovered_urls) < max_pages:
-                    # Get next URL to visit
-                    current_url = self.to_visit.pop()
+            try:
+                while not done.is_set():
+                    current_url = await queue.get()
+                    self.to_visit.discard(current_url)
 
                     # Skip if already visited
-                    if current_url in self.visited:
+                    fingerprint = _url_fingerprint(current_url)
+                    if fingerprint in self.visited:
+                        queue.task_done()
                         continue
 
-                    self.visited.add(current_url)
+                    self.visited.add(fingerprint)
 
                     try:
+                        # Skip PDFs, images, 404s, ... without a full navigation
+                        if not await self._is_html_page(context, current_url):
+                            continue
+
                         # Load page
-                        page = await context.new_page()
                         await page.goto(current_url, wait_until='domcontentloaded', timeout=10000)
-                        await asyncio.sleep(0.5)  # Let JS render
+
+                        # Server-rendered pages already have links; give
+                        # JS-rendered ones a moment to produce the first one
+                        try:
+                            await page.wait_for_selector('a[href]', timeout=2000)
+                        except PlaywrightTimeoutError:
+                            pass
 
                         # Get HTML
                         html = await page.content()
-                        await page.close()
 
-                        # Parse HTML
-                        soup = BeautifulSoup(html, 'html.parser')
+                        if len(discovered_urls) >= max_pages:
+                            done.set()
+                            continue
 
                         # Add current URL to discovered
                         discovered_urls.append(current_url)
 
-                        # Find all links
-                        links = soup.find_all('a', href=True)
-
-                        for link in links:
-                            href = link['href']
-
-                            # Convert relative URLs to absolute
-                            absolute_url = urljoin(current_url, href)
-
-                            # Normalize
-                            normalized = normalize_url(absolute_url)
-
-                            # Skip if already visited
-                            if normalized in self.visited:
-                                continue
-
-                            # Parse URL
-                            parsed = urlparse(normalized)
-
-                            # Filter based on criteria
-                            if same_domain_only:
-                                # Same domain check
-                                if parsed.netloc != base_domain:
-                                    continue
+                        # Find all links (parsed off the event loop) and queue the new ones
+                        links = await asyncio.to_thread(_extract_hrefs, html)
 
-                            # Skip non-http(s) links
-                            if parsed.scheme not in ['http', 'https']:
-                                continue
-
-                            # Skip files (images, videos, downloads)
-                            path_lower = parsed.path.lower()
-                            skip_extensions = [
-                                '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp',
-                                '.mp4', '.avi', '.mov', '.pdf', '.zip', '.tar',
-                                '.gz', '.rar', '.exe', '.dmg', '.iso'
-                            ]
-                            if any(path_lower.endswith(ext) for ext in skip_extensions):
-                                continue
-
-                            # Skip common non-content paths
-                            skip_patterns = [
-                                '/search', '/login', '/signup', '/cart',
-                                '/checkout', '/account', '/admin', '/api/'
-                            ]
-                            if any(pattern in path_lower for pattern in skip_patterns):
-                                continue
-
-                            # Add to queue
-                            self.to_visit.add(normalized)
+                        for normalized in self._filter_links(current_url, links, base_domain, same_domain_only):
+                            if normalized not in self.to_visit:
+                                self.to_visit.add(normalized)
+                                queue.put_nowait(normalized)
 
                         # Progress feedback with visual indicators
                         current_count = len(discovered_urls)
@@ -148,12 +237,52 @@ class WebCrawler:
                             log.info(f"🔄 Progress: {current_count}/{max_pages} pages | Queue: {len(self.to_visit)} | "
                                    f"Elapsed: {int(elapsed)}s | ETA: ~{eta_minutes}min")
 
+                        if current_count >= max_pages:
+                            done.set()
+
                     except Exception as e:
                         error_count += 1
                         log.warning(f"⚠️  Error crawling {current_url}: {e}")
-                        continue
 
-                await browser.close()
+                        # Replace the page if the failure took it down
+                        if page.is_closed():
+                            page = await context.new_page()
+
+                    finally:
+                        queue.task_done()
+
+            finally:
+                await page.close()
+
+        async def wait_until_drained():
+            await queue.join()
+            done.set()
+
+        try:
+            browser = await get_browser()
+            context = await browser.new_context()
+
+            try:
+                await context.route('**/*', _block_subresources)
+
+                # Prefer HTML, also for the HEAD checks. Compression is left to
+                # Chromium, which already advertises br/gzip/deflate
+                await context.set_extra_http_headers({
+                    'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.1',
+                })
+
+                # Stop when max_pages is reached or no worker can find new links
+                tasks = [asyncio.create_task(worker(context)) for _ in range(concurrency)]
+                tasks.append(asyncio.create_task(wait_until_drained()))
+                try:
+                    await done.wait()
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+            finally:
+                await context.close()
 
             # Final summary
             total_time = (datetime.now() - start_time).total_seconds()
@@ -181,50 +310,120 @@ class WebCrawler:
                 'total_discovered': len(discovered_urls)
             }
 
-    def should_crawl_domain(self, url: str) -> bool:
+    async def _is_html_page(self, context, url: str) -> bool:
         """
-        Determine if a URL should be crawled based on domain patterns.
+        Check with a HEAD request whether a URL serves an HTML page.
+
+        Much cheaper than a browser navigation. Only a 404/410 or a
+        successful non-HTML answer skips the page; servers that reject or
+        fail to answer HEAD get the benefit of the doubt.
 
         Args:
+            context: Playwright browser context
             url: URL to check
 
         Returns:
-            True if URL should be crawled for multiple pages
+            False if the URL is gone or not HTML
         """
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        path = parsed.path.lower()
-
-        # Documentation sites - always crawl
-        doc_patterns = [
-            'docs.', 'doc.', 'documentation',
-            'wiki', 'confluence',
-            'readthedocs', 'gitbook',
-            'guide', 'tutorial', 'learn'
-        ]
-
-        if any(pattern in domain or pattern in path for pattern in doc_patterns):
+        try:
+            response = await context.request.head(url, timeout=3000, max_redirects=3)
+        except Exception:
             return True
 
-        # Known documentation platforms
-        doc_domains = [
-            'github.com/*/wiki',
-            'notion.site',
-            'gitbook.io',
-            'readme.io'
-        ]
+        try:
+            if response.status in _DEAD_STATUSES:
+                return False
+            content_type = response.headers.get('content-type', '')
+            return not (response.ok and content_type and 'html' not in content_type)
+        finally:
+            await response.dispose()
+
+    def _filter_links(
+        self,
+        current_url: str,
+        links: List[str],
+        base_domain: str,
+        same_domain_only: bool
+    ) -> List[str]:
+        """
+        Select the crawlable links found on a page.
+
+        Args:
+            current_url: URL of the page the links were found on
+            links: Raw href values
+            base_domain: Domain of the crawl's start URL
+            same_domain_only: Only keep links on base_domain
+
+        Returns:
+            Normalized URLs that are neither visited nor queued yet
+        """
+        new_urls = []
+        seen_hrefs = set()
 
-        for pattern in doc_domains:
-            if pattern.split('/')[0] in domain:
-                return True
+        for href in links:
+            # Cheap rejects before any URL parsing; nav/sidebar/footer links
+            # repeat the same href many times on one page
+            if not href or href in seen_hrefs or href.startswith(_NON_PAGE_HREF_PREFIXES):
+                continue
+            seen_hrefs.add(href)
 
-        # Blog patterns - crawl if it looks like a blog
-        blog_patterns = [
-            '/blog', '/article', '/post', '/news'
-        ]
+            # Convert relative URLs to absolute
+            absolute_url = urljoin(current_url, href)
 
-        if any(pattern in path for pattern in blog_patterns):
-            return True
+            # Normalize
+            normalized = normalize_url(absolute_url)
+
+            # Skip if already visited or queued
+            if normalized in self.to_visit or _url_fingerprint(normalized) in self.visited:
+                continue
+
+            # Parse URL
+            parsed = urlsplit(normalized)
+
+            # Filter based on criteria
+            if same_domain_only:
+                # Same domain check
+                if parsed.netloc != base_domain:
+                    continue
+
+            # Skip non-http(s) links
+            if parsed.scheme not in _HTTP_SCHEMES:
+                continue
 
-        # Default: don't crawl unless it looks like documentation
-        return False
+            # Skip files (images, videos, downloads) and common non-content paths
+            path_lower = parsed.path.lower()
+            if _SKIP_EXTENSION_RE.search(path_lower) or _SKIP_PATH_RE.search(path_lower):
+                continue
+
+            new_urls.append(normalized)
+
+        return new_urls
+
+    def should_crawl_domain(self, url: str) -> bool:
+        """
+        Determine if a URL should be crawled based on domain patterns.
+
+        Args:
+            url: URL to check
+
+        Returns:
+            True if URL should be crawled for multiple pages
+        """
+        return _should_crawl_domain(url)
+
+
+@lru_cache(maxsize=10_000)
+def _should_crawl_domain(url: str) -> bool:
+    """Cached body of WebCrawler.should_crawl_domain (hosts recur a lot)."""
+    parsed = urlsplit(url)
+    domain = parsed.netloc.lower()
+    path = parsed.path.lower()
+
+    # Documentation sites and known documentation platforms - always crawl;
+    # blog-like paths - crawl too. Default: don't crawl.
+    return bool(
+        _DOC_PATTERN_RE.search(domain)
+        or _DOC_PLATFORM_RE.search(domain)
+        or _DOC_PATTERN_RE.search(path)
+        or _BLOG_PATH_RE.search(path)
+    )
@@ -1,20 +1,84 @@
 """
 Web scraper for documentation and article websites.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import asyncio
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+import re
+from lxml import etree, html as lxml_html
+from markdownify import MarkdownConverter
 from urllib.parse import urlparse
 from utils import log
 from .base_scraper import BaseScraper
+from .browser import get_browser, close_browser
+
+# Tags whose whole subtree is never page content
+_UNWANTED_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe', 'noscript')
+
+# Elements inside <body> whose class/ID marks page chrome rather than content.
+# Word boundaries avoid false matches like 'gradient' matching 'ad'. The
+# tree walk runs in libxml2; only the regex test calls back into Python
+_UNWANTED_ATTR_XPATH = etree.XPath(
+    "//body//*[@class or @id][re:test(concat(@class, ' ', @id), "
+    "'\\b(?:nav|menu|sidebar|advertisement|cookie|footer|header|social|share|comment)\\b', 'i')]",
+    namespaces={'re': 'http://exslt.org/regular-expressions'}
+)
+
+# (attribute, value) of the <meta> tags read by _extract_metadata
+_METADATA_META_TAGS = frozenset({
+    ('name', 'description'),
+    ('property', 'og:description'),
+    ('name', 'author'),
+    ('property', 'article:published_time'),
+    ('name', 'publish-date'),
+})
+
+# Candidate main content containers, most specific first
+_UPPER = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_LOWER = 'abcdefghijklmnopqrstuvwxyz'
+_MAIN_CONTENT_XPATHS = tuple(etree.XPath(expr) for expr in (
+    '(//main)[1]',
+    '(//article)[1]',
+    f"(//div[contains(translate(@class, '{_UPPER}', '{_LOWER}'), 'content')])[1]",
+    f"(//div[contains(translate(@id, '{_UPPER}', '{_LOWER}'), 'content')])[1]",
+    '(//body)[1]',
+))
+
+# Subresources not needed for content extraction. Stylesheets are still
+# loaded since some sites only reveal content once their CSS applies
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media'})
+
+# Built once and shared; its per-tag conversion lookups are cached on the
+# instance. markdownify defaults to the pure-Python html.parser, lxml
+# parses the (already cleaned) HTML several times faster
+_MARKDOWN_CONVERTER = MarkdownConverter(heading_style="ATX", bullets="-", bs4_options='lxml')
+
+# Runs of 3+ newlines or 2+ spaces left behind by markdownify
+_MARKDOWN_CLEANUP_RE = re.compile(r'\n{3,}| {2,}')
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    """Replacement for _MARKDOWN_CLEANUP_RE: keep one blank line or one space."""
+    return '\n\n' if match.group(0)[0] == '\n' else ' '
+
+
+async def _block_subresources(route) -> None:
+    """Playwright route handler aborting requests in _BLOCKED_RESOURCE_TYPES."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 class WebScraper(BaseScraper):
     """Scraper for general web pages and documentation sites."""
 
+    # Pages loaded in parallel by scrape_many_async (contexts on one browser)
+    MAX_SCRAPE_WORKERS = 8
+
+    # Larger documents are not articles worth parsing (and may exhaust memory)
+    MAX_PAGE_BYTES = 5_000_000
+
     def __init__(self):
         """Initialize web scraper."""
         super().__init__()
@@ -29,7 +93,62 @@ class WebScraper(BaseScraper):
         Returns:
             Dictionary with page content and metadata
         """
-        return asyncio.run(self._scrape_async(url))
+        return asyncio.run(self._scrape_once(url))
+
+    async def scrape_async(self, url: str, executor=None) -> Optional[Dict[str, Any]]:
+        """
+        Scrape web page content on the running event loop.
+
+        Args:
+            url: URL to scrape
+            executor: Unused (Playwright is natively async)
+
+        Returns:
+            Dictionary with page content and metadata
+        """
+        return await self._scrape_async(url)
+
+    async def scrape_many_async(
+        self,
+        urls: List[str],
+        concurrency: int = MAX_SCRAPE_WORKERS
+    ) -> List[Dict[str, Any]]:
+        """
+        Scrape several web pages concurrently on the shared browser.
+
+        Args:
+            urls: URLs to scrape
+            concurrency: Maximum number of pages loading at once
+
+        Returns:
+            List of scrape() results, in the same order as urls
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def scrape_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._scrape_async(url)
+
+        return list(await asyncio.gather(*(scrape_one(url) for url in urls)))
+
+    async def close(self) -> None:
+        """Shut down the shared Playwright browser for the running event loop."""
+        await close_browser()
+
+    async def _scrape_once(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Scrape a page, then close the browser before the event loop ends.
+
+        Args:
+            url: URL to scrape
+
+        Returns:
+            Dictionary with page content and metadata
+        """
+        try:
+            return await self._scrape_async(url)
+        finally:
+            await self.close()
 
     async def _scrape_async(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -44,20 +163,38 @@ class WebScraper(BaseScraper):
         log.info(f"Scraping web page: {url}")
 
         try:
-            async with async_playwright() as p:
-                # Launch browser
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            # Fresh context per scrape on the shared browser
+            browser = await get_browser()
+            context = await browser.new_context()
+
+            try:
+                await context.route('**/*', _block_subresources)
 
                 # Set user agent
-                await page.set_extra_http_headers({
+                await context.set_extra_http_headers({
                     'User-Agent': 'RAGBot/1.0 (Educational purposes; Knowledge base builder)',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                     'Accept-Language': 'en-US,en;q=0.9,fr;q=0.8',
                 })
 
-                # Navigate to page and wait for content to load
-                await page.goto(url, wait_until='networkidle', timeout=30000)
+                page = await context.new_page()
+
+                # Stop as soon as the response headers are in if the URL is
+                # not an HTML page or is too large to be worth loading
+                response = await page.goto(url, wait_until='commit', timeout=30000)
+                rejection = self._check_response(response)
+                if rejection:
+                    log.warning(f"Skipping {url}: {rejection}")
+                    return self._create_result(
+                        url=url,
+                        content="",
+                        metadata={},
+                        success=False,
+                        error=rejection
+                    )
+
+                # Wait for content to load
+                await page.wait_for_load_state('networkidle', timeout=30000)
 
                 # Extra wait for dynamic content (JavaScript rendering)
                 await asyncio.sleep(2)
@@ -65,20 +202,21 @@ class WebScraper(BaseScraper):
                 # Get HTML content
                 html = await page.content()
 
-                # Close browser
-                await browser.close()
-
-            # Parse HTML
-            soup = BeautifulSoup(html, 'lxml')
+            finally:
+                await context.close()
 
-            # Extract metadata
-            metadata = self._extract_metadata(soup, url)
+            if len(html) > self.MAX_PAGE_BYTES:
+                log.warning(f"Skipping {url}: page too large ({len(html)} chars)")
+                return self._create_result(
+                    url=url,
+                    content="",
+                    metadata={},
+                    success=False,
+                    error=f"Page too large ({len(html)} chars)"
+                )
 
-            # Extract main content
-            content = self._extract_content(soup)
-
-            # Convert to markdown
-            markdown_content = self._html_to_markdown(content, soup)
+            # Parsing is CPU-bound; keep the loop free for other page loads
+            markdown_content, metadata = await asyncio.to_thread(self._parse_page, html, url)
 
             full_metadata = {
                 **metadata,
@@ -116,12 +254,59 @@ class WebScraper(BaseScraper):
                 error=str(e)
             )
 
-    def _extract_metadata(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    def _check_response(self, response) -> Optional[str]:
+        """
+        Decide from the response headers whether a page is worth loading.
+
+        Args:
+            response: Playwright navigation response (None for same-page
+                navigations)
+
+        Returns:
+            Reason to skip the page, or None to continue
+        """
+        if response is None:
+            return None
+
+        content_type = response.headers.get('content-type', '')
+        if content_type and 'html' not in content_type.lower():
+            return f"Not an HTML page ({content_type.split(';')[0]})"
+
+        content_length = response.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > self.MAX_PAGE_BYTES:
+            return f"Page too large ({content_length} bytes)"
+
+        return None
+
+    def _parse_page(self, html: str, url: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Turn page HTML into Markdown content and metadata.
+
+        Args:
+            html: Page HTML
+            url: Source URL
+
+        Returns:
+            Tuple of (markdown content, metadata)
+        """
+        # Parse HTML
+        tree = lxml_html.document_fromstring(html)
+
+        # Extract metadata
+        metadata = self._extract_metadata(tree, url)
+
+        # Extract main content
+        content = self._extract_content(tree)
+
+        # Convert to markdown
+        return self._html_to_markdown(content), metadata
+
+    def _extract_metadata(self, tree: lxml_html.HtmlElement, url: str) -> Dict[str, Any]:
         """
         Extract metadata from HTML.
 
         Args:
-            soup: BeautifulSoup object
+            tree: Parsed HTML document (<html> element)
             url: Source URL
 
         Returns:
@@ -129,108 +314,103 @@ class WebScraper(BaseScraper):
         """
         metadata = {}
 
+        # One walk over <title> and <meta> elements, keeping the first
+        # title and the first content of each meta tag we care about
+        title = None
+        meta = {}
+        for element in tree.iter('title', 'meta'):
+            if element.tag == 'title':
+                if title is None:
+                    title = element.text_content().strip()
+                continue
+
+            for attr in ('name', 'property'):
+                key = (attr, element.get(attr))
+                if key in _METADATA_META_TAGS and key not in meta:
+                    meta[key] = element.get('content', '').strip()
+
         # Title
-        title_tag = soup.find('title')
-        metadata['title'] = title_tag.get_text().strip() if title_tag else ''
+        metadata['title'] = title or ''
 
         # Meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if not meta_desc:
-            meta_desc = soup.find('meta', attrs={'property': 'og:description'})
-        metadata['description'] = meta_desc.get('content', '').strip() if meta_desc else ''
+        metadata['description'] = (
+            meta.get(('name', 'description')) or
+            meta.get(('property', 'og:description'), '')
+        )
 
         # Author
-        author_meta = soup.find('meta', attrs={'name': 'author'})
-        metadata['author'] = author_meta.get('content', '').strip() if author_meta else ''
+        metadata['author'] = meta.get(('name', 'author'), '')
 
         # Published date
-        date_meta = soup.find('meta', attrs={'property': 'article:published_time'})
-        if not date_meta:
-            date_meta = soup.find('meta', attrs={'name': 'publish-date'})
-        metadata['published_at'] = date_meta.get('content', '').strip() if date_meta else ''
+        metadata['published_at'] = (
+            meta.get(('property', 'article:published_time')) or
+            meta.get(('name', 'publish-date'), '')
+        )
 
         # Domain
         parsed = urlparse(url)
         metadata['domain'] = parsed.netloc
 
         # Language
-        html_tag = soup.find('html')
-        metadata['language'] = html_tag.get('lang', 'en') if html_tag else 'en'
+        metadata['language'] = tree.get('lang', 'en')
 
         return metadata
 
-    def _extract_content(self, soup: BeautifulSoup) -> BeautifulSoup:
+    def _extract_content(self, tree: lxml_html.HtmlElement) -> lxml_html.HtmlElement:
         """
         Extract main content from HTML, removing navigation, footer, etc.
 
+        Modifies the tree in place.
+
         Args:
-            soup: BeautifulSoup object
+            tree: Parsed HTML document (<html> element)
 
         Returns:
-            BeautifulSoup object with main content only
-        """
-        import re
-
-        # Remove unwanted elements by tag
-        for element in soup(['script', 'style', 'nav', 'header', 'footer',
-                            'aside', 'iframe', 'noscript']):
-            element.decompose()
-
-        # Remove elements with specific classes/IDs (more precise patterns)
-        # Use word boundaries to avoid false matches like 'gradient' matching 'ad'
-        unwanted_patterns = [
-            r'\bnav\b', r'\bmenu\b', r'\bsidebar\b',
-            r'\badvertisement\b', r'\bcookie\b',
-            r'\bfooter\b', r'\bheader\b',
-            r'\bsocial\b', r'\bshare\b', r'\bcomment\b'
-        ]
-
-        for pattern in unwanted_patterns:
-            regex = re.compile(pattern, re.IGNORECASE)
-            for element in soup.find_all(class_=lambda x: x and any(regex.search(cls) for cls in (x if isinstance(x, list) else [x]))):
-                element.decompose()
-            for element in soup.find_all(id=lambda x: x and regex.search(x)):
-                element.decompose()
-
-        # Try to find main content area
-        main_content = (
-            soup.find('main') or
-            soup.find('article') or
-            soup.find('div', class_=lambda x: x and 'content' in x.lower()) or
-            soup.find('div', id=lambda x: x and 'content' in x.lower()) or
-            soup.find('body')
-        )
+            Element with main content only
+        """
+        # Remove unwanted elements by tag in one C-level pass
+        etree.strip_elements(tree, *_UNWANTED_TAGS, with_tail=False)
+
+        # Remove elements with specific classes/IDs, keeping the text that
+        # follows them. Descendants of an already-dropped element are
+        # dropped from the detached subtree, which is harmless
+        for element in _UNWANTED_ATTR_XPATH(tree):
+            element.drop_tree()
+
+        # Try to find main content area (elements without children are
+        # falsy in lxml, hence the explicit loop instead of `or`)
+        main_content = None
+        for xpath in _MAIN_CONTENT_XPATHS:
+            found = xpath(tree)
+            if found:
+                main_content = found[0]
+                break
 
         # If main content is too small (< 500 chars), fall back to body
-        if main_content and len(main_content.get_text()) < 500:
-            body = soup.find('body')
-            if body and len(body.get_text()) > len(main_content.get_text()):
-                main_content = body
+        if main_content is not None:
+            main_length = len(main_content.text_content())
+            if main_length < 500:
+                body = tree.find('body')
+                if body is not None and len(body.text_content()) > main_length:
+                    main_content = body
 
-        return main_content if main_content else soup
+        return main_content if main_content is not None else tree
 
-    def _html_to_markdown(self, content: BeautifulSoup, soup: BeautifulSoup) -> str:
+    def _html_to_markdown(self, content: lxml_html.HtmlElement) -> str:
         """
         Convert HTML content to Markdown.
 
         Args:
-            content: BeautifulSoup object with content
-            soup: Original soup (for fallback)
+            content: Element with content
 
         Returns:
             Markdown formatted string
         """
-        if not content:
-            content = soup
-
-        # Convert to markdown
-        markdown = md(str(content), heading_style="ATX", bullets="-")
-
-        # Clean up excessive newlines
-        import re
-        markdown = re.sub(r'\n{3,}', '\n\n', markdown)
+        # Convert to markdown (without the tail text following the element)
+        html = lxml_html.tostring(content, encoding='unicode', with_tail=False)
+        markdown = _MARKDOWN_CONVERTER.convert(html)
 
-        # Remove excessive whitespace
-        markdown = re.sub(r' +', ' ', markdown)
+        # Collapse excessive newlines and runs of spaces in one pass
+        markdown = _MARKDOWN_CLEANUP_RE.sub(_collapse_whitespace, markdown)
 
         return markdown.strip()
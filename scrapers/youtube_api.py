@@ -0,0 +1,42 @@
+"""
+YouTube Data API client shared by the YouTube scraper and channel crawler.
+"""
+from googleapiclient.discovery import build
+from googleapiclient.model import JsonModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel decoding responses with orjson (several times faster than json)."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Let the stock model deal with non-JSON bodies
+            return super().deserialize(content)
+
+        if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+            body = body['data']
+        return body
+
+
+def build_youtube_client(api_key: str):
+    """
+    Build a YouTube Data API v3 client.
+
+    Responses are decoded with orjson when it is installed, which matters
+    for channel crawls paging through hundreds of playlist items.
+
+    Args:
+        api_key: YouTube Data API key
+
+    Returns:
+        googleapiclient Resource for the YouTube API
+    """
+    model = _OrjsonModel() if orjson is not None else None
+    return build('youtube', 'v3', developerKey=api_key, model=model)
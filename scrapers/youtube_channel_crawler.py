@@ -2,12 +2,31 @@
 YouTube channel crawler to discover video URLs.
 """
 from typing import List, Optional, Dict, Any
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from config import settings
 from utils import log
+from .youtube_api import build_youtube_client
 import re
 
+# Channel URL formats: /channel/ID, /c/NAME or /@HANDLE, /user/USERNAME (legacy)
+_CHANNEL_ID_RE = re.compile(r'/channel/([^/?]+)')
+_CHANNEL_HANDLE_RE = re.compile(r'/(?:c|@)([^/?]+)')
+_CHANNEL_USER_RE = re.compile(r'/user/([^/?]+)')
+
+# 11-character video ID in watch?v=ID, youtu.be/ID, /embed/ID, ...
+_VIDEO_ID_RE = re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11})(?:[&?]|$)')
+
+# Partial response for playlist pages: only what _get_playlist_videos reads
+_PLAYLIST_PAGE_FIELDS = 'nextPageToken,items(contentDetails(videoId))'
+
+# Process-wide memo of API lookups that never change (successes only, so
+# transient API failures are retried). Module-level because callers create
+# short-lived crawler instances
+_channel_id_by_handle: Dict[str, str] = {}
+_channel_id_by_username: Dict[str, str] = {}
+_channel_url_by_id: Dict[str, str] = {}
+_channel_url_by_video: Dict[str, str] = {}
+
 
 class YouTubeChannelCrawler:
     """Crawler for discovering videos from YouTube channels."""
@@ -16,7 +35,7 @@ class YouTubeChannelCrawler:
         """Initialize YouTube channel crawler."""
         self.api_key = settings.youtube_api_key
         if self.api_key:
-            self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+            self.youtube = build_youtube_client(self.api_key)
         else:
             self.youtube = None
             log.warning("YouTube API key not configured - channel crawling disabled")
@@ -127,19 +146,19 @@ class YouTubeChannelCrawler:
             Channel ID or None
         """
         # Pattern 1: /channel/CHANNEL_ID
-        match = re.search(r'/channel/([^/?]+)', channel_url)
+        match = _CHANNEL_ID_RE.search(channel_url)
         if match:
             return match.group(1)
 
         # Pattern 2: /c/CHANNEL_NAME or /@CHANNEL_HANDLE
         # Need to resolve via API
-        match = re.search(r'/(?:c|@)([^/?]+)', channel_url)
+        match = _CHANNEL_HANDLE_RE.search(channel_url)
         if match:
             channel_identifier = match.group(1)
             return self._resolve_channel_handle(channel_identifier)
 
         # Pattern 3: /user/USERNAME (legacy)
-        match = re.search(r'/user/([^/?]+)', channel_url)
+        match = _CHANNEL_USER_RE.search(channel_url)
         if match:
             username = match.group(1)
             return self._resolve_username(username)
@@ -159,6 +178,9 @@ class YouTubeChannelCrawler:
         if not self.youtube:
             return None
 
+        if handle in _channel_id_by_handle:
+            return _channel_id_by_handle[handle]
+
         try:
             # Method 1: Try forUsername (works for /c/ custom URLs)
             try:
@@ -171,6 +193,7 @@ class YouTubeChannelCrawler:
                 if response.get('items'):
                     channel_id = response['items'][0]['id']
                     log.info(f"Resolved '{handle}' to channel ID: {channel_id} (via forUsername)")
+                    _channel_id_by_handle[handle] = channel_id
                     return channel_id
             except Exception as e:
                 log.debug(f"forUsername failed for {handle}: {e}")
@@ -187,6 +210,7 @@ class YouTubeChannelCrawler:
             if response.get('items'):
                 channel_id = response['items'][0]['snippet']['channelId']
                 log.info(f"Resolved '{handle}' to channel ID: {channel_id} (via search)")
+                _channel_id_by_handle[handle] = channel_id
                 return channel_id
 
         except Exception as e:
@@ -207,6 +231,9 @@ class YouTubeChannelCrawler:
         if not self.youtube:
             return None
 
+        if username in _channel_id_by_username:
+            return _channel_id_by_username[username]
+
         try:
             request = self.youtube.channels().list(
                 part='id',
@@ -215,7 +242,9 @@ class YouTubeChannelCrawler:
             response = request.execute()
 
             if response.get('items'):
-                return response['items'][0]['id']
+                channel_id = response['items'][0]['id']
+                _channel_id_by_username[username] = channel_id
+                return channel_id
 
         except Exception as e:
             log.error(f"Error resolving username {username}: {e}")
@@ -277,11 +306,14 @@ class YouTubeChannelCrawler:
 
         try:
             while len(video_ids) < max_results:
+                # Pages can only be fetched in order (each needs the previous
+                # page's token), so make each one as small as possible
                 request = self.youtube.playlistItems().list(
                     part='contentDetails',
                     playlistId=playlist_id,
                     maxResults=min(50, max_results - len(video_ids)),
-                    pageToken=next_page_token
+                    pageToken=next_page_token,
+                    fields=_PLAYLIST_PAGE_FIELDS
                 )
                 response = request.execute()
 
@@ -312,12 +344,15 @@ class YouTubeChannelCrawler:
             return None
 
         # Extract video ID
-        video_id_match = re.search(r'(?:v=|/)([0-9A-Za-z_-]{11})(?:[&?]|$)', video_url)
+        video_id_match = _VIDEO_ID_RE.search(video_url)
         if not video_id_match:
             return None
 
         video_id = video_id_match.group(1)
 
+        if video_id in _channel_url_by_video:
+            return _channel_url_by_video[video_id]
+
         try:
             # Get video details to find channel ID
             request = self.youtube.videos().list(
@@ -330,25 +365,42 @@ class YouTubeChannelCrawler:
                 return None
 
             channel_id = response['items'][0]['snippet']['channelId']
-            channel_title = response['items'][0]['snippet']['channelTitle']
-
-            # Try to get custom URL/handle
-            channel_request = self.youtube.channels().list(
-                part='snippet',
-                id=channel_id
-            )
-            channel_response = channel_request.execute()
+            channel_url = _channel_url_by_id.get(channel_id)
 
-            if channel_response.get('items'):
-                custom_url = channel_response['items'][0]['snippet'].get('customUrl')
-                if custom_url:
-                    # Return @handle format (remove @ prefix if already present)
-                    handle = custom_url.lstrip('@')
-                    return f"https://youtube.com/@{handle}"
+            if channel_url is None:
+                channel_url = self._get_channel_url(channel_id)
+                _channel_url_by_id[channel_id] = channel_url
 
-            # Fallback to channel ID format
-            return f"https://youtube.com/channel/{channel_id}"
+            _channel_url_by_video[video_id] = channel_url
+            return channel_url
 
         except Exception as e:
             log.debug(f"Could not extract channel from video {video_id}: {e}")
             return None
+
+    def _get_channel_url(self, channel_id: str) -> str:
+        """
+        Build the public URL of a channel, preferring its @handle.
+
+        Args:
+            channel_id: YouTube channel ID
+
+        Returns:
+            Channel URL (@handle format, or /channel/ID if it has no handle)
+        """
+        # Try to get custom URL/handle
+        channel_request = self.youtube.channels().list(
+            part='snippet',
+            id=channel_id
+        )
+        channel_response = channel_request.execute()
+
+        if channel_response.get('items'):
+            custom_url = channel_response['items'][0]['snippet'].get('customUrl')
+            if custom_url:
+                # Return @handle format (remove @ prefix if already present)
+                handle = custom_url.lstrip('@')
+                return f"https://youtube.com/@{handle}"
+
+        # Fallback to channel ID format
+        return f"https://youtube.com/channel/{channel_id}"
@@ -1,28 +1,108 @@
 """
 YouTube scraper for video transcriptions and metadata.
 """
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from config import settings
 from utils import log, extract_youtube_video_id
 from .base_scraper import BaseScraper
+from .youtube_api import build_youtube_client
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Preferred transcript languages, in order
+_TRANSCRIPT_LANGUAGES = ['fr', 'en', 'es', 'de', 'it']
+
+# Temporary errors (retriable)
+_TEMPORARY_ERROR_INDICATORS = (
+    'rate limit',
+    'quota',
+    'too many requests',
+    'blocked',
+    'ip',
+    'timeout',
+    'timed out',
+    'connection',
+    'network',
+    '429',  # Too Many Requests
+    '503',  # Service Unavailable
+    '502',  # Bad Gateway
+    '504',  # Gateway Timeout
+    'server error',
+    'temporarily unavailable',
+    'try again later'
+)
+
+# Permanent errors (not retriable)
+_PERMANENT_ERROR_INDICATORS = (
+    'video unavailable',
+    'private video',
+    'deleted',
+    'removed',
+    '404',  # Not Found
+    'no transcript',
+    'transcripts disabled',
+    'invalid',
+    'not found',
+    'copyright'
+)
+
+# One substring scan per category instead of one per indicator
+_TEMPORARY_ERROR_RE = re.compile('|'.join(map(re.escape, _TEMPORARY_ERROR_INDICATORS)))
+_PERMANENT_ERROR_RE = re.compile('|'.join(map(re.escape, _PERMANENT_ERROR_INDICATORS)))
 
 
 class YouTubeScraper(BaseScraper):
     """Scraper for YouTube video transcriptions and metadata."""
 
+    # Keep-alive pool shared by every transcript request of this scraper
+    HTTP_POOL_CONNECTIONS = 8
+    HTTP_POOL_MAXSIZE = 16
+
+    # Maximum IDs accepted by one videos().list call
+    VIDEOS_PER_API_CALL = 50
+
+    # Prefetched metadata kept for videos not scraped yet; the oldest
+    # entries are dropped past this (they are refetched one by one)
+    METADATA_CACHE_SIZE = 5000
+
+    # Start time reserved for the next YouTube request, shared by every
+    # instance and thread so the configured spacing holds process-wide
+    _next_request_at = 0.0
+    _request_lock = threading.Lock()
+
     def __init__(self):
         """Initialize YouTube scraper."""
         super().__init__()
+
+        # One pooled session instead of a new connection per transcript
+        # request. Only gateway errors are retried here: 429s are left to
+        # the queue's back-off (see is_temporary_error)
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=self.HTTP_POOL_MAXSIZE,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+        self.transcript_api = YouTubeTranscriptApi(http_client=self.http_session)
+
+        # Video ID -> metadata filled by prefetch_metadata(), consumed on scrape
+        self._metadata_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
         self.api_key = settings.youtube_api_key
         if self.api_key:
-            self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+            self.youtube = build_youtube_client(self.api_key)
         else:
             self.youtube = None
             log.warning("YouTube API key not configured - metadata will be limited")
@@ -40,46 +120,12 @@ class YouTubeScraper(BaseScraper):
         """
         error_lower = error_message.lower()
 
-        # Temporary errors (retriable)
-        temporary_indicators = [
-            'rate limit',
-            'quota',
-            'too many requests',
-            'blocked',
-            'ip',
-            'timeout',
-            'timed out',
-            'connection',
-            'network',
-            '429',  # Too Many Requests
-            '503',  # Service Unavailable
-            '502',  # Bad Gateway
-            '504',  # Gateway Timeout
-            'server error',
-            'temporarily unavailable',
-            'try again later'
-        ]
-
-        # Permanent errors (not retriable)
-        permanent_indicators = [
-            'video unavailable',
-            'private video',
-            'deleted',
-            'removed',
-            '404',  # Not Found
-            'no transcript',
-            'transcripts disabled',
-            'invalid',
-            'not found',
-            'copyright'
-        ]
-
         # Check for permanent errors first (higher priority)
-        if any(indicator in error_lower for indicator in permanent_indicators):
+        if _PERMANENT_ERROR_RE.search(error_lower):
             return False
 
         # Check for temporary errors
-        if any(indicator in error_lower for indicator in temporary_indicators):
+        if _TEMPORARY_ERROR_RE.search(error_lower):
             return True
 
         # Default: treat unknown errors as temporary (safer to retry)
@@ -109,11 +155,8 @@ class YouTubeScraper(BaseScraper):
         log.info(f"Scraping YouTube video: {video_id}")
 
         try:
-            # Add random delay to simulate human behavior and avoid rate limiting
-            # Varies the delay to appear more natural (80-120% of configured delay)
-            base_delay = settings.youtube_delay_between_requests
-            random_delay = base_delay * random.uniform(0.8, 1.2)
-            time.sleep(random_delay)
+            # Space requests out to avoid rate limiting
+            self._wait_for_request_slot()
 
             # Get transcript
             transcript_result = self._get_transcript(video_id)
@@ -175,6 +218,49 @@ class YouTubeScraper(BaseScraper):
                 is_temporary_error=is_temp
             )
 
+    def scrape_many(self, urls: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Scrape several YouTube videos concurrently.
+
+        Requests still start no faster than youtube_delay_between_requests
+        allows, but one video's fetch overlaps with the wait for the next.
+
+        Args:
+            urls: YouTube video URLs
+            max_workers: Maximum concurrent scrapes (default: settings.youtube_concurrent_workers)
+
+        Returns:
+            List of scrape() results, in the same order as urls
+        """
+        if not urls:
+            return []
+
+        max_workers = max(1, max_workers or settings.youtube_concurrent_workers)
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(urls)),
+            thread_name_prefix="youtube-scrape"
+        ) as pool:
+            return list(pool.map(self.scrape, urls))
+
+    @classmethod
+    def _wait_for_request_slot(cls) -> None:
+        """
+        Block until this thread may send its next YouTube request.
+
+        Request start times are handed out at least one jittered delay
+        (80-120% of youtube_delay_between_requests, to look less robotic)
+        apart across all threads, so concurrent scrapes can't burst.
+        """
+        interval = settings.youtube_delay_between_requests * random.uniform(0.8, 1.2)
+
+        with cls._request_lock:
+            now = time.monotonic()
+            start_at = max(now, cls._next_request_at)
+            cls._next_request_at = start_at + interval
+
+        if start_at > now:
+            time.sleep(start_at - now)
+
     def _get_transcript(self, video_id: str) -> Dict[str, Any]:
         """
         Get video transcript.
@@ -186,37 +272,37 @@ class YouTubeScraper(BaseScraper):
             Dictionary with transcript content and segments
         """
         try:
-            # Try to get transcript in different languages
-            languages_to_try = ['fr', 'en', 'es', 'de', 'it']
-
-            segments = None
-            language_used = None
-
-            for lang in languages_to_try:
-                try:
-                    segments = YouTubeTranscriptApi().fetch(video_id, languages=[lang])
-                    language_used = lang
-                    break
-                except:
-                    continue
-
-            # If no language worked, try without specifying language
-            if segments is None:
-                segments = YouTubeTranscriptApi().fetch(video_id)
-                language_used = 'auto'
-
-            # Combine all segments into full text
-            full_text = "\n".join([segment.text for segment in segments])
-
-            # Store segment information for chunking
-            segment_info = [
-                {
-                    'start': self._format_timestamp(segment.start),
+            # One request lists every transcript; pick by language preference
+            # (manual before auto-generated within each language)
+            transcript_list = self.transcript_api.list(video_id)
+
+            try:
+                transcript = transcript_list.find_transcript(_TRANSCRIPT_LANGUAGES)
+            except NoTranscriptFound:
+                # Fall back to whatever transcript the video has
+                transcript = next(iter(transcript_list), None)
+                if transcript is None:
+                    raise
+
+            segments = transcript.fetch()
+            language_used = transcript.language_code
+
+            # Collect the full text and per-segment info (for chunking) in
+            # a single pass over the segments
+            text_parts = []
+            segment_info = []
+            format_timestamp = self._format_timestamp
+
+            for segment in segments:
+                text = segment.text
+                text_parts.append(text)
+                segment_info.append({
+                    'start': format_timestamp(segment.start),
                     'duration': segment.duration,
-                    'text': segment.text
-                }
-                for segment in segments
-            ]
+                    'text': text
+                })
+
+            full_text = "\n".join(text_parts)
 
             log.info(f"Retrieved transcript with {len(segments)} segments (language: {language_used})")
 
@@ -243,6 +329,64 @@ class YouTubeScraper(BaseScraper):
                 'error': str(e)
             }
 
+    def prefetch_metadata(self, video_ids: List[str]) -> int:
+        """
+        Fetch metadata for videos that will be scraped later, in batches.
+
+        The results are consumed by _get_metadata() when each video is
+        scraped, saving one API call (and quota unit) per video.
+
+        Args:
+            video_ids: YouTube video IDs
+
+        Returns:
+            Number of videos whose metadata was cached
+        """
+        metadata_by_id = self._get_metadata_batch(video_ids)
+        self._metadata_cache.update(metadata_by_id)
+        while len(self._metadata_cache) > self.METADATA_CACHE_SIZE:
+            self._metadata_cache.popitem(last=False)
+        return len(metadata_by_id)
+
+    def _get_metadata_batch(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metadata for many videos, up to VIDEOS_PER_API_CALL per request.
+
+        Args:
+            video_ids: YouTube video IDs
+
+        Returns:
+            Dictionary mapping video ID to metadata (missing videos omitted)
+        """
+        if not self.youtube:
+            return {}
+
+        metadata_by_id = {}
+
+        for start in range(0, len(video_ids), self.VIDEOS_PER_API_CALL):
+            chunk = video_ids[start:start + self.VIDEOS_PER_API_CALL]
+            try:
+                request = self.youtube.videos().list(
+                    part='snippet,contentDetails,statistics',
+                    id=','.join(chunk),
+                    maxResults=self.VIDEOS_PER_API_CALL
+                )
+                response = request.execute()
+
+            except HttpError as e:
+                log.error(f"YouTube API error for {len(chunk)} videos: {e}")
+                continue
+
+            except Exception as e:
+                log.error(f"Error getting metadata for {len(chunk)} videos: {e}")
+                continue
+
+            for item in response.get('items', []):
+                metadata_by_id[item['id']] = self._parse_video_item(item)
+
+        log.info(f"Retrieved metadata for {len(metadata_by_id)}/{len(video_ids)} videos")
+        return metadata_by_id
+
     def _get_metadata(self, video_id: str) -> Dict[str, Any]:
         """
         Get video metadata from YouTube API.
@@ -253,6 +397,11 @@ class YouTubeScraper(BaseScraper):
         Returns:
             Dictionary with video metadata
         """
+        # Already fetched by prefetch_metadata()
+        cached = self._metadata_cache.pop(video_id, None)
+        if cached is not None:
+            return cached
+
         if not self.youtube:
             return {}
 
@@ -267,23 +416,7 @@ class YouTubeScraper(BaseScraper):
                 log.warning(f"No metadata found for video {video_id}")
                 return {}
 
-            item = response['items'][0]
-            snippet = item.get('snippet', {})
-            statistics = item.get('statistics', {})
-            content_details = item.get('contentDetails', {})
-
-            metadata = {
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'channel': snippet.get('channelTitle', ''),
-                'channel_id': snippet.get('channelId', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'duration': content_details.get('duration', ''),
-                'view_count': int(statistics.get('viewCount', 0)),
-                'like_count': int(statistics.get('likeCount', 0)),
-                'comment_count': int(statistics.get('commentCount', 0)),
-                'tags': snippet.get('tags', [])
-            }
+            metadata = self._parse_video_item(response['items'][0])
 
             log.info(f"Retrieved metadata for: {metadata['title']}")
             return metadata
@@ -296,6 +429,34 @@ class YouTubeScraper(BaseScraper):
             log.error(f"Error getting metadata for {video_id}: {e}")
             return {}
 
+    @staticmethod
+    def _parse_video_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a videos().list item into our metadata format.
+
+        Args:
+            item: Item from a YouTube API videos().list response
+
+        Returns:
+            Dictionary with video metadata
+        """
+        snippet = item.get('snippet', {})
+        statistics = item.get('statistics', {})
+        content_details = item.get('contentDetails', {})
+
+        return {
+            'title': snippet.get('title', ''),
+            'description': snippet.get('description', ''),
+            'channel': snippet.get('channelTitle', ''),
+            'channel_id': snippet.get('channelId', ''),
+            'published_at': snippet.get('publishedAt', ''),
+            'duration': content_details.get('duration', ''),
+            'view_count': int(statistics.get('viewCount', 0)),
+            'like_count': int(statistics.get('likeCount', 0)),
+            'comment_count': int(statistics.get('commentCount', 0)),
+            'tags': snippet.get('tags', [])
+        }
+
     @staticmethod
     def _format_timestamp(seconds: float) -> str:
         """
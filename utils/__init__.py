@@ -1,8 +1,13 @@
 from .logging_setup import log
+from .hashing import compute_content_hash
 from .url_utils import (
+    SourceType,
+    SOURCE_TYPE_IDS,
     extract_urls,
     normalize_url,
+    normalize_urls,
     compute_url_hash,
+    compute_url_hashes,
     detect_url_type,
     extract_youtube_video_id,
     extract_github_repo_info,
@@ -11,9 +16,14 @@ from .url_utils import (
 
 __all__ = [
     "log",
+    "compute_content_hash",
+    "SourceType",
+    "SOURCE_TYPE_IDS",
     "extract_urls",
     "normalize_url",
+    "normalize_urls",
     "compute_url_hash",
+    "compute_url_hashes",
     "detect_url_type",
     "extract_youtube_video_id",
     "extract_github_repo_info",
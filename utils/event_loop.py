@@ -0,0 +1,26 @@
+"""
+Event loop setup.
+"""
+import asyncio
+from utils import log
+
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop as the asyncio event loop if it is installed.
+
+    Must be called before asyncio.run(). Falls back silently to the
+    default loop when uvloop is unavailable (e.g. on Windows).
+
+    Returns:
+        True if uvloop was installed
+    """
+    try:
+        import uvloop
+    except ImportError:
+        log.debug("uvloop not installed - using default asyncio event loop")
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    log.debug("Using uvloop event loop")
+    return True
@@ -0,0 +1,42 @@
+"""
+Content hashing for change detection.
+"""
+import base64
+import hashlib
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Characters encoded per hash update (bounds the temporary bytes buffer)
+HASH_SLICE_CHARS = 64 * 1024
+
+
+def compute_content_hash(content: str) -> str:
+    """
+    Compute a fast, non-cryptographic hash of scraped content.
+
+    Uses xxh3-128 when xxhash is installed and falls back to BLAKE2b.
+    The 16-byte digest is stored base64-encoded (22 chars instead of 32
+    for hex) and prefixed with the algorithm name, so hashes written by
+    a different algorithm or encoding (including older untagged MD5 hex
+    values) never compare equal by accident.
+
+    Args:
+        content: Content to hash
+
+    Returns:
+        Tagged base64 hash, e.g. "xxh3:Hwzq..."
+    """
+    if xxhash is not None:
+        tag, hasher = "xxh3", xxhash.xxh3_128()
+    else:
+        tag, hasher = "blake2b", hashlib.blake2b(digest_size=16)
+
+    # Encode in slices so large pages never get a second full-size copy
+    for start in range(0, len(content), HASH_SLICE_CHARS):
+        hasher.update(content[start:start + HASH_SLICE_CHARS].encode('utf-8'))
+
+    digest = hasher.digest()
+    return f"{tag}:{base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')}"
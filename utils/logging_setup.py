@@ -6,6 +6,9 @@ from pathlib import Path
 from loguru import logger
 from config import settings
 
+_PLAIN_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}"
+_COLOR_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>"
+
 
 def setup_logging():
     """Configure loguru logger with file and console output."""
@@ -13,22 +16,26 @@ def setup_logging():
     # Remove default handler
     logger.remove()
 
-    # Add console handler with colors
+    # Add console handler, with colors only on an interactive terminal
+    # (piped/batch output gets the plain format, no color markup to process)
+    colorize_console = sys.stdout.isatty()
     logger.add(
         sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
+        format=_COLOR_FORMAT if colorize_console else _PLAIN_FORMAT,
         level=settings.log_level,
-        colorize=True
+        colorize=colorize_console
     )
 
     # Ensure log directory exists
     log_file_path = Path(settings.log_file)
     log_file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Add file handler with rotation
+    # Add file handler with rotation (optionally as JSON lines, so log
+    # processing doesn't have to parse the text format)
     logger.add(
         settings.log_file,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}",
+        format=_PLAIN_FORMAT,
+        serialize=settings.log_json,
         level=settings.log_level,
         rotation="100 MB",
         retention="30 days",
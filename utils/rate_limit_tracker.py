@@ -3,9 +3,199 @@ Brave Search API Rate Limit Tracker.
 """
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from config import settings
 from utils import log
+import atexit
 import sqlite3
+import threading
+import time
+
+# Statements cached per connection by the sqlite3 module (default is 128 on
+# recent Pythons, but older ones use far fewer)
+_CACHED_STATEMENTS = 128
+
+# One connection per database file, shared by all trackers: callers create a
+# short-lived tracker for every logged query, so per-instance connections
+# would still mean a connect (and CREATE TABLE) per query
+_databases: Dict[str, "_UsageLogDatabase"] = {}
+_databases_lock = threading.Lock()
+
+# Same tuning as the URL database connections (database/connection_pool.py),
+# so dashboard reads don't block behind log_query inserts and each insert
+# doesn't fsync. Lock waits are already covered by sqlite3's default 5s
+# timeout
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Buffered usage rows are written in one transaction every interval, or
+# sooner once this many are pending
+_FLUSH_INTERVAL = 1.0  # seconds
+_FLUSH_BATCH_SIZE = 50
+
+# A status screen calls get_daily_usage several times in a row (status,
+# quota and warning checks); reuse the result for this long unless a
+# query is logged in between
+_USAGE_CACHE_TTL = 1.0  # seconds
+
+# Statements run on every query log / dashboard refresh. sqlite3 keeps
+# prepared statements keyed by SQL text, so using the same strings
+# everywhere keeps them compiled on the shared connection
+_INSERT_SQL = """
+    INSERT INTO api_usage_log (
+        api_name, query, timestamp, success, response_time_ms, remaining_quota
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# One pass over the day's rows for all three daily usage figures
+_DAILY_USAGE_SQL = """
+    SELECT
+        COUNT(*),
+        SUM(success = 1),
+        AVG(CASE WHEN success = 1 THEN response_time_ms END)
+    FROM api_usage_log
+    WHERE api_name = 'brave_search'
+    AND timestamp >= ?
+    AND timestamp < ?
+"""
+
+_RECENT_QUERIES_SQL = """
+    SELECT query, timestamp, success, response_time_ms
+    FROM api_usage_log
+    WHERE api_name = 'brave_search'
+    ORDER BY timestamp DESC, id DESC
+    LIMIT ?
+"""
+
+
+class _UsageLogDatabase:
+    """Connection and pending usage rows shared by all trackers of one database."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        # (monotonic time, day, usage dict) of the last daily usage query
+        self.usage_cache: Optional[Tuple[float, str, Dict[str, Any]]] = None
+
+    def insert(self, row: tuple):
+        """Write a usage row immediately."""
+        with self.lock:
+            self.conn.execute(_INSERT_SQL, row)
+
+    def buffer(self, row: tuple):
+        """Queue a usage row for the background flusher."""
+        with self._pending_lock:
+            self._pending.append(row)
+            backlog = len(self._pending)
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop,
+                    name="usage-log-flush",
+                    daemon=True
+                )
+                self._flusher.start()
+
+        if backlog >= _FLUSH_BATCH_SIZE:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write all buffered usage rows in a single transaction."""
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+
+        if not rows:
+            return
+
+        with self.lock:
+            try:
+                self.conn.execute("BEGIN")
+                self.conn.executemany(_INSERT_SQL, rows)
+                self.conn.execute("COMMIT")
+            except Exception as e:
+                self.conn.rollback()
+                log.error(f"Error logging API usage ({len(rows)} queries lost): {e}")
+
+    def _flush_loop(self):
+        """Background thread: flush buffered rows periodically."""
+        while True:
+            self._wakeup.wait(_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+
+
+def _get_database(db_path: Path) -> _UsageLogDatabase:
+    """
+    Return the shared usage log database, opening it on first use.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        _UsageLogDatabase for the file
+    """
+    key = str(db_path)
+    with _databases_lock:
+        if key not in _databases:
+            conn = sqlite3.connect(
+                key,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=_CACHED_STATEMENTS
+            )
+            conn.row_factory = sqlite3.Row
+            if key != ':memory:':
+                for pragma in _PRAGMAS:
+                    conn.execute(pragma)
+            _ensure_table(conn)
+            _databases[key] = _UsageLogDatabase(conn)
+        return _databases[key]
+
+
+@atexit.register
+def _flush_all():
+    """Write rows still buffered at interpreter exit (the flusher is a daemon)."""
+    for database in list(_databases.values()):
+        database.flush()
+
+
+def _ensure_table(conn: sqlite3.Connection):
+    """Create api_usage_log table and its index if not exists."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_usage_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            api_name TEXT NOT NULL,
+            query TEXT,
+            timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            success BOOLEAN,
+            response_time_ms INTEGER,
+            remaining_quota INTEGER
+        )
+    """)
+
+    # Rows from older versions store CURRENT_TIMESTAMP text (UTC), which
+    # strftime('%s') reads as UTC too
+    migrated = conn.execute("""
+        UPDATE api_usage_log
+        SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+        WHERE typeof(timestamp) = 'text'
+    """).rowcount
+    if migrated:
+        log.info(f"Converted {migrated} API usage timestamps to epoch seconds")
+
+    # Daily usage is a range scan on (api_name, timestamp)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_api_log_ts
+        ON api_usage_log(api_name, timestamp)
+    """)
 
 
 class RateLimitTracker:
@@ -14,27 +204,7 @@ class RateLimitTracker:
     def __init__(self, db_path: str = "data/discovered_urls.db"):
         """Initialize rate limit tracker."""
         self.db_path = Path(db_path)
-        self._ensure_table()
-
-    def _ensure_table(self):
-        """Create api_usage_log table if not exists."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS api_usage_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                api_name TEXT NOT NULL,
-                query TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                success BOOLEAN,
-                response_time_ms INTEGER,
-                remaining_quota INTEGER
-            )
-        """)
-
-        conn.commit()
-        conn.close()
+        self._db = _get_database(self.db_path)
 
     def log_query(
         self,
@@ -52,24 +222,28 @@ class RateLimitTracker:
             response_time_ms: Response time in milliseconds
             remaining_quota: Remaining quota if available
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        # Stamped here since buffered rows are written up to a flush
+        # interval later
+        timestamp = int(time.time())
+        row = ("brave_search", query, timestamp, success, response_time_ms, remaining_quota)
 
-            cursor.execute("""
-                INSERT INTO api_usage_log (
-                    api_name, query, success, response_time_ms, remaining_quota
-                ) VALUES (?, ?, ?, ?, ?)
-            """, ("brave_search", query, success, response_time_ms, remaining_quota))
+        self._db.usage_cache = None
 
-            conn.commit()
-            conn.close()
+        try:
+            if settings.buffer_brave_usage_log:
+                self._db.buffer(row)
+            else:
+                self._db.insert(row)
 
-            log.debug(f"Logged Brave Search query: {query[:50]}...")
+            log.debug("Logged Brave Search query: {:.50}...", query)
 
         except Exception as e:
             log.error(f"Error logging API usage: {e}")
 
+    def flush(self):
+        """Write buffered query logs to the database now."""
+        self._db.flush()
+
     def get_daily_usage(self, date: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Get usage statistics for a specific day.
@@ -83,54 +257,35 @@ class RateLimitTracker:
         if date is None:
             date = datetime.now()
 
+        day = date.strftime('%Y-%m-%d')
+        cached = self._db.usage_cache
+        if cached is not None and cached[1] == day and time.monotonic() - cached[0] < _USAGE_CACHE_TTL:
+            return dict(cached[2])
+
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Count queries for the day
-            cursor.execute("""
-                SELECT COUNT(*) FROM api_usage_log
-                WHERE api_name = 'brave_search'
-                AND timestamp >= ?
-                AND timestamp < ?
-            """, (start_of_day.strftime('%Y-%m-%d %H:%M:%S'), end_of_day.strftime('%Y-%m-%d %H:%M:%S')))
-
-            queries_used = cursor.fetchone()[0]
-
-            # Get successful queries
-            cursor.execute("""
-                SELECT COUNT(*) FROM api_usage_log
-                WHERE api_name = 'brave_search'
-                AND timestamp >= ?
-                AND timestamp < ?
-                AND success = 1
-            """, (start_of_day.strftime('%Y-%m-%d %H:%M:%S'), end_of_day.strftime('%Y-%m-%d %H:%M:%S')))
-
-            queries_success = cursor.fetchone()[0]
-
-            # Get average response time
-            cursor.execute("""
-                SELECT AVG(response_time_ms) FROM api_usage_log
-                WHERE api_name = 'brave_search'
-                AND timestamp >= ?
-                AND timestamp < ?
-                AND success = 1
-            """, (start_of_day.strftime('%Y-%m-%d %H:%M:%S'), end_of_day.strftime('%Y-%m-%d %H:%M:%S')))
-
-            avg_response_time = cursor.fetchone()[0] or 0
-
-            conn.close()
+            self._db.flush()
 
-            return {
+            with self._db.lock:
+                queries_used, queries_success, avg_response_time = self._db.conn.execute(
+                    _DAILY_USAGE_SQL,
+                    (int(start_of_day.timestamp()), int(end_of_day.timestamp()))
+                ).fetchone()
+
+            queries_success = queries_success or 0
+            avg_response_time = avg_response_time or 0
+
+            usage = {
                 'queries_used': queries_used,
                 'queries_success': queries_success,
                 'queries_failed': queries_used - queries_success,
                 'avg_response_time_ms': int(avg_response_time),
-                'date': date.strftime('%Y-%m-%d')
+                'date': day
             }
+            self._db.usage_cache = (time.monotonic(), day, usage)
+            return dict(usage)
 
         except Exception as e:
             log.error(f"Error getting daily usage: {e}")
@@ -139,7 +294,7 @@ class RateLimitTracker:
                 'queries_success': 0,
                 'queries_failed': 0,
                 'avg_response_time_ms': 0,
-                'date': date.strftime('%Y-%m-%d')
+                'date': day
             }
 
     def get_rate_limit_status(self, daily_quota: int = 2000) -> Dict[str, Any]:
@@ -190,30 +345,19 @@ class RateLimitTracker:
             List of recent queries with metadata
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT query, timestamp, success, response_time_ms
-                FROM api_usage_log
-                WHERE api_name = 'brave_search'
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (limit,))
-
-            rows = cursor.fetchall()
-            conn.close()
-
-            queries = []
-            for row in rows:
-                queries.append({
-                    'query': row[0],
-                    'timestamp': row[1],
-                    'success': bool(row[2]),
-                    'response_time_ms': row[3]
-                })
-
-            return queries
+            self._db.flush()
+            with self._db.lock:
+                cursor = self._db.conn.execute(_RECENT_QUERIES_SQL, (limit,))
+
+                return [
+                    {
+                        'query': row['query'],
+                        'timestamp': datetime.fromtimestamp(row['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
+                        'success': bool(row['success']),
+                        'response_time_ms': row['response_time_ms']
+                    }
+                    for row in cursor
+                ]
 
         except Exception as e:
             log.error(f"Error getting recent queries: {e}")
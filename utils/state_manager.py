@@ -2,11 +2,22 @@
 System State Manager for runtime configuration persistence.
 """
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
 import json
+import os
+import tempfile
 from utils import log
 
+# Defaults for every key but created_at, which is only stamped when a
+# state file is actually (re)created
+_DEFAULT_STATE = {
+    "auto_refresh_enabled": True,
+    "last_refresh_toggle": None,
+    "refresh_schedule": "0 3 * * 1",  # Monday 3 AM
+    "version": "1.0"
+}
+
 
 class StateManager:
     """Manage persistent system state across restarts."""
@@ -19,6 +30,13 @@ class StateManager:
             state_file: Path to JSON state file
         """
         self.state_file = Path(state_file)
+
+        # Parsed state, reused until the file's (mtime, size) changes - the
+        # scheduler reads it on every tick while the CLI may toggle it from
+        # another process
+        self._state: Optional[dict] = None
+        self._state_signature: Optional[Tuple[int, int]] = None
+
         self._ensure_state_file()
 
     def _ensure_state_file(self):
@@ -26,46 +44,68 @@ class StateManager:
         if not self.state_file.exists():
             self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
-            default_state = {
-                "auto_refresh_enabled": True,
-                "last_refresh_toggle": None,
-                "refresh_schedule": "0 3 * * 1",  # Monday 3 AM
-                "created_at": datetime.now().isoformat(),
-                "version": "1.0"
-            }
-
-            self._save_state(default_state)
+            self._save_state(self._new_state())
             log.info(f"Created default state file: {self.state_file}")
 
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the state file, or None if it can't be stat'ed."""
+        try:
+            stat = self.state_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def _load_state(self) -> dict:
-        """Load state from JSON file."""
+        """Load state from JSON file (cached until the file changes)."""
+        signature = self._file_signature()
+        if self._state is not None and signature is not None and signature == self._state_signature:
+            return self._state
+
         try:
             with open(self.state_file, 'r') as f:
-                return json.load(f)
+                state = json.load(f)
         except json.JSONDecodeError as e:
             log.error(f"State file corrupted: {e}. Using defaults.")
-            return self._get_default_state()
+            state = self._get_default_state()
         except Exception as e:
             log.error(f"Error loading state: {e}")
-            return self._get_default_state()
+            state = self._get_default_state()
+
+        self._state, self._state_signature = state, signature
+        return state
 
     def _save_state(self, state: dict):
-        """Save state to JSON file."""
+        """Save state to JSON file atomically (temp file + rename)."""
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(state, f, indent=2)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.state_file.parent,
+                prefix=f".{self.state_file.name}.",
+                suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(state, f, indent=2)
+                os.replace(tmp_path, self.state_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
         except Exception as e:
             log.error(f"Error saving state: {e}")
+            # Re-read the file next time rather than trust unsaved changes
+            self._state = self._state_signature = None
+            return
+
+        self._state, self._state_signature = state, self._file_signature()
 
     def _get_default_state(self) -> dict:
         """Get default state dictionary."""
-        return {
-            "auto_refresh_enabled": True,
-            "last_refresh_toggle": None,
-            "refresh_schedule": "0 3 * * 1",
-            "created_at": datetime.now().isoformat(),
-            "version": "1.0"
-        }
+        return dict(_DEFAULT_STATE)
+
+    def _new_state(self) -> dict:
+        """Get default state for a newly created state file."""
+        state = self._get_default_state()
+        state["created_at"] = datetime.now().isoformat()
+        return state
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -89,10 +129,19 @@ class StateManager:
             key: State key
             value: Value to set
         """
-        state = self._load_state()
-        state[key] = value
+        self._set_many({key: value})
+
+    def _set_many(self, values: Dict[str, Any]):
+        """
+        Set several values in state with a single write.
+
+        Args:
+            values: Mapping of state keys to values
+        """
+        state = dict(self._load_state())
+        state.update(values)
         self._save_state(state)
-        log.debug(f"State updated: {key} = {value}")
+        log.debug("State updated: {}", values)
 
     def get_auto_refresh_status(self) -> bool:
         """
@@ -113,8 +162,10 @@ class StateManager:
         current = self.get_auto_refresh_status()
         new_state = not current
 
-        self.set("auto_refresh_enabled", new_state)
-        self.set("last_refresh_toggle", datetime.now().isoformat())
+        self._set_many({
+            "auto_refresh_enabled": new_state,
+            "last_refresh_toggle": datetime.now().isoformat()
+        })
 
         log.info(f"Auto-refresh {'enabled' if new_state else 'disabled'}")
         return new_state
@@ -122,15 +173,19 @@ class StateManager:
     def enable_auto_refresh(self):
         """Enable auto-refresh."""
         if not self.get_auto_refresh_status():
-            self.set("auto_refresh_enabled", True)
-            self.set("last_refresh_toggle", datetime.now().isoformat())
+            self._set_many({
+                "auto_refresh_enabled": True,
+                "last_refresh_toggle": datetime.now().isoformat()
+            })
             log.info("Auto-refresh enabled")
 
     def disable_auto_refresh(self):
         """Disable auto-refresh."""
         if self.get_auto_refresh_status():
-            self.set("auto_refresh_enabled", False)
-            self.set("last_refresh_toggle", datetime.now().isoformat())
+            self._set_many({
+                "auto_refresh_enabled": False,
+                "last_refresh_toggle": datetime.now().isoformat()
+            })
             log.info("Auto-refresh disabled")
 
     def get_refresh_schedule(self) -> str:
@@ -168,10 +223,9 @@ class StateManager:
         Returns:
             Complete state dict
         """
-        return self._load_state()
+        return dict(self._load_state())
 
     def reset_to_defaults(self):
         """Reset state to default values."""
-        default_state = self._get_default_state()
-        self._save_state(default_state)
+        self._save_state(self._new_state())
         log.info("State reset to defaults")
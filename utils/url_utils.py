@@ -3,8 +3,57 @@ Utilities for URL handling, normalization, and detection.
 """
 import hashlib
 import re
+from enum import IntEnum
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
+
+
+class SourceType(IntEnum):
+    """Integer ids for source types, usable as tuple indexes for dispatch."""
+
+    YOUTUBE_VIDEO = 0
+    YOUTUBE_CHANNEL = 1
+    GITHUB = 2
+    WEBSITE = 3
+
+
+# Source type name (as stored in the database) -> SourceType
+SOURCE_TYPE_IDS = {
+    'youtube_video': SourceType.YOUTUBE_VIDEO,
+    'youtube_channel': SourceType.YOUTUBE_CHANNEL,
+    'github': SourceType.GITHUB,
+    'website': SourceType.WEBSITE,
+}
+
+# Compiled once: extract_urls runs over every scraped document
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+# Path markers of YouTube channel URLs
+_CHANNEL_MARKERS = ('/channel/', '/c/', '/@')
+
+# normalize_url handles plain http(s) URLs by slicing; anything with path
+# params, whitespace or control characters (which urlparse strips or
+# splits out) takes the urlparse route
+_FAST_PATH_SCHEMES = ('http://', 'https://')
+_NEEDS_URLPARSE_RE = re.compile(r'[;\s\x00-\x1f]')
+
+# http(s) URL whose host is plain ASCII (no IPv6 brackets or anything else
+# urlparse validates): is_valid_url accepts these without parsing
+_PLAIN_HTTP_URL_RE = re.compile(r"https?://[A-Za-z0-9._~%!$&'()*+,;=:@-]+(?:[/?#]|$)")
+
+# 11-character video ID of youtu.be/ID, youtube.com/watch?...v=ID,
+# /shorts/ID and /embed/ID URLs (any subdomain: www., m., music.)
+_YOUTUBE_VIDEO_ID_RE = re.compile(
+    r'^(?:https?://)?(?:[\w-]+\.)*'
+    r'(?:youtu\.be/|youtube\.com/(?:watch/?\?(?:[^#]*&)?v=|shorts/|embed/))'
+    r'([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+)
+
+# The same URLs go through normalization, dedup and classification many
+# times during discovery and processing; the pure helpers below are
+# memoized (results are immutable strings/tuples)
+_URL_CACHE_SIZE = 8192
 
 
 def extract_urls(text: str) -> List[str]:
@@ -17,12 +66,10 @@ def extract_urls(text: str) -> List[str]:
     Returns:
         List of extracted URLs
     """
-    # Regex pattern for URLs
-    url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-    urls = re.findall(url_pattern, text)
-    return urls
+    return _URL_RE.findall(text)
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def normalize_url(url: str) -> str:
     """
     Normalize URL by removing unnecessary parameters and fragments.
@@ -33,6 +80,11 @@ def normalize_url(url: str) -> str:
     Returns:
         Normalized URL
     """
+    if url.startswith(_FAST_PATH_SCHEMES) and not _NEEDS_URLPARSE_RE.search(url):
+        normalized = _normalize_simple_url(url)
+        if normalized is not None:
+            return normalized
+
     parsed = urlparse(url)
 
     # Remove fragment
@@ -60,6 +112,46 @@ def normalize_url(url: str) -> str:
     return urlunparse(parsed)
 
 
+def _normalize_simple_url(url: str) -> Optional[str]:
+    """
+    Normalize a plain http(s) URL without urlparse.
+
+    Produces the same result as the urlparse route in normalize_url.
+
+    Args:
+        url: URL starting with http:// or https://
+
+    Returns:
+        Normalized URL, or None when urlparse is needed (YouTube URLs,
+        whose query is filtered, and empty or bracketed hosts, which
+        urlparse/urlunparse treat specially)
+    """
+    fragment_start = url.find('#')
+    if fragment_start != -1:
+        url = url[:fragment_start]
+
+    query = ''
+    query_start = url.find('?')
+    if query_start != -1:
+        url, query = url[:query_start], url[query_start + 1:]
+
+    netloc_start = url.find('://') + 3
+    path_start = url.find('/', netloc_start)
+    if path_start == -1:
+        netloc, path = url[netloc_start:], ''
+    else:
+        netloc, path = url[netloc_start:path_start], url[path_start:]
+
+    netloc = netloc.lower()
+    if not netloc or '[' in netloc or ']' in netloc:
+        return None
+    if 'youtube.com' in netloc or 'youtu.be' in netloc:
+        return None
+
+    normalized = url[:netloc_start] + netloc + path.rstrip('/')
+    return f"{normalized}?{query}" if query else normalized
+
+
 def compute_url_hash(url: str) -> str:
     """
     Compute MD5 hash of a normalized URL.
@@ -74,6 +166,37 @@ def compute_url_hash(url: str) -> str:
     return hashlib.md5(normalized.encode('utf-8')).hexdigest()
 
 
+def normalize_urls(urls: Iterable[str]) -> List[str]:
+    """
+    Normalize a batch of URLs (see normalize_url).
+
+    Args:
+        urls: URLs to normalize
+
+    Returns:
+        Normalized URLs, in input order
+    """
+    return list(map(normalize_url, urls))
+
+
+def compute_url_hashes(urls: Iterable[str]) -> List[str]:
+    """
+    Compute the URL hash of a batch of URLs (see compute_url_hash).
+
+    Lookups are hoisted out of the loop, which matters for crawls that
+    add hundreds of discovered pages at once.
+
+    Args:
+        urls: URLs to hash
+
+    Returns:
+        MD5 hashes as hexadecimal strings, in input order
+    """
+    md5, normalize = hashlib.md5, normalize_url
+    return [md5(normalize(url).encode('utf-8')).hexdigest() for url in urls]
+
+
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def detect_url_type(url: str) -> str:
     """
     Detect the type of source from URL.
@@ -95,7 +218,7 @@ def detect_url_type(url: str) -> str:
     # YouTube detection
     elif 'youtube.com' in domain or 'youtu.be' in domain:
         # Channel patterns
-        if any(pattern in path for pattern in ['/channel/', '/c/', '/@']):
+        if any(marker in path for marker in _CHANNEL_MARKERS):
             return 'youtube_channel'
         # Video patterns
         elif '/watch' in path or 'youtu.be' in domain:
@@ -112,6 +235,7 @@ def detect_url_type(url: str) -> str:
         return 'website'
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def extract_youtube_video_id(url: str) -> str:
     """
     Extract video ID from YouTube URL.
@@ -122,24 +246,11 @@ def extract_youtube_video_id(url: str) -> str:
     Returns:
         Video ID or empty string if not found
     """
-    parsed = urlparse(url)
-
-    # youtu.be format
-    if 'youtu.be' in parsed.netloc:
-        return parsed.path.lstrip('/')
-
-    # youtube.com/watch?v= format
-    elif 'youtube.com' in parsed.netloc:
-        if '/watch' in parsed.path:
-            query_params = parse_qs(parsed.query)
-            return query_params.get('v', [''])[0]
-        elif '/shorts/' in parsed.path:
-            # Extract from path: /shorts/VIDEO_ID
-            return parsed.path.split('/shorts/')[-1]
-
-    return ''
+    match = _YOUTUBE_VIDEO_ID_RE.match(url)
+    return match.group(1) if match else ''
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def extract_github_repo_info(url: str) -> Tuple[str, str]:
     """
     Extract owner and repo name from GitHub URL.
@@ -171,6 +282,9 @@ def is_valid_url(url: str) -> bool:
     Returns:
         True if valid URL, False otherwise
     """
+    if _PLAIN_HTTP_URL_RE.match(url):
+        return True
+
     try:
         result = urlparse(url)
         return all([result.scheme in ['http', 'https'], result.netloc])